@@ -6,75 +6,149 @@ Deploys infrastructure, frontend, billing system, and invalidates CloudFront
 
 import os
 import sys
-import subprocess
-import json
 import time
 import argparse
+import threading
 from pathlib import Path
 
-def run_command(command, cwd=None, show_output=True):
-    """Run a shell command with real-time output"""
+from deploy_assets import (
+    BILLING_BUILD_DIR, BILLING_DIR, build_billing_dashboard, is_hashed_asset, keep_recent_hashed_asset,
+)
+from deploy_aws import copy_object, create_invalidation, latest_layer_version, sync_directory, upload_file
+from deploy_coldstart import DEFAULT_RUNS as COLDSTART_RUNS, print_results, run_benchmarks
+from deploy_budget import enforce_budgets, ignore_budgets
+from deploy_checkpoint import Checkpoints, files_digest, tree_digest
+from deploy_compress import CONTENT_ENCODING, precompress
+from deploy_runner import Command, run_subprocess
+from deploy_report import (
+    DEFAULT_LARGER_PCT, DEFAULT_SLOWER_PCT, add, deploy_run, print_comparison, record_packages,
+    record_stages, timed,
+)
+from deploy_plan import PLAN_OUTPUT, build_plan, print_plan, write_plan
+from deploy_publish import (
+    HTML_CACHE_CONTROL, STATIC_PAGES, PublishResult, invalidation_paths, local_manifest, pending_uploads, publish,
+    publish_runtime_config, record_uploads, upload_entry,
+)
+from deploy_layers import analyze, group_layer_targets, print_report, write_groups_file
+from deploy_npm import cache_key, restore_node_modules, save_node_modules
+from deploy_prune import print_prune_report
+from deploy_packaging import (
+    CACHE_DIR, LAYER_HASH_TAG, LAYER_NAME, LAYER_TARGET, build_target, collect_files, dependency_hash, hash_file,
+    package_targets, read_recorded_hash, select_targets, source_hash, write_recorded_hash,
+)
+from deploy_scheduler import STATUS_ICONS, Stage, current_tag, run_stages
+from deploy_watch import watch
+from deployment_config import config
+from deploy_terraform import (
+    DEFAULT_WORKSPACE, PLAN_FILE, TerraformOutputs, TerraformWorkspace, current_fingerprints, get_outputs,
+    invalidate_outputs, module_targets, needs_init, plan_targets, record_applied, record_init, state_version,
+    target_args, targeted_modules,
+)
+
+# Lambda target groups per deploy mode (see LAMBDA_TARGETS in deploy_packaging.py)
+INFRASTRUCTURE_GROUPS = ["core", "billing"]
+BILLING_GROUPS = ["billing"]
+CROSSPOST_GROUPS = ["crosspost", "whatsapp"]
+
+# Terraform modules owning the crosspost + WhatsApp Lambdas
+CROSSPOST_MODULES = ["tenant_crosspost", "tenant_whatsapp"]
+
+def run_command(command, cwd=None, show_output=True, ok_codes=(0,), tag=None):
+    """Run a shell command with real-time output (exits unless the exit code is in ok_codes)
+    
+    The full output goes to .deploy-cache/logs/<run>/<tag>.log; result.stdout holds the last
+    lines only (or the complete stdout with show_output=False, e.g. for JSON parsing).
+    """
     print(f"\n🔧 Running: {command}")
     if cwd:
         print(f"📁 Working directory: {cwd}")
     print("-" * 50)
     
-    if show_output:
-        # Run with real-time output
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1
-        )
-        
-        output_lines = []
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                print(output.strip())
-                output_lines.append(output.strip())
-        
-        return_code = process.poll()
-        full_output = '\n'.join(output_lines)
-    else:
-        # Run without real-time output (for JSON parsing)
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=cwd,
-            capture_output=True,
-            text=True
-        )
-        return_code = result.returncode
-        full_output = result.stdout
-        
-        if result.stderr:
-            print(result.stderr, file=sys.stderr)
+    # Log file per stage (or per tool outside of a stage graph)
+    tag = tag or current_tag() or command.split()[0]
+    result = run_subprocess(Command(command, cwd=cwd, tag=tag, show_output=show_output, capture=not show_output))
+    if result.stderr:
+        print(result.stderr, file=sys.stderr)
     
     print("-" * 50)
     
-    if return_code != 0:
-        print(f"❌ Command failed with exit code {return_code}")
+    if result.returncode not in ok_codes:
+        print(f"❌ Command failed with exit code {result.returncode} (full log: {result.log_path})")
         sys.exit(1)
     
-    print("✅ Command completed successfully")
+    print(f"✅ Command completed in {result.seconds:.1f}s "
+          f"({result.lines} lines, peak {result.peak_rate} lines/s)")
+    return result
+
+# Only one deployment target's plan can ask for confirmation on the terminal at a time
+_confirm_lock = threading.Lock()
+_billing_build_lock = threading.Lock()  # all targets build into viraltenant-billing/dist
+
+def terraform_init(infra_dir, workspace=DEFAULT_WORKSPACE):
+    """Run terraform init only when providers, backend or module sources changed"""
+    needed, reason = needs_init(infra_dir, workspace)
+    if not needed:
+        print(f"\n✅ Terraform already initialized ({reason}), skipping init")
+        return
     
-    # Return a result-like object
-    class Result:
-        def __init__(self, stdout, returncode):
-            self.stdout = stdout
-            self.returncode = returncode
+    print(f"\n📦 Initializing Terraform ({reason})...")
+    started = time.perf_counter()
+    command = "terraform init"
+    if workspace.name:
+        # Own state key per target; -reconfigure as the key may differ from main.tf and the last init
+        command = f"{command} -reconfigure {workspace.init_args()}".strip()
+    run_command(command, cwd=infra_dir)
+    add("terraform_seconds", time.perf_counter() - started)
+    record_init(infra_dir, workspace)
+
+def terraform_plan_and_apply(infra_dir, targets=None, auto_approve=False, workspace=DEFAULT_WORKSPACE):
+    """Plan once into a saved plan file and apply exactly that plan
+    
+    Uses -detailed-exitcode to skip the apply on an empty plan. The saved plan is applied
+    without a second refresh; without auto_approve the plan is confirmed here first.
+    Returns True if changes were applied.
+    """
+    plan_path = Path(infra_dir) / PLAN_FILE
+    target_flags = f"{target_args(targets)} " if targets else ""
+    started = time.perf_counter()
+    
+    print("\n📝 Planning infrastructure changes...")
+    result = run_command(
+        f"terraform plan {target_flags}{workspace.var_args()} -detailed-exitcode -out={PLAN_FILE}",
+        cwd=infra_dir,
+        ok_codes=(0, 2),
+    )
     
-    return Result(full_output, return_code)
+    try:
+        if result.returncode == 0:
+            print("\n✅ Plan is empty - infrastructure is up-to-date, skipping apply")
+            return False
+        
+        if not auto_approve:
+            with _confirm_lock:
+                target = f" to {workspace.name}" if workspace.name else ""
+                print(f"\n❓ Apply the plan above{target}? Type 'yes' to continue:")
+                if input().strip().lower() != "yes":
+                    print("❌ Apply cancelled")
+                    sys.exit(1)
+        
+        print("\n🚀 Applying saved plan...")
+        invalidate_outputs(workspace)
+        run_command(f"terraform apply {PLAN_FILE}", cwd=infra_dir)
+        return True
+    finally:
+        add("terraform_seconds", time.perf_counter() - started)
+        if plan_path.exists():
+            plan_path.unlink()
 
-def deploy_infrastructure():
-    """Deploy Terraform infrastructure"""
+def deploy_infrastructure(full=False, auto_approve=False, workspace=DEFAULT_WORKSPACE):
+    """Deploy Terraform infrastructure
+    
+    Only modules whose Lambda artifacts or .tf files changed since the last successful
+    apply are targeted; full=True (--full) applies the whole configuration. Init only runs
+    when needed and the apply uses a saved plan (skipped when the plan is empty).
+    workspace selects the deployment target (own working dir, state key and manifests).
+    """
     print("\n" + "=" * 60)
     print("🏗️ DEPLOYING TERRAFORM INFRASTRUCTURE")
     print("=" * 60)
@@ -85,440 +159,157 @@ def deploy_infrastructure():
         sys.exit(1)
     
     try:
-        # Initialize Terraform
-        print("\n📦 Initializing Terraform...")
-        run_command("terraform init", cwd=infra_dir)
+        # Work out which modules actually changed
+        fingerprints = current_fingerprints(infra_dir)
+        if full:
+            targets, reason = None, "--full requested"
+        else:
+            targets, reason = plan_targets(fingerprints, infra_dir, workspace)
         
-        # Apply infrastructure
-        print("\n🚀 Applying infrastructure changes...")
-        print("⚠️  You will be prompted to confirm the changes with 'yes'")
-        run_command("terraform apply -var-file=terraform.tfvars", cwd=infra_dir)
+        # Named workspaces run in their own mirror of the infrastructure dir (archive_file
+        # ZIPs, lock file and .terraform are never shared between concurrent targets)
+        work_dir = workspace.working_dir(infra_dir)
         
-        # Get outputs (without showing output)
-        print("\n📤 Getting Terraform outputs...")
-        result = run_command("terraform output -json", cwd=infra_dir, show_output=False)
+        # Initialize Terraform (only if providers, backend or module sources changed)
+        terraform_init(work_dir, workspace)
         
-        if result.stdout.strip():
-            outputs = json.loads(result.stdout)
-            print("✅ Infrastructure deployment completed successfully!")
-            print("✅ API Gateway automatically deployed via Terraform")
-            return outputs
+        # Apply infrastructure
+        if targets == []:
+            print(f"\n✅ No Terraform changes ({reason}), skipping plan and apply")
+            print("💡 Use --full to apply the whole configuration anyway")
+        elif targets is None:
+            print(f"\n🚀 Planning all infrastructure changes ({reason})...")
+            terraform_plan_and_apply(work_dir, auto_approve=auto_approve, workspace=workspace)
+            record_applied(fingerprints, workspace=workspace)
         else:
+            print(f"\n🎯 Planning {len(targets)} targets ({reason}):")
+            for address in targets:
+                print(f"   - {address}")
+            terraform_plan_and_apply(work_dir, targets, auto_approve=auto_approve, workspace=workspace)
+            record_applied(fingerprints, targeted_modules(targets), workspace=workspace)
+        
+        # Get outputs (served from cache when the state serial did not move)
+        outputs = get_outputs(work_dir, workspace=workspace)
+        if outputs is None:
+            sys.exit(1)
+        if not outputs.raw:
             print("⚠️ No Terraform outputs found")
-            return {}
+            return outputs
+        
+        print("✅ Infrastructure deployment completed successfully!")
+        print("✅ API Gateway automatically deployed via Terraform")
+        return outputs
             
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse Terraform outputs: {e}")
-        sys.exit(1)
     except Exception as e:
         print(f"❌ Infrastructure deployment failed: {e}")
         sys.exit(1)
 
-def deploy_billing_system():
-    """Deploy Billing System with Cost Explorer integration"""
-    print("\n" + "=" * 60)
-    print("💰 DEPLOYING BILLING SYSTEM")
-    print("=" * 60)
-    
-    billing_lambda_dir = Path("viraltenant-infrastructure/lambda-functions/billing-api")
-    if not billing_lambda_dir.exists():
-        print("❌ Billing Lambda directory not found!")
-        sys.exit(1)
-    
-    try:
-        # Create Lambda ZIP using PowerShell (Windows compatible) - WITHOUT node_modules (using Lambda Layer)
-        print("\n📦 Creating Billing Lambda ZIP file (without node_modules - using Lambda Layer)...")
-        # ZIP must be in viraltenant-infrastructure folder for Terraform
-        zip_path = Path("viraltenant-infrastructure/billing_api.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP excluding node_modules
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{billing_lambda_dir}\' -Exclude \'node_modules\',\'package-lock.json\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Billing Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Billing Lambda ZIP created: {zip_path}")
-        print(f"� ZIP sizce: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        # Note: Terraform will handle the Lambda deployment
-        print("✅ Billing Lambda prepared for Terraform deployment")
-        
-    except Exception as e:
-        print(f"❌ Billing system deployment failed: {e}")
-        sys.exit(1)
-
-def deploy_billing_cron():
-    """Deploy Billing Cron Lambda for monthly invoice generation"""
-    print("\n" + "=" * 60)
-    print("📅 DEPLOYING BILLING CRON (Monthly Invoices)")
-    print("=" * 60)
-    
-    billing_cron_dir = Path("viraltenant-infrastructure/lambda-functions/billing-cron")
-    if not billing_cron_dir.exists():
-        print("⚠️ Billing Cron directory not found, skipping...")
-        return
-    
-    try:
-        # Create Lambda ZIP using PowerShell (Windows compatible) - WITHOUT node_modules (using Lambda Layer)
-        print("\n📦 Creating Billing Cron Lambda ZIP file (without node_modules - using Lambda Layer)...")
-        # ZIP must be in viraltenant-infrastructure folder for Terraform
-        zip_path = Path("viraltenant-infrastructure/billing_cron.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP excluding node_modules
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{billing_cron_dir}\' -Exclude \'node_modules\',\'package-lock.json\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Billing Cron Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Billing Cron Lambda ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        print("✅ Billing Cron Lambda prepared for Terraform deployment")
-        print("📅 Schedule: 1st of every month at 6:00 AM UTC")
-        
-    except Exception as e:
-        print(f"❌ Billing Cron deployment failed: {e}")
-        # Don't exit, as this is optional
-        print("⚠️ Continuing without Billing Cron...")
+def package_lambdas(groups=None, force=False):
+    """Package Lambda ZIPs for the given target groups (None = all) in parallel
 
-def deploy_tenant_authorizer():
-    """Deploy Tenant Authorizer Lambda with billing-admin group support"""
-    print("\n" + "=" * 60)
-    print("🔐 DEPLOYING TENANT AUTHORIZER")
-    print("=" * 60)
-    
-    authorizer_dir = Path("viraltenant-infrastructure/lambda-functions/tenant-authorizer")
-    if not authorizer_dir.exists():
-        print("⚠️ Tenant Authorizer directory not found, skipping...")
-        return
-    
-    try:
-        # Create Lambda ZIP using PowerShell (Windows compatible) - WITHOUT node_modules (using Lambda Layer)
-        print("\n📦 Creating Tenant Authorizer Lambda ZIP file (without node_modules - using Lambda Layer)...")
-        # ZIP must be in viraltenant-infrastructure folder for Terraform
-        zip_path = Path("viraltenant-infrastructure/tenant_authorizer.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP excluding node_modules
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{authorizer_dir}\' -Exclude \'node_modules\',\'package-lock.json\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Tenant Authorizer Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Tenant Authorizer Lambda ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        print("✅ Tenant Authorizer Lambda prepared for Terraform deployment")
-        print("🔐 Supports: billing-admins group for /billing/admin/* endpoints")
-        
-    except Exception as e:
-        print(f"❌ Tenant Authorizer deployment failed: {e}")
-        # Don't exit, as this is optional
-        print("⚠️ Continuing without Tenant Authorizer update...")
-
-def deploy_stripe_webhook():
-    """Deploy Stripe Webhook Lambda (backup for EventBridge)"""
-    print("\n" + "=" * 60)
-    print("💳 DEPLOYING STRIPE WEBHOOK LAMBDA")
-    print("=" * 60)
-    
-    webhook_dir = Path("viraltenant-infrastructure/lambda-functions/stripe-webhook")
-    if not webhook_dir.exists():
-        print("⚠️ Stripe Webhook directory not found, skipping...")
-        return
-    
-    try:
-        # Create Lambda ZIP using PowerShell - code only, deps from Lambda Layer
-        print("\n📦 Creating Stripe Webhook Lambda ZIP file (code only - using Lambda Layer)...")
-        zip_path = Path("viraltenant-infrastructure/stripe_webhook.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP - only JS files
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{webhook_dir}\\*.js\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Stripe Webhook Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Stripe Webhook Lambda ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        print("✅ Stripe Webhook Lambda prepared for Terraform deployment")
-        print("💳 Backup webhook handler for classic Stripe webhooks")
-        
-    except Exception as e:
-        print(f"❌ Stripe Webhook deployment failed: {e}")
-        print("⚠️ Continuing without Stripe Webhook...")
-
-def deploy_stripe_eventbridge_handler():
-    """Deploy Stripe EventBridge Handler Lambda"""
-    print("\n" + "=" * 60)
-    print("⚡ DEPLOYING STRIPE EVENTBRIDGE HANDLER")
-    print("=" * 60)
-    
-    handler_dir = Path("viraltenant-infrastructure/lambda-functions/stripe-eventbridge-handler")
-    if not handler_dir.exists():
-        print("⚠️ Stripe EventBridge Handler directory not found, skipping...")
-        return
-    
-    try:
-        # Create Lambda ZIP using PowerShell - code only, deps from Lambda Layer
-        print("\n📦 Creating Stripe EventBridge Handler Lambda ZIP file (code only - using Lambda Layer)...")
-        zip_path = Path("viraltenant-infrastructure/stripe_eventbridge_handler.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP - only JS files
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{handler_dir}\\*.js\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Stripe EventBridge Handler Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Stripe EventBridge Handler Lambda ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        print("✅ Stripe EventBridge Handler Lambda prepared for Terraform deployment")
-        print("⚡ Processes Stripe events via Amazon EventBridge Partner Integration")
-        
-    except Exception as e:
-        print(f"❌ Stripe EventBridge Handler deployment failed: {e}")
-        print("⚠️ Continuing without Stripe EventBridge Handler...")
-
-def deploy_crosspost_lambdas():
-    """Deploy all Crosspost Lambda functions"""
-    print("\n" + "=" * 60)
-    print("📤 DEPLOYING CROSSPOST LAMBDAS")
-    print("=" * 60)
-    
-    crosspost_lambdas = [
-        "tenant-crosspost-tiktok",
-        "tenant-crosspost-youtube",
-        "tenant-crosspost-instagram",
-        "tenant-crosspost-facebook",
-        "tenant-crosspost-xtwitter",
-        "tenant-crosspost-linkedin",
-        "tenant-crosspost-telegram",
-        "tenant-crosspost-discord",
-        "tenant-crosspost-slack",
-        "tenant-crosspost-bluesky",
-        "tenant-crosspost-mastodon",
-        "tenant-crosspost-snapchat",
-        "tenant-crosspost-dispatcher",
-    ]
-    
-    for lambda_name in crosspost_lambdas:
-        lambda_dir = Path(f"viraltenant-infrastructure/lambda-functions/{lambda_name}")
-        if not lambda_dir.exists():
-            print(f"⚠️ {lambda_name} directory not found, skipping...")
-            continue
-        
-        try:
-            # Create Lambda ZIP using PowerShell - code only, deps from Lambda Layer
-            zip_name = lambda_name.replace("-", "_") + ".zip"
-            zip_path = Path(f"viraltenant-infrastructure/{zip_name}")
-            
-            # Remove old ZIP if exists
-            if zip_path.exists():
-                zip_path.unlink()
-            
-            # Use PowerShell to create ZIP - only JS files
-            run_command(
-                f'powershell -Command "Get-ChildItem -Path \'{lambda_dir}\\*.js\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"',
-                show_output=False
-            )
-            
-            # Verify ZIP was created
-            if zip_path.exists():
-                print(f"✅ {lambda_name}: {zip_path.stat().st_size / 1024:.2f} KB")
-            else:
-                print(f"⚠️ {lambda_name}: Failed to create ZIP")
-                
-        except Exception as e:
-            print(f"⚠️ {lambda_name}: {e}")
-    
-    print("\n✅ Crosspost Lambdas prepared for Terraform deployment")
-    print("📦 Dependencies provided via Lambda Layer")
-
-def deploy_whatsapp_lambdas():
-    """Deploy WhatsApp Lambda functions for AWS End User Messaging Social"""
-    print("\n" + "=" * 60)
-    print("📱 DEPLOYING WHATSAPP LAMBDAS")
-    print("=" * 60)
-    
-    whatsapp_lambdas = [
-        ("tenant-whatsapp-subscription", "tenant_whatsapp_subscription.zip"),
-        ("tenant-crosspost-whatsapp", "tenant_crosspost_whatsapp.zip"),
-        ("tenant-whatsapp-worker", "tenant_whatsapp_worker.zip"),
-        ("tenant-whatsapp-settings", "tenant_whatsapp_settings.zip"),
-    ]
-    
-    for lambda_name, zip_name in whatsapp_lambdas:
-        lambda_dir = Path(f"viraltenant-infrastructure/lambda-functions/{lambda_name}")
-        if not lambda_dir.exists():
-            print(f"⚠️ {lambda_name} directory not found, skipping...")
-            continue
-        
-        try:
-            zip_path = Path(f"viraltenant-infrastructure/{zip_name}")
-            
-            # Remove old ZIP if exists
-            if zip_path.exists():
-                zip_path.unlink()
-            
-            # Use PowerShell to create ZIP - only JS files
-            run_command(
-                f'powershell -Command "Get-ChildItem -Path \'{lambda_dir}\\*.js\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"',
-                show_output=False
-            )
-            
-            # Verify ZIP was created
-            if zip_path.exists():
-                print(f"✅ {lambda_name}: {zip_path.stat().st_size / 1024:.2f} KB")
-            else:
-                print(f"⚠️ {lambda_name}: Failed to create ZIP")
-                
-        except Exception as e:
-            print(f"⚠️ {lambda_name}: {e}")
-    
-    print("\n✅ WhatsApp Lambdas prepared for Terraform deployment")
-    print("📱 Uses AWS End User Messaging Social for WhatsApp broadcasts")
-
-
-def deploy_membership_lambda():
-    """Deploy Tenant Membership Lambda for Mollie Split Payments"""
-    print("\n" + "=" * 60)
-    print("👑 DEPLOYING MEMBERSHIP LAMBDA")
-    print("=" * 60)
-    
-    membership_dir = Path("viraltenant-infrastructure/lambda-functions/tenant-membership")
-    if not membership_dir.exists():
-        print("⚠️ Membership Lambda directory not found, skipping...")
-        return
-    
-    try:
-        zip_path = Path("viraltenant-infrastructure/tenant_membership.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP - only JS files
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{membership_dir}\\*.js\' | Compress-Archive -DestinationPath \'{zip_path}\' -Force"',
-            show_output=False
-        )
-        
-        # Verify ZIP was created
-        if zip_path.exists():
-            print(f"✅ tenant-membership: {zip_path.stat().st_size / 1024:.2f} KB")
-        else:
-            print("⚠️ tenant-membership: Failed to create ZIP")
-            
-    except Exception as e:
-        print(f"⚠️ tenant-membership: {e}")
-    
-    print("\n✅ Membership Lambda prepared for Terraform deployment")
-    print("👑 Mollie Split Payments für Tenant-Mitgliedschaften")
+    Functions whose sources and packaging rules are unchanged since the last build are skipped.
+    Stops the deploy if a ZIP exceeds the size budget of its target (see deploy_budget.py).
+    """
+    targets = select_targets(groups=groups)
+    results = package_targets(targets, force=force)
+    record_packages(results)
+    enforce_budgets(targets, results)
+    return results
 
 
 def build_lambda_layer():
-    """Build the common dependencies Lambda Layer - only if changed"""
+    """Build the common dependencies Lambda Layer - only if its dependency tree changed
+    
+    The layer is identified by the hash of its resolved dependencies (package-lock.json),
+    recorded in common-deps-layer.hash next to the ZIP; Terraform publishes a new layer
+    version only when that hash changes, so a fresh checkout does not update every function.
+    """
     print("\n" + "=" * 60)
     print("📦 BUILDING LAMBDA LAYER (Common Dependencies)")
     print("=" * 60)
     
-    layer_dir = Path("viraltenant-infrastructure/lambda-layers/common-deps/nodejs")
-    zip_path = Path("viraltenant-infrastructure/lambda-layers/common-deps/common-deps-layer.zip")
-    package_json = layer_dir / "package.json"
-    package_lock = layer_dir / "package-lock.json"
+    layer_dir = Path(LAYER_TARGET.source_dir)
+    zip_path = Path(LAYER_TARGET.zip_path)
     
     if not layer_dir.exists():
         print("❌ Lambda Layer directory not found!")
         sys.exit(1)
     
+    digest = dependency_hash(LAYER_TARGET)
+    if digest is None:
+        print("❌ package-lock.json missing - the layer needs a lockfile to be versioned")
+        sys.exit(1)
+    
+    # Slim layers for the groups in SLIM_LAYER_GROUPS (see deploy_layers.py)
+    group_layers = group_layer_targets()
+    stale_groups = [g for g, (target, h) in group_layers.items() if read_recorded_hash(target) != h]
+    
     # Check if rebuild is needed
-    if zip_path.exists() and package_json.exists():
-        zip_mtime = zip_path.stat().st_mtime
-        pkg_mtime = package_json.stat().st_mtime
-        lock_mtime = package_lock.stat().st_mtime if package_lock.exists() else 0
-        
-        # Only rebuild if package.json or package-lock.json is newer than ZIP
-        if zip_mtime > pkg_mtime and zip_mtime > lock_mtime:
-            zip_size = zip_path.stat().st_size / (1024*1024)
-            print(f"✅ Lambda Layer ZIP is up-to-date ({zip_size:.2f} MB), skipping rebuild")
-            print("💡 Delete the ZIP file to force a rebuild")
-            return
-        else:
-            print("🔄 Dependencies changed, rebuilding Lambda Layer...")
+    recorded = read_recorded_hash(LAYER_TARGET)
+    if recorded == digest and not stale_groups:
+        zip_size = zip_path.stat().st_size / (1024*1024)
+        print(f"✅ Lambda Layer ZIP is up-to-date ({zip_size:.2f} MB, deps {digest[:12]}), skipping rebuild")
+        print(f"💡 Delete {hash_file(LAYER_TARGET).name} to force a rebuild")
+        write_groups_file(group_layers)
+        report_published_layer(digest)
+        return
+    elif recorded == digest:
+        print(f"🔄 Slim layers out of date: {', '.join(stale_groups)}")
+    elif recorded:
+        print(f"🔄 Dependencies changed ({recorded[:12]} → {digest[:12]}), rebuilding Lambda Layer...")
     else:
-        print("🆕 Lambda Layer ZIP not found, building...")
+        print("🆕 Lambda Layer ZIP (or its dependency hash) not found, building...")
     
     try:
         # Install dependencies
-        print("\n📦 Installing Lambda Layer dependencies...")
-        run_command("npm install --production", cwd=layer_dir)
-        
-        # Create Lambda Layer ZIP
-        print("\n📦 Creating Lambda Layer ZIP file...")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP (must include nodejs folder structure)
-        nodejs_parent = layer_dir.parent  # common-deps folder
-        run_command(
-            f'powershell -Command "Compress-Archive -Path \'{nodejs_parent}\\nodejs\' -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Lambda Layer ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Lambda Layer ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / (1024*1024):.2f} MB")
-        print("📦 Contains: AWS SDK, Stripe, PDFKit, UUID, etc.")
+        if not restore_node_modules(layer_dir, "npm install --production"):
+            print("\n📦 Installing Lambda Layer dependencies...")
+            run_command("npm install --production", cwd=layer_dir)
+            save_node_modules(layer_dir, "npm install --production")
+        
+        # npm install may have rewritten the lockfile, record what is actually packaged
+        digest = dependency_hash(LAYER_TARGET)
+        group_layers = group_layer_targets()
+        results = []
+        
+        if read_recorded_hash(LAYER_TARGET) != digest:
+            # Create Lambda Layer ZIP (deterministic, must include nodejs folder structure)
+            print("\n📦 Creating Lambda Layer ZIP file...")
+            result = build_target(LAYER_TARGET)
+            
+            # Verify ZIP was created
+            if result["status"] != "built":
+                print(f"❌ Failed to create Lambda Layer ZIP: {result['error']}")
+                sys.exit(1)
+            
+            # Only a layer within budget is recorded, an oversized one is rebuilt next time
+            enforce_budgets([LAYER_TARGET], [result])
+            write_recorded_hash(LAYER_TARGET, digest)
+            results.append(result)
+            print_prune_report(result)
+            print(f"✅ Lambda Layer ZIP created: {zip_path}")
+            print(f"📊 ZIP size: {zip_path.stat().st_size / (1024*1024):.2f} MB")
+            print("📦 Contains: AWS SDK, Stripe, PDFKit, UUID, etc.")
+        
+        for group, (target, group_digest) in group_layers.items():
+            if read_recorded_hash(target) == group_digest:
+                continue
+            Path(target.zip_path).parent.mkdir(parents=True, exist_ok=True)
+            result = build_target(target)
+            if result["status"] != "built":
+                print(f"❌ Failed to create the {group} layer ZIP: {result['error']}")
+                sys.exit(1)
+            enforce_budgets([target], [result])
+            write_recorded_hash(target, group_digest)
+            results.append(result)
+            print_prune_report(result, top=5)
+            print(f"✅ Slim {group} layer: {result['bytes'] / (1024*1024):.2f} MB, {result['files']} files")
+        
+        write_groups_file(group_layers)
+        record_packages(results)
+        for result in results:
+            add("layer_bytes_saved", result["prune"]["pruned_bytes"] + result["prune"]["deduped_bytes"])
+        report_published_layer(digest)
         
         print("✅ Lambda Layer prepared for Terraform deployment")
         
@@ -526,107 +317,45 @@ def build_lambda_layer():
         print(f"❌ Lambda Layer build failed: {e}")
         sys.exit(1)
 
-def deploy_tenant_management():
-    """Deploy Tenant Management Lambda"""
-    print("\n" + "=" * 60)
-    print("👥 DEPLOYING TENANT MANAGEMENT")
-    print("=" * 60)
-    
-    tenant_mgmt_dir = Path("viraltenant-infrastructure/lambda-functions/tenant-management")
-    if not tenant_mgmt_dir.exists():
-        print("⚠️ Tenant Management directory not found, skipping...")
-        return
-    
+def report_published_layer(digest):
+    """Tell whether Terraform will publish a new layer version (informational only)"""
     try:
-        # Create Lambda ZIP using PowerShell (Windows compatible) - WITHOUT node_modules (using Lambda Layer)
-        print("\n📦 Creating Tenant Management Lambda ZIP file (without node_modules - using Lambda Layer)...")
-        zip_path = Path("tenant_management.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP excluding node_modules
-        run_command(
-            f'powershell -Command "Get-ChildItem -Path \'{tenant_mgmt_dir}\' -Exclude \'node_modules\',\'package-lock.json\' | Compress-Archive -DestinationPath \'tenant_management.zip\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Tenant Management Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Tenant Management Lambda ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        print("✅ Tenant Management Lambda prepared for Terraform deployment")
-        
+        published = latest_layer_version(LAYER_NAME)
     except Exception as e:
-        print(f"❌ Tenant Management deployment failed: {e}")
-        # Don't exit, as this is optional
-        print("⚠️ Continuing without Tenant Management update...")
-
-def deploy_auth_handler():
-    """Deploy Auth Handler Lambda (central-auth module)"""
-    print("\n" + "=" * 60)
-    print("🔑 DEPLOYING AUTH HANDLER")
-    print("=" * 60)
-    
-    # Auth handler is in modules/central-auth/lambda/
-    auth_handler_dir = Path("viraltenant-infrastructure/modules/central-auth/lambda")
-    if not auth_handler_dir.exists():
-        print("⚠️ Auth Handler directory not found, skipping...")
+        print(f"⚠️ Could not look up the published layer: {e}")
         return
-    
-    try:
-        # Create Lambda ZIP using PowerShell (Windows compatible) - WITHOUT node_modules (using Lambda Layer)
-        print("\n📦 Creating Auth Handler Lambda ZIP file (without node_modules - using Lambda Layer)...")
-        # ZIP must be in viraltenant-infrastructure folder for Terraform
-        zip_path = Path("viraltenant-infrastructure/auth_handler.zip")
-        
-        # Remove old ZIP if exists
-        if zip_path.exists():
-            zip_path.unlink()
-        
-        # Use PowerShell to create ZIP - only index.js file
-        run_command(
-            f'powershell -Command "Compress-Archive -Path \'{auth_handler_dir}\\index.js\' -DestinationPath \'{zip_path}\' -Force"'
-        )
-        
-        # Verify ZIP was created
-        if not zip_path.exists():
-            print("❌ Failed to create Auth Handler Lambda ZIP!")
-            sys.exit(1)
-        
-        print(f"✅ Auth Handler Lambda ZIP created: {zip_path}")
-        print(f"📊 ZIP size: {zip_path.stat().st_size / 1024:.2f} KB")
-        print("📦 Dependencies provided via Lambda Layer")
-        
-        print("✅ Auth Handler Lambda prepared for Terraform deployment")
-        
-    except Exception as e:
-        print(f"❌ Auth Handler deployment failed: {e}")
-        # Don't exit, as this is optional
-        print("⚠️ Continuing without Auth Handler update...")
+    if published is None:
+        print(f"🆕 {LAYER_NAME} not published yet - Terraform will create version 1")
+    elif published.get("Description", "").endswith(LAYER_HASH_TAG + digest):
+        print(f"♻️ {LAYER_NAME}:{published['Version']} already has these dependencies - no new layer version")
+    else:
+        print(f"🚀 Dependencies differ from {LAYER_NAME}:{published['Version']} - Terraform will publish a new version")
 
 def deploy_billing_config(s3_bucket):
-    """Deploy Billing Configuration and Logo to S3"""
+    """Deploy Billing Configuration and Logo to S3; returns the uploaded keys (unchanged files are skipped)"""
     print("\n" + "=" * 60)
     print("📄 DEPLOYING BILLING CONFIGURATION")
     print("=" * 60)
     
     config_path = Path("viraltenant-infrastructure/config/billing-config.json")
     logo_path = Path("viraltenant-infrastructure/assets/viraltenant-logo.png")
+    uploaded = []
+    
+    def upload_changed(path, key, content_type):
+        entry = upload_entry(path)
+        if not pending_uploads(s3_bucket, {key: entry}):
+            print(f"✅ {path.name} unchanged since the last upload, skipping")
+            return
+        print(f"\n📤 Uploading {path.name} to S3...")
+        upload_file(path, s3_bucket, key, content_type=content_type)
+        record_uploads(s3_bucket, {key: entry})
+        uploaded.append(key)
+        print(f"✅ {path.name} uploaded")
     
     try:
         # Upload billing config
         if config_path.exists():
-            print(f"\n📤 Uploading billing-config.json to S3...")
-            run_command(
-                f'aws s3 cp "{config_path}" s3://{s3_bucket}/config/billing-config.json --content-type "application/json"'
-            )
-            print("✅ billing-config.json uploaded")
+            upload_changed(config_path, "config/billing-config.json", "application/json")
             
             # Check if config has placeholders
             with open(config_path, 'r', encoding='utf-8') as f:
@@ -640,11 +369,7 @@ def deploy_billing_config(s3_bucket):
         
         # Upload logo if exists
         if logo_path.exists():
-            print(f"\n📤 Uploading viraltenant-logo.png to S3...")
-            run_command(
-                f'aws s3 cp "{logo_path}" s3://{s3_bucket}/assets/viraltenant-logo.png --content-type "image/png"'
-            )
-            print("✅ viraltenant-logo.png uploaded")
+            upload_changed(logo_path, "assets/viraltenant-logo.png", "image/png")
         else:
             print(f"\n⚠️ Logo not found at {logo_path}")
             print("   Bitte fügen Sie Ihr Firmenlogo hinzu für die Rechnungen:")
@@ -656,9 +381,14 @@ def deploy_billing_config(s3_bucket):
     except Exception as e:
         print(f"❌ Billing config deployment failed: {e}")
         print("⚠️ Continuing without billing config...")
+    
+    return uploaded
 
 def deploy_static_pages(s3_bucket):
-    """Deploy static HTML pages (tenant-creation, etc.) to S3"""
+    """Deploy static HTML pages (tenant-creation, etc.) to S3; returns the uploaded keys
+    
+    Pages unchanged since their last upload to this bucket are skipped (and not invalidated).
+    """
     print("\n" + "=" * 60)
     print("📄 DEPLOYING STATIC PAGES")
     print("=" * 60)
@@ -666,31 +396,44 @@ def deploy_static_pages(s3_bucket):
     static_pages_dir = Path("viraltenant-infrastructure/static-pages")
     if not static_pages_dir.exists():
         print("⚠️ Static pages directory not found, skipping...")
-        return
+        return []
     
+    uploaded = []
     try:
-        # List of static pages to deploy
-        static_pages = [
-            ("tenant-creation.html", "tenant-creation.html"),
-            ("tenant-creation.html", "tenant-registration.html"),  # Also deploy as tenant-registration.html for backward compatibility
-        ]
-        
-        for source_file, dest_file in static_pages:
+        for source_file, aliases in STATIC_PAGES.items():
             source_path = static_pages_dir / source_file
-            if source_path.exists():
-                print(f"\n📤 Uploading {dest_file} to S3...")
-                run_command(
-                    f'aws s3 cp "{source_path}" s3://{s3_bucket}/{dest_file} --content-type "text/html" --cache-control "public, max-age=3600"'
-                )
-                print(f"✅ {dest_file} uploaded")
-            else:
+            if not source_path.exists():
                 print(f"⚠️ {source_file} not found at {source_path}")
+                continue
+            
+            entries = {key: upload_entry(source_path, HTML_CACHE_CONTROL) for key in [source_file, *aliases]}
+            if not pending_uploads(s3_bucket, entries):
+                print(f"✅ {source_file} unchanged since the last upload, skipping")
+                continue
+            
+            print(f"\n📤 Uploading {source_file} to S3...")
+            body = precompress([source_path]).get(source_path)
+            encoding = CONTENT_ENCODING if body else None
+            upload_file(body or source_path, s3_bucket, source_file, content_type="text/html",
+                        cache_control=HTML_CACHE_CONTROL, content_encoding=encoding)
+            print(f"✅ {source_file} uploaded ({(body or source_path).stat().st_size} bytes, {encoding or 'uncompressed'})")
+            uploaded.append(source_file)
+            
+            # Aliases are copied server-side instead of uploading the same file again
+            for alias in aliases:
+                copy_object(s3_bucket, source_file, alias, content_type="text/html",
+                            cache_control=HTML_CACHE_CONTROL, content_encoding=encoding)
+                print(f"✅ {alias} copied from {source_file}")
+                uploaded.append(alias)
+            record_uploads(s3_bucket, entries)
         
         print("\n✅ Static pages deployment completed")
         
     except Exception as e:
         print(f"❌ Static pages deployment failed: {e}")
         print("⚠️ Continuing without static pages...")
+    
+    return uploaded
 
 def deploy_billing_dashboard(outputs):
     """Deploy Billing Admin Dashboard to its own S3 bucket"""
@@ -698,36 +441,38 @@ def deploy_billing_dashboard(outputs):
     print("📊 DEPLOYING BILLING ADMIN DASHBOARD")
     print("=" * 60)
     
-    billing_dir = Path("viraltenant-billing")
-    if not billing_dir.exists():
+    if not BILLING_DIR.exists():
         print("⚠️ Billing dashboard directory not found, skipping...")
         return
     
     # Get billing dashboard bucket from outputs
-    billing_bucket = outputs.get("billing_dashboard_bucket", {}).get("value")
-    billing_url = outputs.get("billing_dashboard_url", {}).get("value")
-    billing_cf_id = outputs.get("billing_dashboard_cloudfront_id", {}).get("value")
+    billing_bucket = outputs.billing_dashboard_bucket
+    billing_url = outputs.billing_dashboard_url
+    billing_cf_id = outputs.billing_dashboard_cloudfront_id
     
     if not billing_bucket:
         print("⚠️ Billing dashboard bucket not found in Terraform outputs, skipping...")
         return
     
     try:
-        # Upload billing dashboard files
-        print(f"\n📤 Uploading billing dashboard to S3: {billing_bucket}")
-        run_command(
-            f'aws s3 sync "{billing_dir}" s3://{billing_bucket}/ --delete'
-        )
-        print("✅ Billing dashboard uploaded")
+        with _billing_build_lock:
+            # Minify + content-hash app.js, rewrite index.html (see deploy_assets.py)
+            print("\n🔨 Building billing dashboard assets...")
+            cache_control = build_billing_dashboard()
+            for name in sorted(cache_control):
+                print(f"   - {name} ({cache_control[name]})")
+            
+            # Upload billing dashboard files (superseded hashed assets stay for a grace period)
+            print(f"\n📤 Uploading billing dashboard to S3: {billing_bucket}")
+            uploaded, deleted = sync_directory(
+                BILLING_BUILD_DIR, billing_bucket, delete=True,
+                cache_control=cache_control.get, keep=keep_recent_hashed_asset, compress=True,
+            )
+        print(f"✅ Billing dashboard uploaded ({len(uploaded)} changed, {len(deleted)} deleted)")
         
-        # Invalidate CloudFront cache
+        # Invalidate only what changed (new hashed assets were never cached)
         if billing_cf_id:
-            print(f"\n🔄 Invalidating CloudFront cache: {billing_cf_id}")
-            run_command(
-                f'aws cloudfront create-invalidation --distribution-id {billing_cf_id} --paths "/*"',
-                show_output=False
-            )
-            print("✅ CloudFront cache invalidated")
+            invalidate_cloudfront(billing_cf_id, [k for k in uploaded if not is_hashed_asset(k)] + deleted)
         
         print(f"\n🌐 Billing Dashboard URL: {billing_url}")
         
@@ -735,128 +480,349 @@ def deploy_billing_dashboard(outputs):
         print(f"❌ Billing dashboard deployment failed: {e}")
         print("⚠️ Continuing without billing dashboard...")
 
-def build_and_deploy_frontend(s3_bucket):
-    """Build and deploy React frontend"""
+FRONTEND_DIR = Path("viraltenant-react")
+FRONTEND_BUILD_HASH = CACHE_DIR / "frontend-build.sha256"  # source digest of the current dist
+
+def install_frontend_dependencies():
+    """Install React frontend npm dependencies"""
     print("\n" + "=" * 60)
-    print("⚛️ BUILDING AND DEPLOYING FRONTEND")
+    print("📦 INSTALLING FRONTEND DEPENDENCIES")
     print("=" * 60)
-    print(f"📦 Target S3 Bucket: {s3_bucket}")
     
-    frontend_dir = Path("viraltenant-react")
-    if not frontend_dir.exists():
+    if not FRONTEND_DIR.exists():
         print("❌ Frontend directory not found!")
         sys.exit(1)
     
     try:
-        # Install dependencies
+        # Restored from the node_modules cache when package-lock.json + Node version match
+        if restore_node_modules(FRONTEND_DIR, "npm install"):
+            return
         print("\n📦 Installing npm dependencies...")
-        run_command("npm install", cwd=frontend_dir)
-        
-        # Build frontend
+        run_command("npm install", cwd=FRONTEND_DIR)
+        save_node_modules(FRONTEND_DIR, "npm install")
+    except Exception as e:
+        print(f"❌ npm install failed: {e}")
+        sys.exit(1)
+
+def build_frontend():
+    """Build React frontend (Vite) into viraltenant-react/dist
+    
+    The bundle holds no environment values (see deploy_runtime_config), so an existing
+    dist built from the same sources is reused for every target.
+    """
+    print("\n" + "=" * 60)
+    print("🔨 BUILDING FRONTEND")
+    print("=" * 60)
+    
+    dist_dir = FRONTEND_DIR / "dist"
+    source_digest = tree_digest(FRONTEND_DIR, ignore={"dist", "node_modules"})
+    built_from = FRONTEND_BUILD_HASH.read_text().strip() if FRONTEND_BUILD_HASH.exists() else None
+    if dist_dir.exists() and built_from == source_digest:
+        print(f"✅ Sources unchanged since the last build ({source_digest[:12]}), reusing {dist_dir}")
+        return dist_dir
+    
+    try:
         print("\n🔨 Building React application...")
-        run_command("npm run build", cwd=frontend_dir)
+        run_command("npm run build", cwd=FRONTEND_DIR)
         
         # Check build output
-        dist_dir = frontend_dir / "dist"
         if not dist_dir.exists():
             print("❌ Build failed - dist directory not found!")
             sys.exit(1)
         
+        FRONTEND_BUILD_HASH.parent.mkdir(parents=True, exist_ok=True)
+        FRONTEND_BUILD_HASH.write_text(source_digest + "\n")
         print(f"✅ Build completed successfully!")
         print(f"📁 Build output: {dist_dir}")
+        return dist_dir
         
-        # Deploy to S3
+    except Exception as e:
+        print(f"❌ Frontend build failed: {e}")
+        sys.exit(1)
+
+def publish_frontend(s3_bucket):
+    """Upload the changed files of the built React frontend to S3; returns a PublishResult"""
+    print("\n" + "=" * 60)
+    print("📤 PUBLISHING FRONTEND")
+    print("=" * 60)
+    print(f"📦 Target S3 Bucket: {s3_bucket}")
+    
+    dist_dir = FRONTEND_DIR / "dist"
+    if not dist_dir.exists():
+        print("❌ dist directory not found - build the frontend first!")
+        sys.exit(1)
+    
+    try:
+        # Deploy to S3 (only what changed since the last publish, see deploy_publish.py)
         print(f"\n📤 Uploading to S3 bucket: {s3_bucket}")
-        
-        # Upload static assets with long cache (exclude invoices, config, assets, and static pages that are managed separately)
-        print("📄 Uploading static assets (CSS, JS, images)...")
-        run_command(f'aws s3 sync "{dist_dir}" s3://{s3_bucket}/ --delete --cache-control "public, max-age=31536000" --exclude "*.html" --exclude "invoices/*" --exclude "config/*" --exclude "assets/viraltenant-logo.png" --exclude "tenant-creation.html" --exclude "tenant-registration.html"')
-        
-        # Upload HTML files with short cache
-        print("📄 Uploading HTML files...")
-        run_command(f'aws s3 sync "{dist_dir}" s3://{s3_bucket}/ --exclude "*" --include "*.html" --cache-control "public, max-age=3600"')
+        result = publish(dist_dir, s3_bucket)
         
         print("✅ Frontend deployed successfully!")
+        return result
         
     except Exception as e:
         print(f"❌ Frontend deployment failed: {e}")
         sys.exit(1)
 
-def invalidate_cloudfront(distribution_id):
-    """Invalidate CloudFront cache"""
+def build_and_deploy_frontend(s3_bucket):
+    """Build and deploy React frontend"""
+    install_frontend_dependencies()
+    build_frontend()
+    publish_frontend(s3_bucket)
+
+def invalidate_cloudfront(distribution_id, changed_keys=None):
+    """Invalidate the CloudFront paths of changed S3 keys (None = everything)
+    
+    Paths are collapsed to directory wildcards where that is cheaper and fall back to "/*"
+    above INVALIDATION_MAX_PATHS; nothing changed means no invalidation at all.
+    """
     print("\n" + "=" * 60)
     print("🔄 INVALIDATING CLOUDFRONT CACHE")
     print("=" * 60)
     print(f"🌐 Distribution ID: {distribution_id}")
     
+    paths = ["/*"] if changed_keys is None else invalidation_paths(changed_keys)
+    if not paths:
+        print("✅ No deployed objects changed, skipping invalidation")
+        return
+    
     try:
-        print("\n🚀 Creating CloudFront invalidation...")
-        result = run_command(f'aws cloudfront create-invalidation --distribution-id {distribution_id} --paths "/*"', show_output=False)
-        
-        if result.stdout:
-            try:
-                data = json.loads(result.stdout)
-                invalidation_id = data["Invalidation"]["Id"]
-                status = data["Invalidation"]["Status"]
-                
-                print(f"✅ Invalidation created successfully!")
-                print(f"🆔 Invalidation ID: {invalidation_id}")
-                print(f"📊 Status: {status}")
-                print("⏳ Cache invalidation is in progress...")
-                print("💡 It may take 5-15 minutes to complete globally")
-                
-            except json.JSONDecodeError:
-                print("⚠️ Invalidation created but could not parse response")
-        else:
-            print("⚠️ Invalidation command completed but no output received")
+        print(f"\n🚀 Creating CloudFront invalidation for {len(paths)} path(s): {', '.join(paths)}")
+        invalidation = create_invalidation(distribution_id, paths)
+        
+        print(f"✅ Invalidation created successfully!")
+        print(f"🆔 Invalidation ID: {invalidation['Id']}")
+        print(f"📊 Status: {invalidation['Status']}")
+        print("⏳ Cache invalidation is in progress...")
+        print("💡 It may take 5-15 minutes to complete globally")
             
     except Exception as e:
         print(f"❌ CloudFront invalidation failed: {e}")
         print("⚠️ Website may still work but cache might be stale")
         # Don't exit here, as this is not critical
 
-def update_frontend_config(outputs):
-    """Update frontend configuration with Terraform outputs"""
+def deploy_runtime_config(outputs):
+    """Publish the frontend runtime config (API URL, Cognito IDs) next to the bundle
+    
+    The React build reads these values from /runtime-config.json at startup instead of
+    having them compiled in, so the same dist works in every environment.
+    """
     print("\n" + "=" * 60)
-    print("⚙️ UPDATING FRONTEND CONFIGURATION")
+    print("⚙️ PUBLISHING FRONTEND RUNTIME CONFIG")
     print("=" * 60)
     
     try:
-        config_path = Path("viraltenant-react/src/config/aws-config.ts")
-        if not config_path.exists():
-            print("❌ Frontend config file not found!")
-            return
-        
-        # Read current config
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config_content = f.read()
-        
-        # Extract values from Terraform outputs
-        api_url = outputs.get("api_gateway_url", {}).get("value", "")
-        user_pool_id = outputs.get("cognito_user_pool_id", {}).get("value", "")
-        client_id = outputs.get("cognito_client_id", {}).get("value", "")
-        
-        if api_url and user_pool_id and client_id:
-            print(f"🔧 API Gateway URL: {api_url}")
-            print(f"🔧 User Pool ID: {user_pool_id}")
-            print(f"🔧 Client ID: {client_id}")
-            
-            # Replace placeholders
-            config_content = config_content.replace('API_GATEWAY_URL_PLACEHOLDER', api_url)
-            config_content = config_content.replace('USER_POOL_ID_PLACEHOLDER', user_pool_id)
-            config_content = config_content.replace('CLIENT_ID_PLACEHOLDER', client_id)
-            
-            # Write updated config
-            with open(config_path, 'w', encoding='utf-8') as f:
-                f.write(config_content)
-            
-            print("✅ Frontend configuration updated successfully!")
-        else:
-            print("⚠️ Missing required Terraform outputs for frontend config")
-            
+        return publish_runtime_config(outputs.s3_bucket_name, outputs)
     except Exception as e:
-        print(f"❌ Failed to update frontend config: {e}")
-        # Don't exit, as this is not critical
+        # Without it the frontend would fall back to the defaults in aws-config.ts
+        print(f"❌ Failed to publish runtime config: {e}")
+        sys.exit(1)
+
+def stale_keys(results, prefix=""):
+    """Keys of the website bucket replaced or deleted by the upload stages of a run (of one target)"""
+    keys = set(results.get(prefix + "static_pages") or []) | set(results.get(prefix + "billing_config") or [])
+    if results.get(prefix + "frontend_publish") is not None:
+        keys.update(results[prefix + "frontend_publish"].stale)
+    return sorted(keys)
+
+def frontend_deploy_stages(outputs):
+    """Stage graph for --frontend: npm install/build run alongside the static page and runtime config upload"""
+    s3_bucket = outputs.s3_bucket_name
+    cloudfront_id = outputs.cloudfront_distribution_id
+    return [
+        Stage("static_pages", lambda r: deploy_static_pages(s3_bucket)),
+        Stage("runtime_config", lambda r: deploy_runtime_config(outputs)),
+        Stage("frontend_install", lambda r: install_frontend_dependencies(), tag="npm"),
+        Stage("frontend_build", lambda r: build_frontend(), deps=["frontend_install"], tag="vite"),
+        Stage("frontend_publish", lambda r: publish_frontend(s3_bucket), deps=["runtime_config", "frontend_build"],
+              tag="s3"),
+        Stage("invalidate", lambda r: invalidate_cloudfront(cloudfront_id, stale_keys(r)),
+              deps=["frontend_publish", "static_pages"], tag="cloudfront"),
+    ]
+
+def apply_infrastructure(full=False, auto_approve=False, workspace=DEFAULT_WORKSPACE):
+    """Terraform stage of the full deployment - returns outputs, fails without bucket/CloudFront"""
+    outputs = deploy_infrastructure(full=full, auto_approve=auto_approve, workspace=workspace)
+    
+    s3_bucket = outputs.s3_bucket_name
+    cloudfront_id = outputs.cloudfront_distribution_id
+    
+    print(f"\n📋 Deployment Configuration:")
+    print(f"  S3 Bucket: {s3_bucket}")
+    print(f"  CloudFront ID: {cloudfront_id}")
+    print(f"  Website URL: {outputs.website_url}")
+    print(f"  CloudFront URL: {outputs.cloudfront_url}")
+    print(f"  API Gateway URL: {outputs.api_gateway_url}")
+    
+    if not s3_bucket or not cloudfront_id:
+        print("\n❌ DEPLOYMENT FAILED!")
+        print("Could not get S3 bucket or CloudFront distribution ID from Terraform outputs")
+        print("\n📋 Available Terraform outputs:")
+        for key, value in outputs.raw.items():
+            print(f"  {key}: {value}")
+        sys.exit(1)
+    
+    return outputs
+
+def layer_inputs():
+    """Dependency hashes of the common-deps and slim layers, and what was last built"""
+    groups = {g: [h, read_recorded_hash(t)] for g, (t, h) in group_layer_targets().items()}
+    return [dependency_hash(LAYER_TARGET), read_recorded_hash(LAYER_TARGET), groups]
+
+def package_inputs(force_rebuild):
+    """Source hash of every Lambda target (and whether its ZIP is still there)"""
+    return [force_rebuild] + [
+        [t.name, source_hash(t, collect_files(t)), Path(t.zip_path).exists()]
+        for t in select_targets() if Path(t.source_dir).exists()
+    ]
+
+def terraform_inputs(full_apply, workspace=DEFAULT_WORKSPACE):
+    """Module fingerprints plus the remote state version (someone else may have applied)"""
+    return [full_apply, current_fingerprints(), state_version(workspace=workspace)]
+
+def target_workspace(target):
+    """Terraform workspace of a DeploymentTarget (deployment_config.py)
+
+    Every target of a fan-out gets a named workspace with its own working dir; a target
+    without its own state key uses the backend key from main.tf.
+    """
+    return TerraformWorkspace(
+        target.name, state_key=target.state_key, var_files=target.tfvars,
+        variables={"environment": target.environment, "aws_region": target.region},
+    )
+
+def select_deployment_targets(names=None):
+    """Configured deployment targets, optionally filtered by name (--targets)
+
+    Exits on an invalid configuration (e.g. two targets sharing a name or a state_key, which
+    would plan and apply both against one backend state) and on unknown names.
+    """
+    errors = config.validate()
+    if errors:
+        print("❌ Invalid deployment configuration:")
+        for error in errors:
+            print(f"  - {error}")
+        print("💡 Fix deployment_config.py and run again")
+        sys.exit(1)
+    
+    targets = config.DEPLOYMENT_TARGETS
+    if not names:
+        return list(targets)
+    known = {t.name: t for t in targets}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        print(f"❌ Unknown deployment target(s): {', '.join(unknown)}")
+        print(f"💡 Configured targets: {', '.join(known)}")
+        sys.exit(1)
+    return [known[name] for name in dict.fromkeys(names)]  # --targets a,a deploys a once
+
+def full_deploy_stages(force_rebuild=False, full_apply=False, auto_approve=False, targets=None):
+    """Stage graph for the full deployment
+
+    Layer build, Lambda packaging and npm install start immediately; everything that
+    needs Terraform outputs (S3 uploads, frontend config) waits for the terraform stage.
+    Every stage declares its inputs, so --resume can skip what already succeeded.
+
+    With targets (DeploymentTargets) the artifacts and the frontend are built once and the
+    Terraform/upload/invalidation stages run per target ("<target>/terraform", ...), each
+    target in its own workspace and with its own runtime config next to the same bundle.
+    """
+    static_page_files = [f"viraltenant-infrastructure/static-pages/{name}" for name in STATIC_PAGES]
+    
+    stages = [
+        Stage("layer", lambda r: build_lambda_layer(), inputs=lambda r: layer_inputs()),
+        Stage("package", lambda r: package_lambdas(force=force_rebuild),
+              inputs=lambda r: package_inputs(force_rebuild)),
+        Stage("frontend_install", lambda r: install_frontend_dependencies(), tag="npm",
+              inputs=lambda r: [cache_key(FRONTEND_DIR, "npm install"), (FRONTEND_DIR / "node_modules").exists()]),
+        Stage("frontend_build", lambda r: build_frontend(),
+              deps=["frontend_install"], tag="vite",
+              inputs=lambda r: [tree_digest(FRONTEND_DIR, ignore={"dist", "node_modules"}),
+                                (FRONTEND_DIR / "dist").exists()]),
+    ]
+    
+    if not targets:
+        return stages + target_stages("", DEFAULT_WORKSPACE, full_apply, auto_approve, static_page_files)
+    
+    for target in targets:
+        stages += target_stages(f"{target.name}/", target_workspace(target), full_apply, auto_approve,
+                                static_page_files)
+    return stages
+
+def target_stages(prefix, workspace, full_apply, auto_approve, static_page_files):
+    """Terraform, S3 upload and invalidation stages of one deployment target (names start with prefix)"""
+    billing_files = ("viraltenant-infrastructure/config/billing-config.json",
+                     "viraltenant-infrastructure/assets/viraltenant-logo.png")
+    terraform = prefix + "terraform"
+    
+    def bucket(results):
+        return results[terraform].s3_bucket_name
+    
+    def distribution(results):
+        return results[terraform].cloudfront_distribution_id
+    
+    def outputs(results):
+        return results[terraform].raw
+    
+    return [
+        Stage(terraform, lambda r: apply_infrastructure(full=full_apply, auto_approve=auto_approve,
+                                                        workspace=workspace),
+              deps=["layer", "package"], inputs=lambda r: terraform_inputs(full_apply, workspace),
+              restore=lambda saved: TerraformOutputs(saved["raw"])),
+        Stage(prefix + "billing_config", lambda r: deploy_billing_config(bucket(r)), deps=[terraform],
+              inputs=lambda r: [bucket(r), files_digest(*billing_files)]),
+        Stage(prefix + "billing_dashboard", lambda r: deploy_billing_dashboard(r[terraform]), deps=[terraform],
+              inputs=lambda r: [outputs(r), tree_digest(BILLING_DIR, ignore={"dist", "node_modules"})]),
+        Stage(prefix + "static_pages", lambda r: deploy_static_pages(bucket(r)), deps=[terraform],
+              inputs=lambda r: [bucket(r), files_digest(*static_page_files)]),
+        Stage(prefix + "runtime_config", lambda r: deploy_runtime_config(r[terraform]), deps=[terraform],
+              inputs=outputs),
+        # The runtime config goes up first so a new bundle never starts without it
+        Stage(prefix + "frontend_publish", lambda r: publish_frontend(bucket(r)),
+              deps=[prefix + "runtime_config", "frontend_build"], tag=f"{prefix}s3",
+              inputs=lambda r: [bucket(r), local_manifest(FRONTEND_DIR / "dist")],
+              restore=lambda saved: PublishResult(**saved)),
+        Stage(prefix + "invalidate", lambda r: invalidate_cloudfront(distribution(r), stale_keys(r, prefix)),
+              deps=[prefix + "frontend_publish", prefix + "static_pages", prefix + "billing_config"],
+              tag=f"{prefix}cloudfront", inputs=lambda r: [distribution(r), stale_keys(r, prefix)]),
+    ]
+
+def print_target_table(stages, targets, results):
+    """Combined status of a multi-target deployment: one row per target"""
+    by_name = {stage.name: stage for stage in stages}
+    
+    def status(target, stage):
+        stage = by_name[f"{target.name}/{stage}"]
+        return f"{STATUS_ICONS.get(stage.status, '•')} {stage.status}"
+    
+    print("\n" + "=" * 78)
+    print("🎯 DEPLOYMENT TARGETS")
+    print("=" * 78)
+    print(f"{'Target':<16} {'Environment / Region':<26} {'Terraform':<12} {'Publish':<12} URL")
+    print("-" * 78)
+    for target in targets:
+        outputs = results.get(f"{target.name}/terraform")
+        url = outputs.website_url if outputs is not None else "-"
+        print(f"{target.name:<16} {target.environment + ' / ' + target.region:<26} "
+              f"{status(target, 'terraform'):<12} {status(target, 'frontend_publish'):<12} {url or '-'}")
+        failed = [s for s in stages if s.name.startswith(f"{target.name}/") and s.status == "failed"]
+        for stage in failed:
+            print(f"   └─ {stage.name}: {stage.error}")
+    print("-" * 78)
+
+def run_stage_graph(stages, checkpoints=None, resume=False):
+    """run_stages plus per-stage timings for the deploy report"""
+    try:
+        return run_stages(stages, checkpoints=checkpoints, resume=resume)
+    finally:
+        record_stages(stages)
+
+def deploy_mode(args):
+    """Name of the selected deploy mode (used to group runs in the report history)"""
+    for mode in ("frontend", "infrastructure", "crosspost", "billing"):
+        if getattr(args, mode):
+            return mode
+    return "full"
 
 def main():
     """Main deployment function"""
@@ -870,6 +836,18 @@ Examples:
   python deploy.py --frontend         # Frontend only
   python deploy.py --infrastructure   # Infrastructure only
   python deploy.py --billing          # Billing system only
+  python deploy.py --rebuild          # Full deployment, ignore Lambda build cache
+  python deploy.py --billing --ignore-budgets   # Deploy even if a ZIP is over its size budget
+  python deploy.py --full             # Full deployment, apply every Terraform module
+  python deploy.py --resume           # Continue a failed/interrupted full deployment
+  python deploy.py --targets staging  # Full deployment to some of the DEPLOYMENT_TARGETS only
+  python deploy.py --infrastructure --auto-approve   # Apply the saved plan without prompting
+  python deploy.py --compare          # Compare the last run with the rolling baseline
+  python deploy.py --plan             # Show what a full deployment would change (no AWS writes)
+  python deploy.py --plan -           # Same, as JSON on stdout
+  python deploy.py --analyze-layers   # Show which layer packages each Lambda loads
+  python deploy.py --coldstart 10     # Measure Lambda module init time locally (10 runs each)
+  python deploy.py --watch tenant-crosspost-tiktok   # Push every source change straight to the function
         """
     )
     
@@ -893,9 +871,118 @@ Examples:
         action='store_true',
         help='Deploy only the crosspost lambdas (Instagram, TikTok, WhatsApp, etc.)'
     )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Apply the whole Terraform configuration instead of only changed modules'
+    )
+    parser.add_argument(
+        '--auto-approve',
+        action='store_true',
+        help='Apply the saved Terraform plan without asking for confirmation'
+    )
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Rebuild all Lambda ZIPs even if their sources are unchanged (ignore build cache)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Full deployment: skip stages that succeeded before and whose inputs are unchanged'
+    )
+    parser.add_argument(
+        '--targets',
+        type=lambda value: [name.strip() for name in value.split(',') if name.strip()],
+        metavar='NAME,...',
+        help='Full deployment: deploy to these DEPLOYMENT_TARGETS (deployment_config.py) only (default: all)'
+    )
+    parser.add_argument(
+        '--ignore-budgets',
+        action='store_true',
+        help='Report Lambda/layer ZIPs over their size budget but deploy them anyway'
+    )
+    parser.add_argument(
+        '--plan',
+        nargs='?',
+        const=str(PLAN_OUTPUT),
+        metavar='FILE',
+        help=f'Predict rebuilds, Terraform targets, S3 changes and invalidations of a full deployment '
+             f'from local hashes and cached manifests, write them as JSON (default: {PLAN_OUTPUT}, "-" = stdout) and exit'
+    )
+    parser.add_argument(
+        '--compare',
+        action='store_true',
+        help='Compare the last deploy report with the rolling baseline and exit'
+    )
+    parser.add_argument(
+        '--slower-pct',
+        type=float,
+        default=DEFAULT_SLOWER_PCT,
+        help=f'--compare: flag stages more than this %% slower (default: {DEFAULT_SLOWER_PCT:.0f})'
+    )
+    parser.add_argument(
+        '--larger-pct',
+        type=float,
+        default=DEFAULT_LARGER_PCT,
+        help=f'--compare: flag packages more than this %% larger (default: {DEFAULT_LARGER_PCT:.0f})'
+    )
+    parser.add_argument(
+        '--analyze-layers',
+        action='store_true',
+        help='Report which common-deps layer packages each Lambda function requires and exit'
+    )
+    parser.add_argument(
+        '--watch',
+        metavar='FUNCTION',
+        help='Watch one Lambda target (name from LAMBDA_TARGETS), rebuild and push it with '
+             'UpdateFunctionCode on every change; Terraform is reconciled by the next deploy'
+    )
+    parser.add_argument(
+        '--coldstart',
+        nargs='?',
+        type=int,
+        const=COLDSTART_RUNS,
+        metavar='RUNS',
+        help=f'Benchmark handler init time and memory of every Lambda in local node and exit (default: {COLDSTART_RUNS} runs)'
+    )
     
     args = parser.parse_args()
     
+    if args.coldstart is not None and args.coldstart < 1:
+        parser.error("--coldstart: RUNS must be at least 1")
+    
+    if args.analyze_layers:
+        print_report(analyze())
+        return
+    
+    if args.watch:
+        sys.exit(watch(args.watch))
+    
+    if args.coldstart is not None:
+        print_results(run_benchmarks(args.coldstart))
+        return
+    
+    if args.plan:
+        plan = build_plan(force=args.rebuild, full=args.full)
+        write_plan(plan, args.plan)
+        if args.plan != "-":
+            print_plan(plan, args.plan)
+        return
+    
+    if args.compare:
+        regressions = print_comparison(args.slower_pct, args.larger_pct)
+        sys.exit(1 if regressions else 0)
+    
+    if args.ignore_budgets:
+        ignore_budgets()
+    
+    # Every run writes a report (stage timings, package sizes, uploads) to .deploy-cache/
+    with deploy_run(deploy_mode(args)):
+        run_deploy(args)
+
+def run_deploy(args):
+    """Run the deploy mode selected on the command line"""
     # If --frontend flag is set, only deploy frontend
     if args.frontend:
         print("🚀 VIRALTENANT FRONTEND DEPLOYMENT")
@@ -905,25 +992,14 @@ Examples:
         
         try:
             # Get Terraform outputs to find S3 bucket and CloudFront ID
-            print("\n📋 Reading Terraform outputs...")
-            infra_dir = Path("viraltenant-infrastructure")
-            result = subprocess.run(
-                "terraform output -json",
-                shell=True,
-                cwd=infra_dir,
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                print("❌ Failed to read Terraform outputs!")
+            outputs = get_outputs()
+            if outputs is None:
                 print("Make sure infrastructure is deployed first")
                 sys.exit(1)
             
-            outputs = json.loads(result.stdout)
-            s3_bucket = outputs.get("s3_bucket_name", {}).get("value")
-            cloudfront_id = outputs.get("cloudfront_distribution_id", {}).get("value")
-            website_url = outputs.get("website_url", {}).get("value")
+            s3_bucket = outputs.s3_bucket_name
+            cloudfront_id = outputs.cloudfront_distribution_id
+            website_url = outputs.website_url
             
             if not s3_bucket or not cloudfront_id:
                 print("❌ Could not find S3 bucket or CloudFront ID in Terraform outputs!")
@@ -932,14 +1008,8 @@ Examples:
             print(f"✅ Found S3 bucket: {s3_bucket}")
             print(f"✅ Found CloudFront ID: {cloudfront_id}")
             
-            # Deploy static pages (tenant-creation, etc.)
-            deploy_static_pages(s3_bucket)
-            
-            # Build and deploy frontend
-            build_and_deploy_frontend(s3_bucket)
-            
-            # Invalidate CloudFront
-            invalidate_cloudfront(cloudfront_id)
+            # Static pages, runtime config, npm install/build, S3 upload and invalidation as a stage graph
+            run_stage_graph(frontend_deploy_stages(outputs))
             
             # Final summary
             print("\n" + "=" * 60)
@@ -967,40 +1037,28 @@ Examples:
         
         try:
             # Build Lambda Layer FIRST
-            build_lambda_layer()
-            
-            # Deploy auth handler
-            deploy_auth_handler()
+            with timed("layer"):
+                build_lambda_layer()
             
-            # Deploy tenant management
-            deploy_tenant_management()
+            # Package auth handler, tenant management, authorizer, billing + Stripe Lambdas
+            with timed("package"):
+                package_lambdas(INFRASTRUCTURE_GROUPS, force=args.rebuild)
             
-            # Deploy billing system
-            deploy_billing_system()
-            
-            # Deploy billing cron
-            deploy_billing_cron()
-            
-            # Deploy tenant authorizer
-            deploy_tenant_authorizer()
-            
-            # Deploy Stripe Lambdas (EventBridge + Webhook)
-            deploy_stripe_webhook()
-            deploy_stripe_eventbridge_handler()
-            
-            # Deploy infrastructure
-            outputs = deploy_infrastructure()
+            # Deploy infrastructure (only changed modules unless --full)
+            with timed("terraform"):
+                outputs = deploy_infrastructure(full=args.full, auto_approve=args.auto_approve)
             
             # Update frontend configuration
-            update_frontend_config(outputs)
+            # Publish the frontend runtime config (the deployed bundle picks it up without a rebuild)
+            with timed("runtime_config"):
+                deploy_runtime_config(outputs)
             
             # Final summary
             print("\n" + "=" * 60)
             print("🎉 INFRASTRUCTURE DEPLOYMENT COMPLETED!")
             print("=" * 60)
             
-            api_url = outputs.get("api_gateway_url", {}).get("value")
-            print(f"⚡ API Gateway URL: {api_url}")
+            print(f"⚡ API Gateway URL: {outputs.api_gateway_url}")
             print("\n✅ Infrastructure is now deployed!")
             print("💳 Stripe EventBridge Integration: Ready")
             print("💡 Run 'python deploy.py --frontend' to deploy the frontend")
@@ -1021,18 +1079,31 @@ Examples:
         
         try:
             # Build Lambda Layer (dependencies)
-            build_lambda_layer()
-            
-            # Deploy crosspost lambdas (creates ZIP files)
-            deploy_crosspost_lambdas()
+            with timed("layer"):
+                build_lambda_layer()
             
-            # Deploy WhatsApp lambdas
-            deploy_whatsapp_lambdas()
+            # Package crosspost + WhatsApp lambdas (creates ZIP files)
+            with timed("package"):
+                package_lambdas(CROSSPOST_GROUPS, force=args.rebuild)
             
-            # Apply Terraform for crosspost and whatsapp modules
-            print("\n🏗️ Applying Terraform for crosspost and whatsapp modules...")
+            # Apply Terraform for the crosspost and whatsapp modules that changed
             infra_dir = Path("viraltenant-infrastructure")
-            run_command('terraform apply -target="module.tenant_crosspost" -target="module.tenant_whatsapp" -var-file=terraform.tfvars', cwd=infra_dir)
+            scope = module_targets(CROSSPOST_MODULES)
+            fingerprints = current_fingerprints(infra_dir)
+            if args.full:
+                targets = scope
+            else:
+                targets, reason = plan_targets(fingerprints, infra_dir)
+                targets = scope if targets is None else [t for t in targets if t in scope]
+            
+            if targets:
+                print(f"\n🏗️ Applying Terraform for {', '.join(targets)}...")
+                with timed("terraform"):
+                    terraform_init(infra_dir)
+                    terraform_plan_and_apply(infra_dir, targets, auto_approve=args.auto_approve)
+                record_applied(fingerprints, targeted_modules(targets))
+            else:
+                print("\n✅ Crosspost and WhatsApp modules unchanged, skipping Terraform apply")
             
             print("\n" + "=" * 60)
             print("🎉 CROSSPOST LAMBDAS DEPLOYMENT COMPLETED!")
@@ -1057,35 +1128,24 @@ Examples:
         
         try:
             # Build Lambda Layer
-            build_lambda_layer()
-            
-            # Deploy billing system
-            deploy_billing_system()
+            with timed("layer"):
+                build_lambda_layer()
             
-            # Deploy billing cron
-            deploy_billing_cron()
-            
-            # Deploy Stripe Lambdas
-            deploy_stripe_webhook()
-            deploy_stripe_eventbridge_handler()
+            # Package billing API, billing cron and Stripe Lambdas
+            with timed("package"):
+                package_lambdas(BILLING_GROUPS, force=args.rebuild)
             
             # Get Terraform outputs
-            infra_dir = Path("viraltenant-infrastructure")
-            result = subprocess.run(
-                "terraform output -json",
-                shell=True,
-                cwd=infra_dir,
-                capture_output=True,
-                text=True
-            )
+            outputs = get_outputs()
             
-            if result.returncode == 0:
-                outputs = json.loads(result.stdout)
-                s3_bucket = outputs.get("s3_bucket_name", {}).get("value")
+            if outputs is not None:
+                s3_bucket = outputs.s3_bucket_name
                 
                 if s3_bucket:
-                    deploy_billing_config(s3_bucket)
-                    deploy_billing_dashboard(outputs)
+                    with timed("billing_config"):
+                        deploy_billing_config(s3_bucket)
+                    with timed("billing_dashboard"):
+                        deploy_billing_dashboard(outputs)
             
             print("\n" + "=" * 60)
             print("🎉 BILLING DEPLOYMENT COMPLETED!")
@@ -1106,80 +1166,38 @@ Examples:
     print("⏰ This may take several minutes to complete")
     print("=" * 60)
     
+    targets = select_deployment_targets(args.targets)
+    if len(targets) == 1 and targets[0].state_key is None:
+        targets = None  # classic single deployment (state and .terraform as configured in main.tf)
+    else:
+        print(f"🎯 Targets: {', '.join(f'{t.name} ({t.environment}/{t.region})' for t in targets)}")
+    
     try:
-        # Build Lambda Layer FIRST (dependencies for all Lambdas)
-        build_lambda_layer()
-        
-        # Deploy auth handler (creates ZIP needed by Terraform)
-        deploy_auth_handler()
-        
-        # Deploy tenant management (creates ZIP needed by Terraform)
-        deploy_tenant_management()
-        
-        # Deploy billing system (creates ZIP files needed by Terraform)
-        deploy_billing_system()
-        
-        # Deploy billing cron (monthly invoices) - creates ZIP needed by Terraform
-        deploy_billing_cron()
-        
-        # Deploy tenant authorizer (with billing-admin support)
-        deploy_tenant_authorizer()
-        
-        # Deploy Stripe Lambdas (EventBridge + Webhook)
-        deploy_stripe_webhook()
-        deploy_stripe_eventbridge_handler()
-        
-        # Deploy Crosspost Lambdas (TikTok, YouTube, Instagram, etc.)
-        deploy_crosspost_lambdas()
-        
-        # Deploy WhatsApp Lambdas (AWS End User Messaging Social)
-        deploy_whatsapp_lambdas()
-        
-        # Deploy Membership Lambda (Mollie Split Payments)
-        deploy_membership_lambda()
-        
-        # Deploy infrastructure (uses the ZIP files created above)
-        outputs = deploy_infrastructure()
+        # Layer, Lambda packaging, Terraform, S3 uploads, frontend build and
+        # invalidation run as a dependency graph (independent stages concurrently)
+        # Each successful stage is checkpointed, --resume skips those with unchanged inputs
+        stages = full_deploy_stages(
+            force_rebuild=args.rebuild, full_apply=args.full, auto_approve=args.auto_approve, targets=targets
+        )
+        results = {}
+        try:
+            results = run_stage_graph(stages, checkpoints=Checkpoints("full"), resume=args.resume)
+        finally:
+            if targets:
+                print_target_table(stages, targets, results)
         
-        # Update frontend configuration with new API endpoints
-        update_frontend_config(outputs)
+        if targets:
+            print("\n🎉 DEPLOYMENT COMPLETED SUCCESSFULLY FOR ALL TARGETS!")
+            print("⏰ Cache invalidation may take 5-15 minutes to complete globally")
+            return
         
         # Extract deployment info
-        s3_bucket = outputs.get("s3_bucket_name", {}).get("value")
-        cloudfront_id = outputs.get("cloudfront_distribution_id", {}).get("value")
-        website_url = outputs.get("website_url", {}).get("value")
-        cloudfront_url = outputs.get("quick_start_urls", {}).get("value", {}).get("cloudfront_url")
-        api_url = outputs.get("api_gateway_url", {}).get("value")
-        
-        print(f"\n📋 Deployment Configuration:")
-        print(f"  S3 Bucket: {s3_bucket}")
-        print(f"  CloudFront ID: {cloudfront_id}")
-        print(f"  Website URL: {website_url}")
-        print(f"  CloudFront URL: {cloudfront_url}")
-        print(f"  API Gateway URL: {api_url}")
-        
-        if not s3_bucket or not cloudfront_id:
-            print("\n❌ DEPLOYMENT FAILED!")
-            print("Could not get S3 bucket or CloudFront distribution ID from Terraform outputs")
-            print("\n📋 Available Terraform outputs:")
-            for key, value in outputs.items():
-                print(f"  {key}: {value}")
-            sys.exit(1)
-        
-        # Deploy billing configuration and logo to S3
-        deploy_billing_config(s3_bucket)
-        
-        # Deploy billing admin dashboard (to its own bucket)
-        deploy_billing_dashboard(outputs)
-        
-        # Deploy static pages (tenant-creation, etc.)
-        deploy_static_pages(s3_bucket)
-        
-        # Deploy frontend
-        build_and_deploy_frontend(s3_bucket)
-        
-        # Invalidate CloudFront
-        invalidate_cloudfront(cloudfront_id)
+        outputs = results["terraform"]
+        s3_bucket = outputs.s3_bucket_name
+        cloudfront_id = outputs.cloudfront_distribution_id
+        website_url = outputs.website_url
+        cloudfront_url = outputs.cloudfront_url
+        api_url = outputs.api_gateway_url
         
         # Final summary
         print("\n" + "=" * 60)
@@ -1192,7 +1210,7 @@ Examples:
         print(f"🔄 CloudFront Distribution: {cloudfront_id}")
         
         # Billing Dashboard URL
-        billing_url = outputs.get("billing_dashboard_url", {}).get("value")
+        billing_url = outputs.billing_dashboard_url
         if billing_url:
             print(f"\n📊 Billing Dashboard: {billing_url}")
         
@@ -1221,7 +1239,7 @@ Examples:
         
     except KeyboardInterrupt:
         print("\n\n⚠️ Deployment interrupted by user")
-        print("🔄 You can resume by running the script again")
+        print("🔄 Resume with: python deploy.py --resume (stages that already succeeded are skipped)")
         sys.exit(1)
     except Exception as e:
         print(f"\n\n❌ DEPLOYMENT FAILED!")
@@ -1232,6 +1250,7 @@ Examples:
         print("3. Ensure Node.js and npm are installed")
         print("4. Check the error messages above for specific issues")
         print("5. Review BILLING_TROUBLESHOOTING.md for billing-specific issues")
+        print("6. After fixing the cause, continue with: python deploy.py --resume")
         sys.exit(1)
 
 if __name__ == "__main__":
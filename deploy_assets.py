@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Static Asset Pipeline
+Builds viraltenant-billing for upload: app.js is minified and written under a content-hash
+file name, index.html is rewritten to reference it, so the script can be cached forever
+"""
+
+import re
+import shutil
+import hashlib
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+BILLING_DIR = Path("viraltenant-billing")
+BILLING_BUILD_DIR = BILLING_DIR / "dist"
+
+# Hashed assets never change under their name, index.html must pick up new hashes quickly
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+INDEX_CACHE_CONTROL = "public, max-age=300, must-revalidate"
+HASH_LENGTH = 10
+
+# Superseded hashed assets stay online this long for pages that are still open or cached
+HASHED_ASSET_GRACE = timedelta(days=7)
+
+# Local <script src> / <link href> references in index.html (absolute URLs are left alone)
+_ASSET_REF = re.compile(r'(\b(?:src|href)=")((?![a-z]+:|//)[^"?#]+\.(?:js|css))(?:\?[^"]*)?(")')
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{%d}\.(?:js|css)$" % HASH_LENGTH)
+
+# After these characters (or keywords) a "/" starts a regular expression, not a division
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+                   "throw", "case", "do", "else", "yield", "await"}
+
+
+def _is_word(char):
+    return char.isalnum() or char in "_$" or ord(char) > 127
+
+
+def _skip_string(source, i, quote):
+    """Index after the string literal starting at source[i] (the opening quote)"""
+    i += 1
+    while i < len(source):
+        if source[i] == "\\":
+            i += 2
+            continue
+        if source[i] == quote:
+            return i + 1
+        i += 1
+    raise ValueError("unterminated string literal")
+
+
+def _skip_regex(source, i):
+    """Index after the regex literal (including flags) starting at source[i]"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            raise ValueError("unterminated regular expression")
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(source) and _is_word(source[i]):
+                i += 1
+            return i
+        i += 1
+    raise ValueError("unterminated regular expression")
+
+
+def minify_js(source):
+    """Conservative JavaScript minifier: drops comments, indentation and blank lines
+
+    String, template and regex literals are copied verbatim. Line breaks are kept (one per
+    line) so automatic semicolon insertion behaves exactly as in the source.
+    """
+    out = []
+    templates = []  # brace depth of each open ${...} inside a template literal
+    last = ""       # last significant character written
+    word = ""       # last identifier written (for keyword-before-regex detection)
+    pending = ""    # whitespace seen since the last token: "", " " or "\n"
+    i = 0
+    n = len(source)
+
+    def emit(text):
+        nonlocal last, pending
+        if pending == "\n" and out:
+            out.append("\n")
+        elif pending == " " and last and _is_word(last) and _is_word(text[0]):
+            out.append(" ")
+        elif pending == " " and last in "+-" and text[0] == last:
+            out.append(" ")  # a + +b, a - -b
+        pending = ""
+        out.append(text)
+        last = text[-1]
+
+    def template_from(i):
+        """Copy a template literal chunk from source[i] up to the closing ` or a ${"""
+        start = i
+        while i < n:
+            if source[i] == "\\":
+                i += 2
+                continue
+            if source[i] == "`":
+                return i + 1, source[start:i + 1], False
+            if source.startswith("${", i):
+                return i + 2, source[start:i + 2], True
+            i += 1
+        raise ValueError("unterminated template literal")
+
+    while i < n:
+        char = source[i]
+
+        if char in " \t\r\n\f\v":
+            if char == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i += 1
+            continue
+
+        if char == "/" and source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+            continue
+
+        if char == "/" and source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            if end == -1:
+                raise ValueError("unterminated block comment")
+            if "\n" in source[i:end]:
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i = end + 2
+            continue
+
+        if char in "'\"":
+            end = _skip_string(source, i, char)
+            emit(source[i:end])
+            word = ""
+            i = end
+            continue
+
+        if char == "`":
+            i, chunk, opened = template_from(i + 1)
+            emit("`" + chunk)
+            if opened:
+                templates.append(0)
+            word = ""
+            continue
+
+        if char == "/" and (not last or last in _REGEX_PRECEDERS or
+                            (_is_word(last) and word in _REGEX_KEYWORDS)):
+            end = _skip_regex(source, i)
+            emit(source[i:end])
+            word = ""
+            i = end
+            continue
+
+        if templates:
+            if char == "{":
+                templates[-1] += 1
+            elif char == "}":
+                if templates[-1] == 0:
+                    templates.pop()
+                    i, chunk, opened = template_from(i + 1)
+                    emit("}" + chunk)
+                    if opened:
+                        templates.append(0)
+                    word = ""
+                    continue
+                templates[-1] -= 1
+
+        if _is_word(char):
+            start = i
+            while i < n and _is_word(source[i]):
+                i += 1
+            word = source[start:i]
+            emit(word)
+            continue
+
+        emit(char)
+        word = ""
+        i += 1
+
+    return "".join(out).strip() + "\n"
+
+
+def content_hash(data):
+    """Short content hash used in asset file names"""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def is_hashed_asset(key):
+    """True for file names produced by build_hashed_site (name.<hash>.js/css)"""
+    return bool(_HASHED_NAME.search(key))
+
+
+def keep_recent_hashed_asset(key, info):
+    """Deletion guard for sync_directory: keep superseded hashed assets during the grace period"""
+    return is_hashed_asset(key) and info["last_modified"] > datetime.now(timezone.utc) - HASHED_ASSET_GRACE
+
+
+def build_hashed_site(source_dir, out_dir):
+    """Write index.html plus content-hashed (and minified) copies of its local JS/CSS assets
+
+    Returns {file name: Cache-Control} for everything written to out_dir.
+    """
+    source_dir, out_dir = Path(source_dir), Path(out_dir)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    written = {}
+
+    def hashed(match):
+        name = match.group(2)
+        asset = source_dir / name
+        if not asset.is_file():
+            raise FileNotFoundError(f"index.html references missing asset: {asset}")
+
+        data = asset.read_bytes()
+        if asset.suffix == ".js":
+            data = minify_js(data.decode("utf-8")).encode("utf-8")
+        hashed_name = f"{Path(name).with_suffix('').as_posix()}.{content_hash(data)}{asset.suffix}"
+
+        target = out_dir / hashed_name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        written[hashed_name] = IMMUTABLE_CACHE_CONTROL
+        return f"{match.group(1)}{hashed_name}{match.group(3)}"
+
+    index = (source_dir / "index.html").read_text(encoding="utf-8")
+    (out_dir / "index.html").write_text(_ASSET_REF.sub(hashed, index), encoding="utf-8")
+    written["index.html"] = INDEX_CACHE_CONTROL
+    return written
+
+
+def build_billing_dashboard():
+    """Build viraltenant-billing into viraltenant-billing/dist; returns {file name: Cache-Control}"""
+    return build_hashed_site(BILLING_DIR, BILLING_BUILD_DIR)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - AWS Transport
+One pooled boto3 session with reused S3/CloudFront clients, so uploads and invalidations
+run in-process instead of paying aws CLI startup and a new TLS handshake per call
+"""
+
+import time
+import hashlib
+import mimetypes
+import threading
+from pathlib import Path
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+from deploy_compress import CONTENT_ENCODING, precompress
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+except ImportError:
+    # boto3 not installed, require_boto3() explains how to fix it
+    boto3 = None
+
+# Transfer tuning: parallel uploads share one connection pool per client
+MAX_CONCURRENCY = 32
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+DELETE_BATCH_SIZE = 1000  # S3 DeleteObjects limit
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+
+# Transfer totals of this process (read by the deploy report)
+TRANSFER_STATS = {
+    "uploaded_objects": 0,
+    "uploaded_bytes": 0,
+    "copied_objects": 0,
+    "deleted_objects": 0,
+    "invalidations": 0,
+    "invalidation_paths": 0,
+}
+
+
+def _count(**amounts):
+    with _lock:
+        for name, amount in amounts.items():
+            TRANSFER_STATS[name] += amount
+
+
+def require_boto3():
+    """Fail with an actionable message when boto3 is missing"""
+    if boto3 is None:
+        raise RuntimeError("boto3 is required for deployments: pip install boto3")
+
+
+def session():
+    """Process-wide boto3 session (credentials resolved like the aws CLI: AWS_PROFILE, env, ...)"""
+    global _session
+    require_boto3()
+    with _lock:
+        if _session is None:
+            _session = boto3.Session()
+        return _session
+
+
+def client(service):
+    """Cached, thread-safe client with a connection pool sized for MAX_CONCURRENCY"""
+    current = session()
+    with _lock:
+        if service not in _clients:
+            _clients[service] = current.client(
+                service,
+                config=Config(
+                    max_pool_connections=MAX_CONCURRENCY,
+                    retries={"max_attempts": 10, "mode": "adaptive"},
+                ),
+            )
+        return _clients[service]
+
+
+def transfer_config():
+    """TransferConfig for uploads (multipart above MULTIPART_THRESHOLD)"""
+    require_boto3()
+    return TransferConfig(
+        max_concurrency=MAX_CONCURRENCY,
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        use_threads=True,
+    )
+
+
+def guess_content_type(path):
+    """MIME type for a file name (falls back to binary/octet-stream like the aws CLI)"""
+    guessed, _ = mimetypes.guess_type(str(path))
+    return guessed or "binary/octet-stream"
+
+
+def _extra_args(key, content_type=None, cache_control=None, extra=None, content_encoding=None):
+    args = {"ContentType": content_type or guess_content_type(key)}
+    if cache_control:
+        args["CacheControl"] = cache_control
+    if content_encoding:
+        args["ContentEncoding"] = content_encoding
+    args.update(extra or {})
+    return args
+
+
+def upload_file(path, bucket, key, content_type=None, cache_control=None, extra=None,
+                content_encoding=None):
+    """Upload one file (multipart and threaded for large files)
+
+    With content_encoding, path holds the already encoded body (see deploy_compress.py).
+    """
+    client("s3").upload_file(
+        str(path),
+        bucket,
+        key,
+        ExtraArgs=_extra_args(key, content_type, cache_control, extra, content_encoding),
+        Config=transfer_config(),
+    )
+    _count(uploaded_objects=1, uploaded_bytes=Path(path).stat().st_size)
+
+
+def copy_object(bucket, source_key, dest_key, content_type=None, cache_control=None,
+                content_encoding=None):
+    """Server-side copy inside a bucket (no data leaves S3)"""
+    client("s3").copy_object(
+        Bucket=bucket,
+        Key=dest_key,
+        CopySource={"Bucket": bucket, "Key": source_key},
+        MetadataDirective="REPLACE",
+        **_extra_args(dest_key, content_type, cache_control, content_encoding=content_encoding),
+    )
+    _count(copied_objects=1)
+
+
+def list_objects(bucket, prefix=""):
+    """{key: {"size", "etag", "last_modified"}} of all objects below a prefix"""
+    objects = {}
+    paginator = client("s3").get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            objects[item["Key"]] = {
+                "size": item["Size"],
+                "etag": item["ETag"].strip('"'),
+                "last_modified": item["LastModified"],
+            }
+    return objects
+
+
+def delete_objects(bucket, keys):
+    """Delete keys in batches of DELETE_BATCH_SIZE; returns the number of deleted objects"""
+    keys = sorted(keys)
+    deleted = 0
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[start:start + DELETE_BATCH_SIZE]
+        response = client("s3").delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        errors = response.get("Errors", [])
+        if errors:
+            first = errors[0]
+            raise RuntimeError(f"Failed to delete {len(errors)} objects (e.g. {first['Key']}: {first['Message']})")
+        deleted += len(batch)
+        _count(deleted_objects=len(batch))
+    return deleted
+
+
+def _md5(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_unchanged(path, remote):
+    """Compare size and, for single-part uploads, the MD5 ETag"""
+    if remote is None or remote["size"] != path.stat().st_size:
+        return False
+    if "-" in remote["etag"]:
+        # Multipart ETag is not an MD5 of the content, size has to do
+        return True
+    return remote["etag"] == _md5(path)
+
+
+def sync_directory(directory, bucket, prefix="", delete=False, exclude=(), cache_control=None, keep=None,
+                   compress=False):
+    """In-process equivalent of aws s3 sync: parallel upload of changed files, batched deletes
+
+    exclude patterns are matched against the key below prefix and protect remote objects
+    from --delete as well; keep(key, info) can protect further remote objects from deletion only.
+    cache_control is a header value or a function of the key. compress=True uploads text
+    assets gzip-encoded (see deploy_compress.py). Returns (uploaded keys, deleted keys).
+    """
+    directory = Path(directory)
+    local = {
+        prefix + path.relative_to(directory).as_posix(): path
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+    local = {
+        key: path for key, path in local.items()
+        if not any(fnmatch(key[len(prefix):], pattern) for pattern in exclude)
+    }
+    remote = {
+        key: info for key, info in list_objects(bucket, prefix).items()
+        if not any(fnmatch(key[len(prefix):], pattern) for pattern in exclude)
+    }
+
+    variants = precompress(local.values()) if compress else {}
+    bodies = {key: variants.get(path, path) for key, path in local.items()}
+
+    def put(key):
+        header = cache_control(key) if callable(cache_control) else cache_control
+        encoding = CONTENT_ENCODING if local[key] in variants else None
+        upload_file(bodies[key], bucket, key, cache_control=header, content_encoding=encoding)
+
+    changed = [key for key, path in sorted(bodies.items()) if not _is_unchanged(path, remote.get(key))]
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(changed) or 1)) as pool:
+        list(pool.map(put, changed))
+
+    deleted = sorted(key for key in set(remote) - set(local) if not (keep and keep(key, remote[key]))) if delete else []
+    if deleted:
+        delete_objects(bucket, deleted)
+    return changed, deleted
+
+
+def create_invalidation(distribution_id, paths):
+    """Create a CloudFront invalidation; returns the Invalidation dict (Id, Status, ...)"""
+    response = client("cloudfront").create_invalidation(
+        DistributionId=distribution_id,
+        InvalidationBatch={
+            "Paths": {"Quantity": len(paths), "Items": list(paths)},
+            "CallerReference": f"deploy-{time.time_ns()}",
+        },
+    )
+    _count(invalidations=1, invalidation_paths=len(paths))
+    return response["Invalidation"]
+
+
+def read_object(bucket, key):
+    """Body of an object as bytes, or None if it does not exist"""
+    s3 = client("s3")
+    try:
+        return s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except s3.exceptions.NoSuchKey:
+        return None
+
+
+def put_object(bucket, key, body, content_type=None, cache_control=None):
+    """Write a small object from bytes in one request"""
+    client("s3").put_object(Bucket=bucket, Key=key, Body=body, **_extra_args(key, content_type, cache_control))
+    _count(uploaded_objects=1, uploaded_bytes=len(body))
+
+
+def latest_layer_version(layer_name):
+    """Newest published version of a Lambda layer (Version, Description, ...), or None"""
+    lambda_client = client("lambda")
+    try:
+        versions = lambda_client.list_layer_versions(LayerName=layer_name, MaxItems=1)["LayerVersions"]
+    except lambda_client.exceptions.ResourceNotFoundException:
+        return None
+    return versions[0] if versions else None
+
+
+def function_code_sha(function_name):
+    """CodeSha256 of the deployed code (base64 SHA-256 of the ZIP), None if the function does not exist"""
+    lambda_client = client("lambda")
+    try:
+        return lambda_client.get_function_configuration(FunctionName=function_name)["CodeSha256"]
+    except lambda_client.exceptions.ResourceNotFoundException:
+        return None
+
+
+def update_function_code(function_name, zip_path):
+    """Upload a ZIP directly to a function and wait until new invocations run it; returns the new CodeSha256"""
+    lambda_client = client("lambda")
+    body = Path(zip_path).read_bytes()
+    response = lambda_client.update_function_code(FunctionName=function_name, ZipFile=body)
+    lambda_client.get_waiter("function_updated_v2").wait(
+        FunctionName=function_name, WaiterConfig={"Delay": 1, "MaxAttempts": 120}
+    )
+    _count(uploaded_objects=1, uploaded_bytes=len(body))
+    return response["CodeSha256"]
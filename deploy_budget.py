@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Artifact Size Budgets
+Checks every built ZIP against the budget of its packaging target and diffs it file by file
+against the last accepted build when it is over budget or grew noticeably
+"""
+
+import sys
+import json
+import time
+import zipfile
+
+from deploy_packaging import CACHE_DIR
+
+CONTENTS_DIR = CACHE_DIR / "zip-contents"  # file listing of the last accepted build per target
+
+# Growth that triggers a diff even within budget
+GROWTH_THRESHOLD_PCT = 20.0
+GROWTH_MIN_BYTES = 4 * 1024  # small handlers grow by more than 20% with a single comment
+DIFF_LINES = 20
+
+_enforced = True
+
+
+def ignore_budgets():
+    """Report budget violations without failing the deploy (--ignore-budgets)"""
+    global _enforced
+    _enforced = False
+
+
+def zip_listing(zip_path):
+    """{archive name: [uncompressed bytes, compressed bytes]} of a ZIP"""
+    with zipfile.ZipFile(zip_path) as zipf:
+        return {
+            info.filename: [info.file_size, info.compress_size]
+            for info in zipf.infolist() if not info.is_dir()
+        }
+
+
+def _listing_path(name):
+    return CONTENTS_DIR / f"{name}.json"
+
+
+def load_previous(name):
+    """Listing of the last accepted build of a target, or None"""
+    path = _listing_path(name)
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_listing(name, zip_path, size, files):
+    CONTENTS_DIR.mkdir(parents=True, exist_ok=True)
+    snapshot = {
+        "zip_path": str(zip_path),
+        "bytes": size,
+        "files": files,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _listing_path(name).write_text(json.dumps(snapshot, sort_keys=True), encoding="utf-8")
+
+
+def diff_listings(old, new):
+    """Files that were added, grew, shrank or disappeared, biggest compressed change first
+
+    Returns a list of (change, archive name, old compressed bytes, new compressed bytes).
+    """
+    changes = []
+    for name, (_, compressed) in new.items():
+        if name not in old:
+            changes.append(("added", name, 0, compressed))
+        elif compressed != old[name][1]:
+            changes.append(("grew" if compressed > old[name][1] else "shrank", name, old[name][1], compressed))
+    for name, (_, compressed) in old.items():
+        if name not in new:
+            changes.append(("removed", name, compressed, 0))
+    return sorted(changes, key=lambda c: (-(c[3] - c[2]), c[1]))
+
+
+def _summarize_dirs(changes):
+    """Net compressed change per top-level directory (e.g. a node_modules that slipped in)"""
+    totals = {}
+    for _, name, old_size, new_size in changes:
+        top = name.split("/")[0] if "/" in name else "(root)"
+        totals[top] = totals.get(top, 0) + new_size - old_size
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def print_diff(name, previous, files, size):
+    """File-level diff of a ZIP against its last accepted build"""
+    if previous is None:
+        print(f"   📄 No previous build of {name} to diff against - largest files:")
+        largest = sorted(files.items(), key=lambda item: -item[1][1])[:DIFF_LINES]
+        for arcname, (raw, compressed) in largest:
+            print(f"      {compressed / 1024:>9.1f} KB  {arcname}")
+        return
+
+    changes = diff_listings(previous["files"], files)
+    print(f"   📄 {name}: {previous['bytes'] / 1024:.1f} KB ({previous['built_at']}) → {size / 1024:.1f} KB, "
+          f"{len(files)} files (was {len(previous['files'])})")
+    if len(changes) > DIFF_LINES:
+        for top, delta in _summarize_dirs(changes)[:5]:
+            print(f"      {delta / 1024:>+9.1f} KB  {top}/ (total)")
+    icons = {"added": "+", "grew": "↑", "shrank": "↓", "removed": "-"}
+    for change, arcname, old_size, new_size in changes[:DIFF_LINES]:
+        print(f"      {icons[change]} {(new_size - old_size) / 1024:>+8.1f} KB  {arcname}")
+    if len(changes) > DIFF_LINES:
+        print(f"      ... {len(changes) - DIFF_LINES} more changed files")
+
+
+def check_artifact(target, result):
+    """Check one packaging result; returns a violation message or None
+
+    Builds within budget become the new reference for later diffs. Cached ZIPs are
+    checked too, so an artifact that was let through with --ignore-budgets keeps failing.
+    """
+    if result["status"] not in ("built", "cached"):
+        return None
+    size = result["bytes"]
+    over_budget = target.budget is not None and size > target.budget
+    previous = load_previous(target.name)
+    if result["status"] == "cached" and previous is not None and not over_budget:
+        return None  # unchanged ZIP, already checked when it was built
+
+    files = zip_listing(target.zip_path)
+    if over_budget:
+        print(f"\n🚫 {target.name}: {size / 1024:.1f} KB exceeds its budget of {target.budget / 1024:.0f} KB")
+        print_diff(target.name, previous, files, size)
+        return f"{target.name} ({size / 1024:.1f} KB > {target.budget / 1024:.0f} KB)"
+
+    growth = size - previous["bytes"] if previous else 0
+    if growth >= GROWTH_MIN_BYTES and growth / max(previous["bytes"], 1) * 100 > GROWTH_THRESHOLD_PCT:
+        print(f"\n⚠️ {target.name} grew by {growth / max(previous['bytes'], 1) * 100:.0f}% since its last build")
+        print_diff(target.name, previous, files, size)
+    save_listing(target.name, target.zip_path, size, files)
+    return None
+
+
+def enforce_budgets(targets, results):
+    """Check all results of a packaging run; exits if a ZIP is over budget (unless ignored)"""
+    by_name = {t.name: t for t in targets}
+    violations = [
+        message for message in (check_artifact(by_name[r["name"]], r) for r in results if r["name"] in by_name)
+        if message
+    ]
+    if not violations:
+        return
+    print(f"\n🚫 {len(violations)} artifact(s) over budget: {', '.join(violations)}")
+    print("💡 Fix the include/exclude rules or raise the budget next to the target in deploy_packaging.py")
+    if _enforced:
+        sys.exit(1)
+    print("⚠️ Continuing anyway (--ignore-budgets)")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Deploy Checkpoints
+Records every successful stage together with a hash of its inputs so that
+deploy.py --resume can skip the stages that already succeeded with the same inputs
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+from deploy_packaging import CACHE_DIR, file_sha256
+
+CHECKPOINT_FILE = CACHE_DIR / "checkpoints.json"
+CHECKPOINT_VERSION = 1
+
+
+def _plain(value):
+    """JSON fallback for stage results: objects by their attributes, anything else as string"""
+    return vars(value) if hasattr(value, "__dict__") else str(value)
+
+
+def tree_digest(directory, ignore=()):
+    """Hash of every file below a directory (relative path + content), skipping ignored dir names"""
+    digest = hashlib.sha256()
+    directory = Path(directory)
+    if not directory.exists():
+        return f"missing:{directory.as_posix()}"
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in ignore)
+        for name in sorted(files):
+            path = Path(root) / name
+            digest.update(path.relative_to(directory).as_posix().encode("utf-8") + b"\0")
+            digest.update(file_sha256(path).encode("ascii") + b"\0")
+    return digest.hexdigest()
+
+
+def files_digest(*paths):
+    """{path: sha256 or None} of single files (None = missing)"""
+    return {Path(p).as_posix(): file_sha256(p) if Path(p).is_file() else None for p in paths}
+
+
+class Checkpoints:
+    """Input keys and results of the stages that succeeded in the last runs of one deploy mode
+
+    A stage key covers the stage's own inputs and the keys of its dependencies, so a stage
+    whose dependency ran with new inputs never counts as unchanged.
+    """
+
+    def __init__(self, mode, path=CHECKPOINT_FILE):
+        self.mode = mode
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._all = self._load()
+        self.stages = self._all.setdefault(mode, {})
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if data.get("version") != CHECKPOINT_VERSION:
+            return {}
+        return data.get("modes", {})
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CHECKPOINT_VERSION, "modes": self._all}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(inputs, dep_keys):
+        """Stage key from its inputs (any JSON-able value) and its dependencies' keys"""
+        payload = json.dumps({"inputs": inputs, "deps": dep_keys}, sort_keys=True, default=_plain)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, name, key):
+        """Checkpoint of a stage if it succeeded with exactly this key, else None"""
+        with self._lock:
+            entry = self.stages.get(name)
+        return entry if entry and entry["key"] == key else None
+
+    def discard(self, name):
+        """Forget a stage before it runs - an interrupted or failed stage must run again"""
+        with self._lock:
+            if self.stages.pop(name, None) is not None:
+                self._save()
+
+    def record(self, name, key, result):
+        """Store a successful stage; results that cannot be stored as JSON are kept as None"""
+        try:
+            saved = json.loads(json.dumps(result, default=_plain))
+        except (TypeError, ValueError):
+            saved = None
+        with self._lock:
+            self.stages[name] = {
+                "key": key,
+                "result": saved,
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self._save()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Pre-compressed Uploads
+Compresses text assets once at maximum gzip level (in a process pool, cached by content
+hash) so S3 serves them with Content-Encoding instead of CloudFront's best-effort compression
+"""
+
+import os
+import gzip
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from deploy_packaging import CACHE_DIR, file_sha256
+
+# S3 has no Accept-Encoding negotiation, so objects are stored in the one encoding every
+# browser accepts; brotli would need an edge function choosing between variants
+CONTENT_ENCODING = "gzip"
+COMPRESSED_DIR = CACHE_DIR / "compressed"
+
+COMPRESSIBLE_SUFFIXES = {
+    ".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".webmanifest", ".map",
+}
+MIN_SIZE = 1024  # below one TCP packet compression does not pay off
+
+
+def is_compressible(path):
+    path = Path(path)
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES and path.stat().st_size >= MIN_SIZE
+
+
+def _compress(job):
+    """Write the gzip variant of one file (runs inside a worker process)"""
+    source, target = job
+    data = Path(source).read_bytes()
+    # mtime=0 keeps the output (and therefore its ETag) stable across runs
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    tmp_path = Path(str(target) + f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(compressed)
+    os.replace(tmp_path, target)
+    return source
+
+
+def precompress(paths, max_workers=None):
+    """{source path: gzip file} for all compressible paths
+
+    Variants are content-addressed under .deploy-cache/compressed, so unchanged files are
+    never compressed twice; missing ones are built concurrently.
+    """
+    COMPRESSED_DIR.mkdir(parents=True, exist_ok=True)
+    variants = {}
+    jobs = []
+    for path in paths:
+        if not is_compressible(path):
+            continue
+        target = COMPRESSED_DIR / f"{file_sha256(path)}.gz"
+        variants[path] = target
+        if not target.exists():
+            jobs.append((path, target))
+
+    if jobs:
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_compress, jobs))
+    return variants
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Layer Dependency Analyzer
+Walks the require()/import graph of every Lambda function, maps it onto the packages of the
+common-deps layer and builds slim per-group layers that only contain what a group loads
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+
+from deploy_packaging import (
+    INFRA_DIR, LAMBDA_FUNCTIONS_DIR, LAMBDA_TARGETS, LAYER_TARGET, LambdaTarget, dependency_hash,
+)
+
+LAYER_GROUPS_DIR = Path(INFRA_DIR) / "lambda-layers" / "groups"
+LAYER_GROUPS_FILE = LAYER_GROUPS_DIR / "groups.json"  # read by modules/lambda-layers
+
+# Groups that get their own slim layer (the Terraform modules of these groups attach it)
+SLIM_LAYER_GROUPS = ["crosspost", "whatsapp"]
+
+# Functions deployed by a group's Terraform module but zipped by Terraform (archive_file)
+EXTRA_GROUP_MEMBERS = {"tenant-crosspost-threads": "crosspost"}
+
+JS_SUFFIXES = (".js", ".cjs", ".mjs")
+RESOLVE_SUFFIXES = ["", ".js", ".cjs", ".mjs", ".json", "/index.js", "/index.cjs", "/index.mjs"]
+
+_REQUIRE = re.compile(r"""\brequire\s*\(\s*(['"])([^'"]+)\1\s*\)""")
+_IMPORT = re.compile(r"""(?:\bimport|\bexport)\s*(?:[\w*${}\s,]+?\s*from\s*)?(['"])([^'"]+)\1""")
+_DYNAMIC_IMPORT = re.compile(r"""\bimport\s*\(\s*(['"])([^'"]+)\1\s*\)""")
+_COMMENT = re.compile(r"/\*.*?\*/|(?<![:'\"\\])//[^\n]*", re.DOTALL)
+
+NODE_BUILTINS = {
+    "assert", "async_hooks", "buffer", "child_process", "cluster", "console", "constants",
+    "crypto", "dgram", "diagnostics_channel", "dns", "domain", "events", "fs", "http", "http2",
+    "https", "inspector", "module", "net", "os", "path", "perf_hooks", "process", "punycode",
+    "querystring", "readline", "repl", "stream", "string_decoder", "timers", "tls", "trace_events",
+    "tty", "url", "util", "v8", "vm", "wasi", "worker_threads", "zlib",
+}
+
+# The Node.js 18+ Lambda runtimes ship AWS SDK v3, so @aws-sdk/* clients that are not in
+# the layer still load (in whatever version the runtime bundles)
+RUNTIME_SCOPES = ("@aws-sdk/",)
+
+
+def package_name(specifier):
+    """Package part of a bare specifier ("@aws-sdk/client-s3/dist" -> "@aws-sdk/client-s3")"""
+    parts = specifier.split("/")
+    return "/".join(parts[:2]) if specifier.startswith("@") else parts[0]
+
+
+def specifiers(path):
+    """Every module specifier a JavaScript file requires or imports"""
+    source = _COMMENT.sub("", Path(path).read_text(encoding="utf-8", errors="replace"))
+    found = set()
+    for pattern in (_REQUIRE, _IMPORT, _DYNAMIC_IMPORT):
+        found.update(match.group(2) for match in pattern.finditer(source))
+    return found
+
+
+def _resolve_relative(base_dir, specifier):
+    for suffix in RESOLVE_SUFFIXES:
+        candidate = Path(os.path.normpath(base_dir / (specifier + suffix)))
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def function_entries(source_dir):
+    """JavaScript files of a function that end up in its ZIP (own node_modules excluded)"""
+    entries = []
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = [d for d in dirs if d != "node_modules"]
+        entries.extend(Path(root) / name for name in files if name.endswith(JS_SUFFIXES))
+    return sorted(entries)
+
+
+def required_packages(source_dir):
+    """Walk the local require graph from every file of a function
+
+    Returns (packages, builtins, unresolved): bare package names, Node built-ins and
+    relative requires that point to no file.
+    """
+    pending = function_entries(source_dir)
+    seen = set(pending)
+    packages, builtins, unresolved = set(), set(), set()
+    while pending:
+        path = pending.pop()
+        if path.suffix == ".json":
+            continue
+        for specifier in specifiers(path):
+            if specifier.startswith((".", "/")):
+                target = _resolve_relative(path.parent, specifier)
+                if target is None:
+                    unresolved.add(f"{path.name}: {specifier}")
+                elif target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+            elif specifier.startswith("node:") or package_name(specifier) in NODE_BUILTINS:
+                builtins.add(specifier.removeprefix("node:").split("/")[0])
+            else:
+                packages.add(package_name(specifier))
+    return packages, builtins, unresolved
+
+
+def load_lock_packages(layer_dir=LAYER_TARGET.source_dir):
+    """package-lock "packages" map of the layer ({install path: entry}, root excluded)"""
+    lockfile = Path(layer_dir) / "package-lock.json"
+    lock = json.loads(lockfile.read_text(encoding="utf-8"))
+    return {path: info for path, info in lock.get("packages", {}).items() if path and not info.get("dev")}
+
+
+def _lookup(lock_packages, from_path, name):
+    """Install path Node would load `name` from when required inside from_path"""
+    base = from_path
+    while True:
+        candidate = f"{base}/node_modules/{name}" if base else f"node_modules/{name}"
+        if candidate in lock_packages:
+            return candidate
+        if not base:
+            return None
+        cut = base.rfind("/node_modules/")
+        base = base[:cut] if cut != -1 else ""
+
+
+def install_closure(lock_packages, names):
+    """All install paths needed to load the given top-level packages"""
+    pending = [path for path in (_lookup(lock_packages, "", name) for name in names) if path]
+    closure = set(pending)
+    while pending:
+        path = pending.pop()
+        info = lock_packages[path]
+        deps = {**info.get("dependencies", {}), **info.get("optionalDependencies", {}),
+                **info.get("peerDependencies", {})}
+        for dep in deps:
+            resolved = _lookup(lock_packages, path, dep)
+            if resolved and resolved not in closure:
+                closure.add(resolved)
+                pending.append(resolved)
+    return closure
+
+
+def installed_size(path, layer_dir=LAYER_TARGET.source_dir):
+    """Bytes of one installed package without its nested node_modules (None if not installed)"""
+    package_dir = Path(layer_dir) / path
+    if not package_dir.is_dir():
+        return None
+    total = 0
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = [d for d in dirs if d != "node_modules"]
+        total += sum((Path(root) / name).stat().st_size for name in files)
+    return total
+
+
+def function_dirs():
+    """{function name: (source dir, group)} for LAMBDA_TARGETS plus every dir in lambda-functions/"""
+    functions = {t.name: (Path(t.source_dir), t.group) for t in LAMBDA_TARGETS}
+    for path in sorted(Path(LAMBDA_FUNCTIONS_DIR).iterdir()):
+        if path.is_dir() and path.name not in functions:
+            functions[path.name] = (path, EXTRA_GROUP_MEMBERS.get(path.name))
+    return functions
+
+
+def analyze(layer_dir=LAYER_TARGET.source_dir):
+    """Per-function usage of the layer
+
+    Returns {name: {"group", "layer", "runtime", "missing", "builtins", "install_paths"}}
+    where "layer" are packages served by the layer and "install_paths" their closure.
+    """
+    lock_packages = load_lock_packages(layer_dir)
+    top_level = {path[len("node_modules/"):] for path in lock_packages if path.count("node_modules/") == 1}
+    report = {}
+    for name, (source_dir, group) in function_dirs().items():
+        if not source_dir.exists():
+            continue
+        packages, builtins, unresolved = required_packages(source_dir)
+        layer = sorted(p for p in packages if p in top_level)
+        runtime = sorted(p for p in packages if p not in top_level and p.startswith(RUNTIME_SCOPES))
+        missing = sorted(p for p in packages if p not in top_level and not p.startswith(RUNTIME_SCOPES))
+        report[name] = {
+            "group": group,
+            "layer": layer,
+            "runtime": runtime,
+            "missing": missing,
+            "unresolved": sorted(unresolved),
+            "builtins": sorted(builtins),
+            "install_paths": sorted(install_closure(lock_packages, layer)),
+        }
+    return report
+
+
+def group_packages(report, groups=SLIM_LAYER_GROUPS):
+    """{group: sorted layer packages used by any function of the group}"""
+    return {
+        group: sorted({p for entry in report.values() if entry["group"] == group for p in entry["layer"]})
+        for group in groups
+    }
+
+
+def group_layer_zip(group):
+    """ZIP of a group's slim layer"""
+    return LAYER_GROUPS_DIR / f"{group}-deps-layer.zip"
+
+
+def group_layer_target(group, install_paths):
+    """LambdaTarget of a slim layer: the group's install paths out of the common-deps tree"""
+    return LambdaTarget(
+        f"{group}-deps-layer",
+        LAYER_TARGET.source_dir,
+        group_layer_zip(group).as_posix(),
+        include=[f"{path}/**/*" for path in sorted(install_paths)],
+        exclude=[".deploy-cache-key"],
+        group="layer",
+        prefix=LAYER_TARGET.prefix,
+        prune=LAYER_TARGET.prune,
+        budget=LAYER_TARGET.budget,
+    )
+
+
+def group_layer_targets(report=None, groups=SLIM_LAYER_GROUPS):
+    """{group: (LambdaTarget, dependency hash)} for every slim layer group"""
+    report = analyze() if report is None else report
+    lock_packages = load_lock_packages()
+    targets = {}
+    for group, packages in group_packages(report, groups).items():
+        if not packages:
+            continue
+        closure = install_closure(lock_packages, packages)
+        target = group_layer_target(group, closure)
+        targets[group] = (target, dependency_hash(target, closure))
+    return targets
+
+
+def write_groups_file(targets):
+    """Describe the built slim layers for Terraform ({group: {"hash": ...}})"""
+    LAYER_GROUPS_DIR.mkdir(parents=True, exist_ok=True)
+    groups = {group: {"hash": digest} for group, (target, digest) in sorted(targets.items())}
+    tmp_path = LAYER_GROUPS_FILE.with_name(LAYER_GROUPS_FILE.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(groups, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, LAYER_GROUPS_FILE)
+
+
+def load_groups_file():
+    """Slim layers Terraform attaches ({group: {"hash": ...}}, empty before the first build)"""
+    if not LAYER_GROUPS_FILE.exists():
+        return {}
+    return json.loads(LAYER_GROUPS_FILE.read_text(encoding="utf-8"))
+
+
+def print_report(report, layer_dir=LAYER_TARGET.source_dir):
+    """Table of layer packages per function and the size of a slim layer per group"""
+    lock_packages = load_lock_packages(layer_dir)
+    sizes = {path: installed_size(path, layer_dir) for path in lock_packages}
+    measured = all(size is not None for size in sizes.values())
+
+    def size_of(paths):
+        if not measured:
+            return f"{len(paths)} pkgs"
+        return f"{sum(sizes[p] for p in paths) / (1024 * 1024):.1f} MB"
+
+    print("\n" + "=" * 60)
+    print("🔎 LAYER DEPENDENCY ANALYSIS (common-deps)")
+    print("=" * 60)
+    print(f"Full layer: {size_of(list(lock_packages))}"
+          + ("" if measured else " (install the layer's node_modules to measure sizes)"))
+
+    print(f"\n{'Function':<34} {'Group':<11} {'Layer share':>11}  Layer packages")
+    print("-" * 90)
+    for name, entry in sorted(report.items()):
+        used = ", ".join(p.replace("@aws-sdk/", "") for p in entry["layer"]) or "-"
+        print(f"{name:<34} {entry['group'] or '-':<11} {size_of(entry['install_paths']):>11}  {used}")
+        if entry["runtime"]:
+            print(f"   └─ from the Lambda runtime: {', '.join(entry['runtime'])}")
+        if entry["missing"]:
+            print(f"   └─ ⚠️ neither in the layer nor in the runtime: {', '.join(entry['missing'])}")
+        if entry["unresolved"]:
+            print(f"   └─ ⚠️ unresolved relative requires: {', '.join(entry['unresolved'])}")
+
+    unused = sorted(
+        p for p in (path[len("node_modules/"):] for path in lock_packages if path.count("node_modules/") == 1)
+        if not any(p in entry["layer"] for entry in report.values())
+        and not any(f"node_modules/{p}" in entry["install_paths"] for entry in report.values())
+    )
+    print("-" * 90)
+    for group, packages in group_packages(report).items():
+        closure = install_closure(lock_packages, packages)
+        print(f"🧩 {group} layer: {size_of(closure)} ({', '.join(packages) or 'nothing'})")
+    if unused:
+        print(f"🗑️ Loaded by no function: {', '.join(unused)}")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - node_modules Cache
+Keeps installed node_modules trees keyed by package-lock.json, Node version, platform and
+install command; a matching tree is restored by reflink or hardlink instead of npm install
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import platform
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+from deploy_packaging import CACHE_DIR
+
+NODE_MODULES_CACHE = CACHE_DIR / "node_modules"
+KEEP_ENTRIES = 3  # per project
+KEY_FILE = ".deploy-cache-key"  # "<key> <how>" in the project tree, never in the cache
+
+# Tool caches that are written at build time and must not end up shared with the cache
+SKIP_DIRS = {".cache", ".vite", ".vite-temp"}
+
+
+@lru_cache(maxsize=None)
+def node_version():
+    try:
+        result = subprocess.run(["node", "--version"], capture_output=True, text=True)
+        return result.stdout.strip() or "unknown"
+    except OSError:
+        return "none"
+
+
+def cache_key(project_dir, command):
+    """Key of the node_modules tree npm would produce (None without a lockfile)"""
+    lockfile = Path(project_dir) / "package-lock.json"
+    if not lockfile.exists():
+        return None
+    digest = hashlib.sha256()
+    digest.update(lockfile.read_bytes())
+    # Native modules (esbuild, sharp, ...) differ per Node ABI and platform
+    digest.update(json.dumps([node_version(), sys.platform, platform.machine(), command]).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def _project_slug(project_dir):
+    return Path(project_dir).resolve().as_posix().strip("/").replace("/", "_").replace(":", "")
+
+
+def _entry(project_dir, key):
+    return NODE_MODULES_CACHE / f"{_project_slug(project_dir)}-{key}"
+
+
+def _reflink_tree(source, target):
+    """Copy-on-write clone of a directory tree (APFS, Btrfs, XFS); False if unsupported"""
+    if sys.platform == "darwin":
+        command = ["cp", "-cR", str(source), str(target)]
+    elif sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=always", str(source), str(target)]
+    else:
+        return False
+    try:
+        if subprocess.run(command, capture_output=True).returncode == 0:
+            return True
+    except OSError:
+        pass
+    shutil.rmtree(target, ignore_errors=True)
+    return False
+
+
+def _hardlink_tree(source, target):
+    """Recreate a tree with hardlinked files (symlinks copied as links, copy across devices)"""
+    for root, dirs, files in os.walk(source):
+        rel = Path(root).relative_to(source)
+        (target / rel).mkdir(parents=True, exist_ok=True)
+        for name in dirs + files:
+            src, dst = Path(root) / name, target / rel / name
+            if src.is_symlink():
+                os.symlink(os.readlink(src), dst)
+                if name in dirs:
+                    dirs.remove(name)
+            elif name in files:
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+
+
+def restore_node_modules(project_dir, command):
+    """Make node_modules match the cache key without running npm; True if that worked
+
+    On a miss a previously restored (linked) tree is removed first, so npm never writes
+    through hardlinks into the cache.
+    """
+    project_dir = Path(project_dir)
+    node_modules = project_dir / "node_modules"
+    key_file = node_modules / KEY_FILE
+    key = cache_key(project_dir, command)
+    if key is None:
+        return False
+
+    current, how = (key_file.read_text().split() + ["", ""])[:2] if key_file.exists() else ("", "")
+    if current == key:
+        print(f"♻️ node_modules already match package-lock.json ({key}), skipping npm")
+        return True
+
+    if how == "hardlink":
+        # Files are shared with a cache entry, npm must not modify them in place
+        shutil.rmtree(node_modules)
+
+    entry = _entry(project_dir, key)
+    if not (entry / "node_modules").is_dir():
+        return False
+
+    if node_modules.exists():
+        shutil.rmtree(node_modules)
+    method = "reflink"
+    if not _reflink_tree(entry / "node_modules", node_modules):
+        method = "hardlink"
+        _hardlink_tree(entry / "node_modules", node_modules)
+    key_file.write_text(f"{key} {method}")
+    os.utime(entry)  # keeps recently used entries from being pruned
+    print(f"♻️ node_modules restored from cache by {method} ({key}, Node {node_version()})")
+    return True
+
+
+def save_node_modules(project_dir, command):
+    """Store the freshly installed node_modules tree under its cache key"""
+    project_dir = Path(project_dir)
+    node_modules = project_dir / "node_modules"
+    key = cache_key(project_dir, command)  # npm install may have rewritten the lockfile
+    if key is None or not node_modules.is_dir():
+        return
+
+    entry = _entry(project_dir, key)
+    if not entry.exists():
+        tmp_entry = entry.with_name(entry.name + ".tmp")
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        tmp_entry.mkdir(parents=True)
+        shutil.copytree(
+            node_modules,
+            tmp_entry / "node_modules",
+            symlinks=True,
+            ignore=shutil.ignore_patterns(KEY_FILE, *SKIP_DIRS),
+        )
+        os.replace(tmp_entry, entry)
+        print(f"💾 node_modules cached ({key})")
+
+    # The installed tree is a private copy, so it may be marked as matching the key
+    (node_modules / KEY_FILE).write_text(f"{key} installed")
+    _prune(project_dir)
+
+
+def _prune(project_dir):
+    """Keep the KEEP_ENTRIES most recently used cache entries of a project"""
+    prefix = _project_slug(project_dir) + "-"
+    entries = sorted(
+        (p for p in NODE_MODULES_CACHE.iterdir() if p.name.startswith(prefix) and not p.name.endswith(".tmp")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
+    )
+    for old in entries[KEEP_ENTRIES:]:
+        shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Lambda Packaging
+Declarative list of Lambda ZIP targets and a parallel packaging stage for deploy.py
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+from fnmatch import fnmatch
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from deploy_zip import DEFAULT_COMPRESSLEVEL, write_zip
+
+LAMBDA_FUNCTIONS_DIR = "viraltenant-infrastructure/lambda-functions"
+INFRA_DIR = "viraltenant-infrastructure"
+
+# Local build cache (content-addressed, see source_hash)
+CACHE_DIR = Path(".deploy-cache")
+BUILD_MANIFEST = CACHE_DIR / "lambda-builds.json"
+PACKAGING_VERSION = 2  # bump when the ZIP layout changes to invalidate all cache entries
+
+# Default packaging rules - dependencies come from the common-deps Lambda Layer
+JS_ONLY = ["*.js"]
+DIR_WITHOUT_DEPS = ["node_modules", "package-lock.json"]
+
+# ZIP size budgets (deploy_budget.py): a function that suddenly needs more than its budget
+# has almost certainly picked up node_modules or build output by accident
+KB = 1024
+MB = 1024 * KB
+FUNCTION_BUDGET = 32 * KB  # single-file handlers, today 1-8 KB
+LAYER_BUDGET = 50 * MB  # Lambda's limit for a directly uploaded ZIP
+
+# Layer pruning rules (deploy_prune.py): matched against every path segment below a package
+# root, never against package names
+PRUNE_RULES = [
+    # Documentation
+    "README*", "readme*", "CHANGELOG*", "changelog*", "HISTORY*", "History.md", "*.md", "*.markdown",
+    "AUTHORS*", "CONTRIBUTORS*", "CONTRIBUTING*", "doc", "docs", "example", "examples",
+    # Tests and tooling
+    "test", "tests", "__tests__", "__mocks__", "spec", "benchmark", "benchmarks", "coverage",
+    ".github", ".circleci", ".nyc_output", ".travis.yml", ".eslintrc*", ".prettierrc*",
+    ".editorconfig", ".npmignore", ".gitattributes", "Makefile", "Gruntfile.js", "gulpfile.js",
+    "tsconfig*.json", "*.tsbuildinfo", ".DS_Store",
+    # Type declarations, TypeScript sources and source maps
+    "*.d.ts", "*.d.mts", "*.d.cts", "*.ts", "*.mts", "*.cts", "*.map", "dist-types",
+]
+
+# The functions load the layer with require() (see --analyze-layers), so the ES module
+# builds of the AWS SDK and Smithy packages are never read
+CJS_ONLY_RULES = ["dist-es"]
+
+LAYER_PRUNE_RULES = PRUNE_RULES + CJS_ONLY_RULES
+
+
+class LambdaTarget:
+    """One Lambda ZIP: where the source lives, which files go in, where the ZIP goes"""
+
+    def __init__(self, name, source_dir, zip_path, include=None, exclude=None,
+                 group="core", required=False, prefix="", prune=None, budget=None):
+        self.name = name
+        self.source_dir = source_dir
+        self.zip_path = zip_path
+        self.include = list(include or ["**/*"])
+        self.exclude = list(exclude or [])
+        self.group = group
+        self.required = required
+        self.prefix = prefix  # folder inside the ZIP (e.g. "nodejs/" for layers)
+        self.prune = list(prune) if prune else None  # node_modules pruning rules (layers)
+        self.budget = budget  # maximum ZIP size in bytes (None = unchecked)
+
+
+def _function(name, group, include=JS_ONLY, exclude=None, zip_name=None, required=False,
+              budget=FUNCTION_BUDGET):
+    """Shortcut for a target under lambda-functions/ with the usual ZIP naming"""
+    zip_name = zip_name or name.replace("-", "_") + ".zip"
+    return LambdaTarget(
+        name,
+        f"{LAMBDA_FUNCTIONS_DIR}/{name}",
+        f"{INFRA_DIR}/{zip_name}",
+        include=include,
+        exclude=exclude,
+        group=group,
+        required=required,
+        budget=budget,
+    )
+
+
+CROSSPOST_FUNCTIONS = [
+    "tenant-crosspost-tiktok",
+    "tenant-crosspost-youtube",
+    "tenant-crosspost-instagram",
+    "tenant-crosspost-facebook",
+    "tenant-crosspost-xtwitter",
+    "tenant-crosspost-linkedin",
+    "tenant-crosspost-telegram",
+    "tenant-crosspost-discord",
+    "tenant-crosspost-slack",
+    "tenant-crosspost-bluesky",
+    "tenant-crosspost-mastodon",
+    "tenant-crosspost-snapchat",
+    "tenant-crosspost-dispatcher",
+]
+
+WHATSAPP_FUNCTIONS = [
+    "tenant-whatsapp-subscription",
+    "tenant-crosspost-whatsapp",
+    "tenant-whatsapp-worker",
+    "tenant-whatsapp-settings",
+]
+
+# ============================================
+# 📦 LAMBDA TARGETS (ZIPs needed by Terraform)
+# ============================================
+
+LAMBDA_TARGETS = [
+    # Core
+    LambdaTarget(
+        "auth-handler",
+        f"{INFRA_DIR}/modules/central-auth/lambda",
+        f"{INFRA_DIR}/auth_handler.zip",
+        include=["index.js"],
+        group="core",
+        budget=FUNCTION_BUDGET,
+    ),
+    # modules/tenant-api reads "tenant_management.zip" relative to the Terraform cwd (INFRA_DIR);
+    # the old build step wrote it to the repo root, where Terraform never picked it up
+    LambdaTarget(
+        "tenant-management",
+        f"{LAMBDA_FUNCTIONS_DIR}/tenant-management",
+        f"{INFRA_DIR}/tenant_management.zip",
+        exclude=DIR_WITHOUT_DEPS,
+        group="core",
+        budget=64 * KB,
+    ),
+    _function("tenant-authorizer", "core", include=["**/*"], exclude=DIR_WITHOUT_DEPS),
+
+    # Billing
+    _function("billing-api", "billing", include=["**/*"], exclude=DIR_WITHOUT_DEPS, required=True,
+              budget=128 * KB),
+    _function("billing-cron", "billing", include=["**/*"], exclude=DIR_WITHOUT_DEPS, budget=64 * KB),
+    _function("stripe-webhook", "billing"),
+    _function("stripe-eventbridge-handler", "billing"),
+
+    # Crosspost + WhatsApp
+    *[_function(name, "crosspost") for name in CROSSPOST_FUNCTIONS],
+    *[_function(name, "whatsapp") for name in WHATSAPP_FUNCTIONS],
+
+    # Membership (Mollie Split Payments)
+    _function("tenant-membership", "membership"),
+]
+
+# Common dependencies Lambda Layer (Lambda expects nodejs/node_modules inside the ZIP)
+LAYER_TARGET = LambdaTarget(
+    "common-deps-layer",
+    f"{INFRA_DIR}/lambda-layers/common-deps/nodejs",
+    f"{INFRA_DIR}/lambda-layers/common-deps/common-deps-layer.zip",
+    exclude=[".deploy-cache-key"],  # node_modules cache marker (deploy_npm.py)
+    group="layer",
+    required=True,
+    prefix="nodejs/",
+    prune=LAYER_PRUNE_RULES,
+    budget=LAYER_BUDGET,
+)
+LAYER_NAME = "viraltenant-common-deps"  # "${platform_name}-common-deps" in modules/lambda-layers
+LAYER_HASH_TAG = "deps "  # the layer description ends with "deps <dependency hash>"
+
+
+def select_targets(groups=None, names=None):
+    """Filter LAMBDA_TARGETS by group and/or function name (None = all)"""
+    return [
+        t for t in LAMBDA_TARGETS
+        if (groups is None or t.group in groups) and (names is None or t.name in names)
+    ]
+
+
+def _is_excluded(rel_path, patterns):
+    """A file is excluded if the whole path or any path segment matches a pattern"""
+    parts = rel_path.split("/")
+    return any(
+        fnmatch(rel_path, pattern) or any(fnmatch(part, pattern) for part in parts)
+        for pattern in patterns
+    )
+
+
+def collect_files(target):
+    """Resolve include/exclude globs to a sorted list of (archive name, file path)"""
+    root = Path(target.source_dir)
+    found = {}
+    for pattern in target.include:
+        for path in root.glob(pattern):
+            if not path.is_file():
+                continue
+            rel_path = path.relative_to(root).as_posix()
+            if not _is_excluded(rel_path, target.exclude):
+                found[target.prefix + rel_path] = path
+    return sorted(found.items())
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(target, files=None):
+    """Hash of the packaging rules plus every file (path + content) that goes into the ZIP"""
+    files = collect_files(target) if files is None else files
+    digest = hashlib.sha256()
+    rules = {
+        "version": PACKAGING_VERSION,
+        "include": target.include,
+        "exclude": target.exclude,
+        "prefix": target.prefix,
+    }
+    digest.update(json.dumps(rules, sort_keys=True).encode("utf-8"))
+    for arcname, path in files:
+        digest.update(arcname.encode("utf-8") + b"\0")
+        digest.update(file_sha256(path).encode("ascii") + b"\0")
+    return digest.hexdigest()
+
+
+def dependency_hash(target, install_paths=None):
+    """Hash of the resolved dependency tree of a layer (None without a lockfile)
+
+    Only what ends up in node_modules counts: every package-lock entry (install path,
+    version, integrity) plus the packaging rules. Touching files, a fresh checkout or a
+    reformatted package.json keep the hash - and with it the published layer version.
+    install_paths limits the hash to a subset of the tree (slim layers, deploy_layers.py).
+    """
+    lockfile = Path(target.source_dir) / "package-lock.json"
+    if not lockfile.exists():
+        return None
+    lock = json.loads(lockfile.read_text(encoding="utf-8"))
+    packages = {
+        path: [info.get("version"), info.get("integrity") or info.get("resolved")]
+        for path, info in lock.get("packages", {}).items()
+        if path and not info.get("dev")  # "" is the root project itself
+        and (install_paths is None or path in install_paths)
+    }
+    digest = hashlib.sha256()
+    rules = {
+        "version": PACKAGING_VERSION,
+        "exclude": target.exclude,
+        "prefix": target.prefix,
+        "prune": target.prune,
+    }
+    digest.update(json.dumps(rules, sort_keys=True).encode("utf-8"))
+    digest.update(json.dumps(packages, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def hash_file(target):
+    """Sidecar next to a layer ZIP holding its dependency hash (read by Terraform)"""
+    return Path(target.zip_path).with_suffix(".hash")
+
+
+def read_recorded_hash(target):
+    """Dependency hash the ZIP on disk was built from, or None"""
+    path = hash_file(target)
+    if not path.exists() or not Path(target.zip_path).exists():
+        return None
+    return path.read_text(encoding="utf-8").strip() or None
+
+
+def write_recorded_hash(target, digest):
+    tmp_path = hash_file(target).with_name(hash_file(target).name + ".tmp")
+    tmp_path.write_text(digest + "\n", encoding="utf-8")
+    os.replace(tmp_path, hash_file(target))
+
+
+def load_build_manifest():
+    """Load the local build manifest ({target name: last build info})"""
+    if not BUILD_MANIFEST.exists():
+        return {}
+    try:
+        with open(BUILD_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print("⚠️ Build manifest unreadable, rebuilding all Lambda packages")
+        return {}
+
+
+def save_build_manifest(manifest):
+    """Write the build manifest atomically"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = BUILD_MANIFEST.with_name(BUILD_MANIFEST.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, BUILD_MANIFEST)
+
+
+def is_up_to_date(target, digest, manifest):
+    """True if the ZIP on disk was built from exactly these sources and rules"""
+    entry = manifest.get(target.name)
+    zip_path = Path(target.zip_path)
+    if not entry or entry.get("source_hash") != digest or not zip_path.exists():
+        return False
+    # The ZIP may have been replaced behind our back (e.g. by a Terraform archive_file)
+    return entry.get("zip_sha256") == file_sha256(zip_path)
+
+
+def build_target(target):
+    """Build one ZIP (runs inside a worker process) and return a result dict"""
+    started = time.perf_counter()
+    result = {
+        "name": target.name,
+        "zip_path": target.zip_path,
+        "files": 0,
+        "bytes": 0,
+        "seconds": 0.0,
+        "status": "built",
+        "error": None,
+    }
+
+    try:
+        if not Path(target.source_dir).exists():
+            result["status"] = "missing"
+            result["error"] = f"source directory not found: {target.source_dir}"
+            return result
+
+        files = collect_files(target)
+        if not files:
+            result["status"] = "failed"
+            result["error"] = "no files matched the include patterns"
+            return result
+
+        entries, compresslevel = files, DEFAULT_COMPRESSLEVEL
+        if target.prune:
+            from deploy_prune import prepare_entries  # deploy_prune imports this module
+            entries, compresslevel, result["prune"] = prepare_entries(target.name, files, target.prune)
+            result["compresslevel"] = compresslevel
+
+        # Deterministic + atomic: Terraform never sees a half-written ZIP and
+        # identical sources always produce an identical source_code_hash
+        result["bytes"] = write_zip(target.zip_path, entries, compresslevel)
+        result["files"] = len(entries)
+        result["zip_sha256"] = file_sha256(target.zip_path)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    finally:
+        result["seconds"] = time.perf_counter() - started
+
+    return result
+
+
+def print_summary(results, wall_seconds):
+    """Print one summary table for a packaging run"""
+    icons = {"built": "✅", "cached": "♻️", "missing": "⚠️", "failed": "❌"}
+
+    print()
+    print(f"{'':2} {'Function':<32} {'Files':>6} {'Size':>11} {'Time':>8}")
+    print("-" * 64)
+    for result in results:
+        icon = icons.get(result["status"], "•")
+        size = f"{result['bytes'] / 1024:.2f} KB" if result["bytes"] else "-"
+        print(f"{icon:2} {result['name']:<32} {result['files']:>6} {size:>11} {result['seconds']:>7.2f}s")
+        if result["error"]:
+            print(f"   └─ {result['error']}")
+    print("-" * 64)
+
+    built = sum(1 for r in results if r["status"] == "built")
+    cached = sum(1 for r in results if r["status"] == "cached")
+    slowest = max((r["seconds"] for r in results if r["status"] == "built"), default=0.0)
+    print(f"📦 {built} built, {cached} unchanged (skipped) of {len(results)} packages "
+          f"in {wall_seconds:.2f}s (slowest single package: {slowest:.2f}s)")
+
+
+def package_targets(targets, max_workers=None, force=False):
+    """Build all stale targets concurrently on a process pool and print one summary table
+
+    Targets whose source hash matches the build manifest are skipped unless force=True.
+    """
+    print("\n" + "=" * 60)
+    print("📦 PACKAGING LAMBDA FUNCTIONS")
+    print("=" * 60)
+
+    if not targets:
+        print("⚠️ No Lambda targets selected, nothing to package")
+        return []
+
+    started = time.perf_counter()
+    manifest = load_build_manifest()
+    order = {t.name: i for i, t in enumerate(targets)}
+    digests = {}
+    results = []
+    stale = []
+
+    for target in targets:
+        hash_started = time.perf_counter()
+        if not Path(target.source_dir).exists():
+            stale.append(target)
+            continue
+        files = collect_files(target)
+        digests[target.name] = source_hash(target, files)
+        if not force and is_up_to_date(target, digests[target.name], manifest):
+            entry = manifest[target.name]
+            results.append({
+                "name": target.name,
+                "zip_path": target.zip_path,
+                "files": entry.get("files", len(files)),
+                "bytes": Path(target.zip_path).stat().st_size,
+                "seconds": time.perf_counter() - hash_started,
+                "status": "cached",
+                "error": None,
+            })
+        else:
+            stale.append(target)
+
+    if stale:
+        workers = max_workers or min(len(stale), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(build_target, target) for target in stale]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+    for result in results:
+        if result["status"] == "built" and result["name"] in digests:
+            manifest[result["name"]] = {
+                "source_hash": digests[result["name"]],
+                "zip_path": result["zip_path"],
+                "zip_sha256": result["zip_sha256"],
+                "files": result["files"],
+                "bytes": result["bytes"],
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+    if any(r["status"] == "built" for r in results):
+        save_build_manifest(manifest)
+
+    results.sort(key=lambda r: order[r["name"]])
+    print_summary(results, time.perf_counter() - started)
+
+    required_failures = [
+        t.name for t in targets
+        if t.required and next(r for r in results if r["name"] == t.name)["status"] not in ("built", "cached")
+    ]
+    if required_failures:
+        print(f"❌ Required Lambda packages failed: {', '.join(required_failures)}")
+        sys.exit(1)
+
+    print("📦 Dependencies provided via Lambda Layer")
+    return results
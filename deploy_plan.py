@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Deploy Plan
+Predicts what a full deployment would do (ZIPs rebuilt, Terraform modules targeted, S3
+objects uploaded/deleted, CloudFront paths invalidated) from local hashes and cached
+manifests only - nothing is built, applied or uploaded
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+
+from deploy_layers import LAYER_GROUPS_FILE, group_layer_targets
+from deploy_packaging import (
+    CACHE_DIR, LAYER_TARGET, collect_files, dependency_hash, hash_file, is_up_to_date, load_build_manifest,
+    read_recorded_hash, select_targets, source_hash,
+)
+from deploy_publish import (
+    HTML_CACHE_CONTROL, RUNTIME_CONFIG_KEY, STATIC_PAGES, PublishResult, cached_remote_manifest, diff_manifests,
+    invalidation_paths, local_manifest, pending_uploads, runtime_config_changed, upload_entry,
+)
+from deploy_terraform import (
+    INFRA_DIR, cached_outputs, current_fingerprints, load_modules, module_inputs, plan_targets,
+)
+
+PLAN_OUTPUT = CACHE_DIR / "deploy-plan.json"
+FRONTEND_DIR = Path("viraltenant-react")
+STATIC_PAGES_DIR = INFRA_DIR / "static-pages"
+BILLING_UPLOADS = {  # deploy_billing_config: local file -> key
+    INFRA_DIR / "config/billing-config.json": "config/billing-config.json",
+    INFRA_DIR / "assets/viraltenant-logo.png": "assets/viraltenant-logo.png",
+}
+
+
+def plan_artifacts(force=False):
+    """Lambda ZIPs and layers that would be rebuilt: [{"name", "kind", "zip_path", "reason"}]"""
+    manifest = load_build_manifest()
+    rebuilds = []
+    for target in select_targets():
+        if not Path(target.source_dir).exists():
+            continue
+        if force:
+            reason = "--rebuild"
+        elif not manifest.get(target.name):
+            reason = "never built"
+        elif not Path(target.zip_path).exists():
+            reason = "ZIP missing"
+        elif not is_up_to_date(target, source_hash(target, collect_files(target)), manifest):
+            reason = "sources or packaging rules changed"
+        else:
+            continue
+        rebuilds.append({"name": target.name, "kind": "function", "zip_path": str(target.zip_path),
+                         "reason": reason})
+
+    layers = [(LAYER_TARGET, dependency_hash(LAYER_TARGET))]
+    layers += list(group_layer_targets().values())
+    for target, digest in layers:
+        recorded = read_recorded_hash(target)
+        if digest is not None and recorded != digest:
+            reason = f"dependencies changed ({recorded[:12]} → {digest[:12]})" if recorded else "never built"
+            rebuilds.append({"name": target.name, "kind": "layer", "zip_path": str(target.zip_path),
+                             "hash_path": str(hash_file(target)), "reason": reason})
+    return rebuilds
+
+
+def plan_terraform(rebuilds, full=False):
+    """Terraform targets as deploy_infrastructure would compute them after the rebuilds
+
+    A module consuming a ZIP (or layer hash / groups.json) that is about to be rebuilt
+    counts as changed even though the file on disk is still the old one.
+    """
+    if full:
+        return {"targets": None, "reason": "--full requested", "modules": sorted(load_modules())}
+
+    rebuilt = set()
+    for r in rebuilds:
+        rebuilt.add(r["zip_path"])
+        if r["kind"] == "layer":  # layers are versioned by their hash file, groups.json lists the slim ones
+            rebuilt.update([r["hash_path"], str(LAYER_GROUPS_FILE)])
+    rebuilt = {Path(os.path.normpath(path)) for path in rebuilt}
+
+    fingerprints = current_fingerprints()
+    for name, module in load_modules().items():
+        zips, _, files = module_inputs(module["dir"])
+        if rebuilt & set(zips + files):
+            fingerprints["modules"][name] = dict(fingerprints["modules"][name], artifacts="pending-rebuild")
+
+    targets, reason = plan_targets(fingerprints)
+    modules = sorted(load_modules()) if targets is None else sorted(
+        t[len("module."):] for t in targets if t.startswith("module.")
+    )
+    return {"targets": targets, "reason": reason, "modules": modules}
+
+
+def _newest_mtime(directory, ignore):
+    newest = 0.0
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in ignore]
+        for name in files:
+            newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return newest
+
+
+def plan_uploads(bucket, outputs=None):
+    """S3 keys the frontend publish, static pages, billing and runtime config stages would write or delete"""
+    dist_dir = FRONTEND_DIR / "dist"
+    notes = []
+    frontend = {"uploaded": [], "deleted": [], "replaced": [], "unchanged": 0, "manifest": None}
+    if not dist_dir.exists():
+        notes.append("viraltenant-react/dist missing - the frontend build decides what is uploaded")
+    else:
+        if _newest_mtime(FRONTEND_DIR, {"node_modules", "dist"}) > os.path.getmtime(dist_dir):
+            notes.append("frontend sources are newer than dist - the upload list is from the last build")
+        local = local_manifest(dist_dir)
+        remote = cached_remote_manifest(bucket) if bucket else None
+        if remote is None:
+            notes.append("no cached deploy manifest for this bucket - assuming every file is uploaded once")
+            upload, delete, remote = sorted(local), [], {}
+            frontend["manifest"] = "none"
+        else:
+            upload, delete = diff_manifests(local, remote)
+            frontend["manifest"] = "cached"
+        result = PublishResult(upload, delete, [k for k in upload if k in remote], len(local) - len(upload))
+        frontend.update(vars(result))
+
+    # Static pages and billing config are uploaded (and invalidated) only when they changed
+    static = []
+    for source, aliases in STATIC_PAGES.items():
+        path = STATIC_PAGES_DIR / source
+        keys = [source, *aliases]
+        if path.exists() and pending_uploads(bucket, {key: upload_entry(path, HTML_CACHE_CONTROL) for key in keys}):
+            static += keys
+    billing = pending_uploads(bucket, {
+        key: upload_entry(path) for path, key in BILLING_UPLOADS.items() if path.exists()
+    })
+    runtime = [RUNTIME_CONFIG_KEY] if outputs is not None and runtime_config_changed(bucket, outputs) else []
+    stale = sorted(set(frontend["replaced"]) | set(frontend["deleted"]) | set(static) | set(billing))
+    return {
+        "frontend": frontend,
+        "static_pages": static,
+        "billing_config": billing,
+        "runtime_config": runtime,  # short TTL, never invalidated
+        "invalidation_paths": invalidation_paths(stale),
+    }, notes
+
+
+def build_plan(force=False, full=False):
+    """Everything a full deployment would change, as a JSON-able dict"""
+    started = time.perf_counter()
+    outputs = cached_outputs()
+    bucket = outputs.s3_bucket_name if outputs else None
+    notes = [] if outputs else ["no cached Terraform outputs - bucket and distribution unknown"]
+
+    rebuilds = plan_artifacts(force)
+    terraform = plan_terraform(rebuilds, full)
+    uploads, upload_notes = plan_uploads(bucket, outputs)
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "bucket": bucket,
+        "distribution": outputs.cloudfront_distribution_id if outputs else None,
+        "artifacts": rebuilds,
+        "terraform": terraform,
+        "s3": uploads,
+        "notes": notes + upload_notes,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def write_plan(plan, path=PLAN_OUTPUT):
+    """Write the plan as JSON ("-" = stdout)"""
+    text = json.dumps(plan, indent=2, sort_keys=True)
+    if str(path) == "-":
+        print(text)
+        return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(text + "\n", encoding="utf-8")
+
+
+def print_plan(plan, path=PLAN_OUTPUT):
+    """Human-readable summary of a plan"""
+    print("\n" + "=" * 60)
+    print("🔎 DEPLOY PLAN (nothing is built, applied or uploaded)")
+    print("=" * 60)
+
+    print(f"\n📦 {len(plan['artifacts'])} artifact(s) to rebuild")
+    for artifact in plan["artifacts"]:
+        print(f"   - {artifact['name']:<32} {artifact['reason']}")
+
+    terraform = plan["terraform"]
+    if terraform["targets"] is None:
+        print(f"\n🏗️ Terraform: full apply ({terraform['reason']})")
+    elif not terraform["targets"]:
+        print(f"\n🏗️ Terraform: nothing to apply ({terraform['reason']})")
+    else:
+        print(f"\n🏗️ Terraform: {len(terraform['targets'])} target(s) ({terraform['reason']})")
+        for address in terraform["targets"]:
+            print(f"   - {address}")
+
+    s3 = plan["s3"]
+    frontend = s3["frontend"]
+    print(f"\n📤 S3 ({plan['bucket'] or 'bucket unknown'}): {len(frontend['uploaded'])} frontend upload(s), "
+          f"{len(frontend['deleted'])} deletion(s), {frontend['unchanged']} unchanged")
+    for key in frontend["uploaded"][:10]:
+        print(f"   + {key}")
+    if len(frontend["uploaded"]) > 10:
+        print(f"   ... {len(frontend['uploaded']) - 10} more")
+    for key in frontend["deleted"]:
+        print(f"   - {key}")
+    print(f"   + {len(s3['static_pages'])} static page(s), {len(s3['billing_config'])} billing config file(s), "
+          f"runtime config {'changed' if s3['runtime_config'] else 'unchanged'}")
+
+    paths = s3["invalidation_paths"]
+    print(f"\n🔄 CloudFront ({plan['distribution'] or 'distribution unknown'}): "
+          f"{', '.join(paths) if paths else 'no invalidation'}")
+
+    for note in plan["notes"]:
+        print(f"⚠️ {note}")
+    print(f"\n⏱️ Planned in {plan['seconds']:.1f}s")
+    if str(path) != "-":
+        print(f"📄 JSON: {path}")
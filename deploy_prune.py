@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Layer Pruning
+Strips files a Lambda never loads from layer node_modules, stores identical data files once
+and picks the ZIP compression level from a measured size / decompression-time tradeoff
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+from fnmatch import fnmatch
+from pathlib import PurePosixPath
+
+from deploy_packaging import CACHE_DIR, file_sha256
+from deploy_zip import Symlink
+
+COMPRESSION_CACHE = CACHE_DIR / "compression-levels.json"
+
+# Never pruned, whatever the rules say (license texts must ship with the code)
+KEEP_RULES = ["package.json", "LICENSE*", "LICENCE*", "license*", "COPYING*", "NOTICE*"]
+
+# Identical files are stored once and linked; modules are excluded because Node resolves
+# a symlinked module to its real path, which would change where its own requires resolve
+DEDUPE_MIN_SIZE = 1024
+MODULE_SUFFIXES = {".js", ".cjs", ".mjs", ".node"}
+
+# Compression level choice: cold start pays for the download plus the inflate time
+COMPRESSION_LEVELS = [1, 6, 9]
+DOWNLOAD_BYTES_PER_SECOND = 50 * 1024 * 1024  # conservative S3 -> Lambda throughput
+SAMPLE_BYTES = 16 * 1024 * 1024
+TIMING_ROUNDS = 3
+
+
+def package_of(arcname):
+    """Install path of the package a layer file belongs to ("" outside node_modules)"""
+    parts = arcname.split("/")
+    root = ""
+    i = 0
+    while i < len(parts) - 1:
+        if parts[i] == "node_modules" and i + 1 < len(parts) - 1:
+            end = i + 3 if parts[i + 1].startswith("@") else i + 2
+            root = "/".join(parts[:end])
+            i = end
+        else:
+            i += 1
+    return root
+
+
+def _matches(segments, patterns):
+    return any(fnmatch(segment, pattern) for segment in segments for pattern in patterns)
+
+
+def is_pruned(arcname, rules):
+    """True if a file inside a package matches a prune rule and no keep rule"""
+    root = package_of(arcname)
+    if not root:
+        return False
+    segments = arcname[len(root) + 1:].split("/")
+    return _matches(segments, rules) and not _matches(segments[-1:], KEEP_RULES)
+
+
+def prune_files(files, rules):
+    """Drop pruned files from (archive name, path) pairs
+
+    Returns (kept files, {package: [files removed, bytes removed]}).
+    """
+    kept, removed = [], {}
+    for arcname, path in files:
+        if is_pruned(arcname, rules):
+            stats = removed.setdefault(package_of(arcname), [0, 0])
+            stats[0] += 1
+            stats[1] += os.path.getsize(path)
+        else:
+            kept.append((arcname, path))
+    return kept, removed
+
+
+def dedupe_files(files):
+    """Replace repeated identical data files by relative symlinks to their first copy
+
+    Returns (entries for write_zip, {package: [files linked, bytes saved]}).
+    """
+    first_copy = {}
+    entries, saved = [], {}
+    for arcname, path in sorted(files):
+        size = os.path.getsize(path)
+        if size < DEDUPE_MIN_SIZE or PurePosixPath(arcname).suffix in MODULE_SUFFIXES:
+            entries.append((arcname, path))
+            continue
+        key = (size, file_sha256(path))
+        if key not in first_copy:
+            first_copy[key] = arcname
+            entries.append((arcname, path))
+            continue
+        target = os.path.relpath(first_copy[key], PurePosixPath(arcname).parent.as_posix())
+        entries.append((arcname, Symlink(PurePosixPath(target).as_posix())))
+        stats = saved.setdefault(package_of(arcname), [0, 0])
+        stats[0] += 1
+        stats[1] += size
+    return entries, saved
+
+
+def _sample(entries):
+    """Deterministic sample of file contents (largest files first, up to SAMPLE_BYTES)"""
+    paths = sorted(
+        (path for _, path in entries if not isinstance(path, Symlink)),
+        key=lambda p: (-os.path.getsize(p), str(p)),
+    )
+    sample, total = [], 0
+    for path in paths:
+        if total >= SAMPLE_BYTES:
+            break
+        with open(path, "rb") as f:
+            data = f.read()
+        sample.append(data)
+        total += len(data)
+    return sample
+
+
+def measure_levels(entries, levels=COMPRESSION_LEVELS):
+    """Compressed size and inflate time of a sample per deflate level"""
+    sample = _sample(entries)
+    raw = sum(len(data) for data in sample)
+    measurements = {}
+    for level in levels:
+        compressed = []
+        for data in sample:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)  # raw deflate, as in ZIP
+            compressed.append(compressor.compress(data) + compressor.flush())
+        best = None
+        for _ in range(TIMING_ROUNDS):
+            started = time.perf_counter()
+            for data in compressed:
+                zlib.decompress(data, -15)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        size = sum(len(data) for data in compressed)
+        measurements[level] = {
+            "raw_bytes": raw,
+            "bytes": size,
+            "inflate_seconds": round(best, 4),
+            "cold_start_seconds": round(size / DOWNLOAD_BYTES_PER_SECOND + best, 4),
+        }
+    return measurements
+
+
+def _entries_key(entries):
+    digest = hashlib.sha256()
+    for arcname, path in entries:
+        size = len(path.target) if isinstance(path, Symlink) else os.path.getsize(path)
+        digest.update(f"{arcname}:{size}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def choose_compresslevel(name, entries):
+    """Deflate level with the lowest estimated download + inflate time for these entries
+
+    The choice is cached per set of entries so rebuilding the same tree gives the same ZIP.
+    Returns (level, measurements).
+    """
+    cache = {}
+    if COMPRESSION_CACHE.exists():
+        try:
+            cache = json.loads(COMPRESSION_CACHE.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            cache = {}
+    key = _entries_key(entries)
+    entry = cache.get(name)
+    if entry and entry.get("key") == key:
+        return entry["level"], entry["measurements"]
+
+    measurements = measure_levels(entries)
+    level = min(measurements, key=lambda lvl: (measurements[lvl]["cold_start_seconds"], lvl))
+    cache[name] = {"key": key, "level": level, "measurements": measurements}
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = COMPRESSION_CACHE.with_name(COMPRESSION_CACHE.name + ".tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, COMPRESSION_CACHE)
+    return level, measurements
+
+
+def prepare_entries(name, files, rules):
+    """Prune, dedupe and pick a compression level for one layer
+
+    Returns (entries, compresslevel, stats) where stats holds the per-package savings
+    and the level measurements for print_prune_report.
+    """
+    kept, removed = prune_files(files, rules)
+    entries, linked = dedupe_files(kept)
+    level, measurements = choose_compresslevel(name, entries)
+    packages = {}
+    for package, (count, size) in removed.items():
+        packages.setdefault(package, {"pruned_files": 0, "pruned_bytes": 0, "deduped_bytes": 0})
+        packages[package]["pruned_files"] += count
+        packages[package]["pruned_bytes"] += size
+    for package, (_, size) in linked.items():
+        packages.setdefault(package, {"pruned_files": 0, "pruned_bytes": 0, "deduped_bytes": 0})
+        packages[package]["deduped_bytes"] += size
+    stats = {
+        "packages": packages,
+        "pruned_bytes": sum(p["pruned_bytes"] for p in packages.values()),
+        "deduped_bytes": sum(p["deduped_bytes"] for p in packages.values()),
+        "levels": measurements,
+    }
+    return entries, level, stats
+
+
+def print_prune_report(result, top=15):
+    """Bytes saved per package and the compression level measurements of a layer build"""
+    stats = result.get("prune")
+    if not stats:
+        return
+    packages = sorted(
+        stats["packages"].items(),
+        key=lambda item: (-(item[1]["pruned_bytes"] + item[1]["deduped_bytes"]), item[0]),
+    )
+    print(f"\n✂️ Pruned {result['name']}: {stats['pruned_bytes'] / (1024*1024):.2f} MB removed, "
+          f"{stats['deduped_bytes'] / (1024*1024):.2f} MB deduplicated")
+    print(f"{'Package':<52} {'Files':>6} {'Pruned':>10} {'Deduped':>10}")
+    print("-" * 81)
+    for package, saved in packages[:top]:
+        print(f"{package.split('node_modules/', 1)[-1]:<52} {saved['pruned_files']:>6} "
+              f"{saved['pruned_bytes'] / 1024:>8.0f}KB {saved['deduped_bytes'] / 1024:>8.0f}KB")
+    if len(packages) > top:
+        rest = sum(p["pruned_bytes"] + p["deduped_bytes"] for _, p in packages[top:])
+        print(f"{f'... {len(packages) - top} more packages':<52} {'':>6} {rest / 1024:>8.0f}KB")
+
+    print(f"\n🗜️ Compression level {result['compresslevel']} (estimated download + inflate per level):")
+    for level, m in sorted(stats["levels"].items(), key=lambda item: int(item[0])):
+        ratio = m["bytes"] / m["raw_bytes"] * 100 if m["raw_bytes"] else 0
+        print(f"   level {level}: {ratio:.1f}% of sample, inflate {m['inflate_seconds'] * 1000:.0f} ms, "
+              f"cold start cost {m['cold_start_seconds'] * 1000:.0f} ms")
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Frontend Publisher
+Publishes viraltenant-react/dist by diffing it against a content-hash manifest of what is
+deployed: only changed objects are uploaded (in parallel), stale ones deleted in batches
+"""
+
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from fnmatch import fnmatch
+from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+from deploy_aws import MAX_CONCURRENCY, delete_objects, list_objects, put_object, read_object, upload_file
+from deploy_compress import CONTENT_ENCODING, is_compressible, precompress
+from deploy_packaging import CACHE_DIR, file_sha256
+
+# Deploy manifest stored next to the site ({key: {"sha256", "cache_control", "content_encoding"}})
+MANIFEST_KEY = ".deploy/frontend-manifest.json"
+MANIFEST_VERSION = 2
+MANIFEST_CACHE_DIR = CACHE_DIR / "frontend-manifests"  # local copy of the last manifest published per bucket
+
+# Per-environment values the React bundle fetches at startup (see src/config/runtime-config.ts)
+RUNTIME_CONFIG_KEY = "runtime-config.json"
+RUNTIME_CONFIG_CACHE_CONTROL = "public, max-age=60"  # short TTL instead of an invalidation per change
+RUNTIME_CONFIG_DIR = CACHE_DIR / "runtime-configs"  # last published runtime config per bucket
+
+# Files uploaded outside the publish manifest (static pages, billing config): {key: upload_entry}
+UPLOADS_CACHE_DIR = CACHE_DIR / "uploads"
+_uploads_lock = threading.Lock()
+
+# Static pages outside the React build: {file: [alias keys]} (see deploy_static_pages)
+STATIC_PAGES = {
+    "tenant-creation.html": ["tenant-registration.html"],  # old name kept for backward compatibility
+}
+
+# Objects in the website bucket that are managed elsewhere and never deleted by a publish
+PROTECTED_PREFIXES = [
+    "invoices/",                    # generated by billing-cron
+    "config/",                      # deploy_billing_config
+    "assets/viraltenant-logo.png",  # deploy_billing_config
+    ".deploy/",                     # publisher manifest
+    RUNTIME_CONFIG_KEY,             # publish_runtime_config
+    *STATIC_PAGES,
+    *[alias for aliases in STATIC_PAGES.values() for alias in aliases],
+]
+
+# Cache-Control per file class, first matching pattern wins
+HTML_CACHE_CONTROL = "public, max-age=3600"
+CACHE_RULES = [
+    ("*.html", HTML_CACHE_CONTROL),
+    ("assets/*", "public, max-age=31536000, immutable"),  # Vite output, content-hashed names
+    ("sw.js", "public, max-age=0, must-revalidate"),       # service worker must update promptly
+    ("*.webmanifest", HTML_CACHE_CONTROL),
+    ("robots.txt", HTML_CACHE_CONTROL),
+    ("sitemap.xml", HTML_CACHE_CONTROL),
+]
+DEFAULT_CACHE_CONTROL = "public, max-age=31536000"
+
+# CloudFront invalidation: wildcard a directory once this many of its objects changed,
+# invalidate everything once more paths than this remain
+INVALIDATION_COLLAPSE_MIN = 3
+INVALIDATION_MAX_PATHS = 15
+
+
+class PublishResult:
+    """Keys touched by a publish (used to scope the CloudFront invalidation)"""
+
+    def __init__(self, uploaded=None, deleted=None, replaced=None, unchanged=0):
+        self.uploaded = list(uploaded or [])
+        self.deleted = list(deleted or [])
+        self.replaced = list(replaced or [])  # uploaded keys that were already deployed
+        self.unchanged = unchanged
+
+    @property
+    def changed(self):
+        return sorted(self.uploaded + self.deleted)
+
+    @property
+    def stale(self):
+        """Keys edge caches may hold an outdated copy of (new keys were never cached)"""
+        return sorted(self.replaced + self.deleted)
+
+
+def is_protected(key):
+    return any(key == prefix or key.startswith(prefix) for prefix in PROTECTED_PREFIXES)
+
+
+def cache_control_for(key):
+    """Cache-Control header for an object key according to CACHE_RULES"""
+    for pattern, cache_control in CACHE_RULES:
+        if fnmatch(key, pattern):
+            return cache_control
+    return DEFAULT_CACHE_CONTROL
+
+
+def local_manifest(dist_dir):
+    """Manifest of the build output: {key: {"sha256", "cache_control", "content_encoding"}}"""
+    dist_dir = Path(dist_dir)
+    manifest = {}
+    for path in sorted(dist_dir.rglob("*")):
+        if not path.is_file():
+            continue
+        key = path.relative_to(dist_dir).as_posix()
+        if is_protected(key):
+            continue
+        manifest[key] = {
+            "sha256": file_sha256(path),
+            "cache_control": cache_control_for(key),
+            "content_encoding": CONTENT_ENCODING if is_compressible(path) else None,
+        }
+    return manifest
+
+
+def load_remote_manifest(bucket):
+    """Manifest of the last publish, or None if the bucket has none (first run, manual sync)"""
+    body = read_object(bucket, MANIFEST_KEY)
+    if body is None:
+        return None
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError:
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    return data.get("objects", {})
+
+
+def _manifest_cache(bucket):
+    return MANIFEST_CACHE_DIR / f"{bucket}.json"
+
+
+def cached_remote_manifest(bucket):
+    """Local copy of the manifest last published to this bucket, or None (no S3 call)"""
+    path = _manifest_cache(bucket)
+    if not path.exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("bucket") != bucket or data.get("version") != MANIFEST_VERSION:
+        return None
+    return data.get("objects", {})
+
+
+def upload_entry(path, cache_control=None):
+    """What decides whether a single uploaded file changed"""
+    return {"sha256": file_sha256(path), "cache_control": cache_control}
+
+
+def _uploads_cache(bucket):
+    return UPLOADS_CACHE_DIR / f"{bucket}.json"
+
+
+def load_uploads(bucket):
+    """{key: upload_entry} of the single files last uploaded to this bucket (no S3 call)"""
+    path = _uploads_cache(bucket)
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def pending_uploads(bucket, entries):
+    """Keys of {key: upload_entry} that differ from their last upload to this bucket"""
+    uploaded = load_uploads(bucket) if bucket else {}
+    return sorted(key for key, entry in entries.items() if uploaded.get(key) != entry)
+
+
+def record_uploads(bucket, entries):
+    """Remember successful uploads (stages uploading to the same bucket run concurrently)"""
+    with _uploads_lock:
+        uploaded = load_uploads(bucket)
+        uploaded.update(entries)
+        UPLOADS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _uploads_cache(bucket)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(uploaded, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def diff_manifests(local, remote):
+    """(keys to upload, keys to delete) between the build output and the deployed manifest"""
+    upload = [key for key, entry in local.items() if remote.get(key) != entry]
+    delete = [key for key in remote if key not in local and not is_protected(key)]
+    return sorted(upload), sorted(delete)
+
+
+def publish(dist_dir, bucket, dry_run=False):
+    """Upload changed files of dist_dir in parallel, delete stale objects, store the new manifest
+
+    Without a remote manifest every file is uploaded once and stale objects are found by
+    listing the bucket (HTML is left alone then, as the old aws s3 sync did). HTML goes up
+    after all assets so no page references an asset that is not there yet.
+    Returns a PublishResult.
+    """
+    dist_dir = Path(dist_dir)
+    started = time.perf_counter()
+    local = local_manifest(dist_dir)
+    remote = load_remote_manifest(bucket)
+
+    if remote is None:
+        print("🆕 No deploy manifest in bucket, uploading everything once")
+        deployed = list_objects(bucket)
+        upload = sorted(local)
+        delete = sorted(
+            key for key in deployed
+            if key not in local and not is_protected(key) and not fnmatch(key, "*.html")
+        )
+    else:
+        deployed = remote
+        upload, delete = diff_manifests(local, remote)
+
+    replaced = [key for key in upload if key in deployed]
+    result = PublishResult(upload, delete, replaced, unchanged=len(local) - len(upload))
+    print(f"📋 {len(upload)} to upload, {len(delete)} to delete, {result.unchanged} unchanged")
+    if dry_run:
+        return result
+
+    # Text assets go up gzip-encoded at maximum level (compressed in a process pool)
+    variants = precompress([dist_dir / key for key in upload])
+
+    def put(key):
+        path = dist_dir / key
+        upload_file(variants.get(path, path), bucket, key, cache_control=local[key]["cache_control"],
+                    content_encoding=local[key]["content_encoding"])
+
+    if upload:
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(upload))) as pool:
+            list(pool.map(put, [key for key in upload if not fnmatch(key, "*.html")]))
+            list(pool.map(put, [key for key in upload if fnmatch(key, "*.html")]))
+
+    # Old objects go only after everything new is in place (old HTML keeps working meanwhile)
+    if delete:
+        delete_objects(bucket, delete)
+
+    put_object(
+        bucket,
+        MANIFEST_KEY,
+        json.dumps({"version": MANIFEST_VERSION, "objects": local}, indent=2, sort_keys=True).encode("utf-8"),
+        content_type="application/json",
+        cache_control="no-store",
+    )
+    MANIFEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _manifest_cache(bucket).write_text(
+        json.dumps({"bucket": bucket, "version": MANIFEST_VERSION, "objects": local}, sort_keys=True),
+        encoding="utf-8",
+    )
+    print(f"✅ Published {len(upload)} objects, deleted {len(delete)} in {time.perf_counter() - started:.1f}s")
+    return result
+
+
+def runtime_config(outputs):
+    """Runtime config of one environment from its Terraform outputs (None if outputs are missing)"""
+    api_url = outputs.api_gateway_url
+    if not (api_url and outputs.cognito_user_pool_id and outputs.cognito_client_id):
+        return None
+    api = f"{api_url}/api"
+    return {
+        "region": outputs.cognito_user_pool_id.split("_")[0],
+        "cognito": {
+            "userPoolId": outputs.cognito_user_pool_id,
+            "clientId": outputs.cognito_client_id,
+        },
+        "api": {
+            "user": api_url,
+            "auth": api_url,
+            "chat": api,
+            "shop": api,
+            "contactForm": api,
+            "creatorOnboarding": f"{api}/onboarding",
+            "domainRouting": f"{api}/routing",
+            "videos": api,
+        },
+    }
+
+
+def _runtime_config_cache(bucket):
+    return RUNTIME_CONFIG_DIR / f"{bucket}.json"
+
+
+def _runtime_config_body(config):
+    return json.dumps(config, indent=2, sort_keys=True).encode("utf-8")
+
+
+def runtime_config_changed(bucket, outputs):
+    """True if publish_runtime_config would upload (no S3 call)"""
+    config = runtime_config(outputs)
+    if config is None:
+        return False
+    cached = _runtime_config_cache(bucket)
+    return not cached.exists() or cached.read_bytes() != _runtime_config_body(config)
+
+
+def publish_runtime_config(bucket, outputs):
+    """Upload runtime-config.json next to the bundle if it changed; returns the uploaded keys
+
+    The local copy of the last upload per bucket decides whether anything changed. The short
+    max-age lets edge caches pick up a new config without an invalidation.
+    """
+    config = runtime_config(outputs)
+    if config is None:
+        print("⚠️ Missing required Terraform outputs (API Gateway URL, Cognito IDs) for the runtime config")
+        return []
+    if not runtime_config_changed(bucket, outputs):
+        print(f"✅ {RUNTIME_CONFIG_KEY} unchanged")
+        return []
+
+    print(f"🔧 API Gateway URL: {config['api']['user']}")
+    print(f"🔧 User Pool ID: {config['cognito']['userPoolId']}")
+    print(f"🔧 Client ID: {config['cognito']['clientId']}")
+    body = _runtime_config_body(config)
+    put_object(bucket, RUNTIME_CONFIG_KEY, body, content_type="application/json",
+               cache_control=RUNTIME_CONFIG_CACHE_CONTROL)
+    RUNTIME_CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    _runtime_config_cache(bucket).write_bytes(body)
+    print(f"✅ {RUNTIME_CONFIG_KEY} published ({RUNTIME_CONFIG_CACHE_CONTROL})")
+    return [RUNTIME_CONFIG_KEY]
+
+
+def invalidation_paths(keys, collapse_min=INVALIDATION_COLLAPSE_MIN, max_paths=INVALIDATION_MAX_PATHS):
+    """Smallest sensible CloudFront path list for a set of changed object keys
+
+    index.html also invalidates its directory URL (default root object). Directories with at
+    least collapse_min changed paths become one wildcard; above max_paths paths the result is
+    ["/*"]. No keys -> [] (nothing to invalidate).
+    """
+    paths = set()
+    for key in keys:
+        key = quote(key, safe="/-_.~")  # CloudFront expects URL-encoded paths
+        paths.add("/" + key)
+        if key == "index.html" or key.endswith("/index.html"):
+            paths.add("/" + key[:-len("index.html")])
+
+    by_dir = defaultdict(list)
+    for path in paths:
+        by_dir[path.rsplit("/", 1)[0]].append(path)
+
+    collapsed = set()
+    for directory, items in by_dir.items():
+        # The root wildcard is a full invalidation, only max_paths decides on that
+        if directory and len(items) >= collapse_min:
+            collapsed.add(directory + "/*")
+        else:
+            collapsed.update(items)
+
+    # Drop paths already covered by a wildcard of a parent directory
+    wildcards = [path[:-1] for path in collapsed if path.endswith("/*")]
+    result = sorted(
+        path for path in collapsed
+        if not any(path != prefix + "*" and path.startswith(prefix) for prefix in wildcards)
+    )
+
+    if "/*" in result or len(result) > max_paths:
+        return ["/*"]
+    return result
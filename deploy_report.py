@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Deploy Performance Report
+Writes one machine-readable report per deploy run, keeps a local history and compares the
+latest run against a rolling baseline to flag slower stages and larger artifacts
+"""
+
+import json
+import time
+import threading
+import statistics
+from contextlib import contextmanager
+
+from deploy_aws import TRANSFER_STATS
+from deploy_packaging import CACHE_DIR
+from deploy_runner import COMMAND_STATS
+
+REPORT_FILE = CACHE_DIR / "deploy-report.json"
+HISTORY_FILE = CACHE_DIR / "deploy-history.jsonl"
+REPORT_VERSION = 1
+
+# --compare defaults: baseline = median of the last BASELINE_RUNS successful runs (same mode)
+BASELINE_RUNS = 5
+DEFAULT_SLOWER_PCT = 25.0
+DEFAULT_LARGER_PCT = 10.0
+MIN_STAGE_SECONDS = 2.0  # shorter stages are too noisy to flag
+
+_lock = threading.Lock()
+_report = None
+
+
+def record_stage(name, seconds, status="done"):
+    """Wall time of one stage"""
+    with _lock:
+        if _report is not None:
+            _report["stages"][name] = {"seconds": round(seconds, 3), "status": status}
+
+
+def record_stages(stages):
+    """Timings of scheduler Stage objects (stages that never started are left out)"""
+    for stage in stages:
+        if stage.started is not None:
+            record_stage(stage.name, stage.seconds, stage.status)
+
+
+def record_packages(results):
+    """ZIP sizes from a packaging run ({name: bytes}, cached packages included)"""
+    with _lock:
+        if _report is not None:
+            for result in results:
+                if result["bytes"]:
+                    _report["packages"][result["name"]] = result["bytes"]
+
+
+def add(metric, amount):
+    """Add to a numeric metric (e.g. terraform_seconds over init, plan and apply)"""
+    with _lock:
+        if _report is not None:
+            _report["metrics"][metric] = round(_report["metrics"].get(metric, 0) + amount, 3)
+
+
+@contextmanager
+def timed(stage):
+    """Record the wall time of a block as a stage"""
+    started = time.perf_counter()
+    status = "failed"
+    try:
+        yield
+        status = "done"
+    finally:
+        record_stage(stage, time.perf_counter() - started, status)
+
+
+@contextmanager
+def deploy_run(mode):
+    """Collect a report for the enclosed deploy and write it to the report and history files"""
+    global _report
+    started = time.perf_counter()
+    with _lock:
+        _report = {
+            "version": REPORT_VERSION,
+            "mode": mode,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "success": False,
+            "stages": {},
+            "packages": {},
+            "metrics": {},
+        }
+    try:
+        yield _report
+        _report["success"] = True
+    finally:
+        with _lock:
+            report, _report = _report, None
+        report["wall_seconds"] = round(time.perf_counter() - started, 3)
+        report["uploads"] = dict(TRANSFER_STATS)
+        report["commands"] = list(COMMAND_STATS)
+        previous = load_history()
+        write_report(report)
+        regressions = compare(report, previous)
+        if report["success"] and regressions:
+            print(f"⚠️ {len(regressions)} regression(s) against the baseline - see python deploy.py --compare")
+
+
+def write_report(report):
+    """Write the report of this run and append it to the history"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, sort_keys=True) + "\n")
+    print(f"\n📈 Deploy report: {REPORT_FILE} (history: {HISTORY_FILE})")
+
+
+def load_history():
+    """All recorded runs, oldest first (unreadable lines are skipped)"""
+    if not HISTORY_FILE.exists():
+        return []
+    runs = []
+    with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return runs
+
+
+def baseline(history, mode, runs=BASELINE_RUNS):
+    """Median stage seconds and package bytes over the last successful runs of a mode"""
+    previous = [r for r in history if r.get("mode") == mode and r.get("success")][-runs:]
+    stage_samples, package_samples = {}, {}
+    for run in previous:
+        for name, stage in run.get("stages", {}).items():
+            if stage.get("status") == "done":
+                stage_samples.setdefault(name, []).append(stage["seconds"])
+        for name, size in run.get("packages", {}).items():
+            package_samples.setdefault(name, []).append(size)
+    return {
+        "runs": len(previous),
+        "stages": {name: statistics.median(v) for name, v in stage_samples.items()},
+        "packages": {name: statistics.median(v) for name, v in package_samples.items()},
+    }
+
+
+def compare(report, history, slower_pct=DEFAULT_SLOWER_PCT, larger_pct=DEFAULT_LARGER_PCT):
+    """Regressions of report against the baseline: list of (kind, name, value, baseline, percent)"""
+    base = baseline(history, report.get("mode"))
+    regressions = []
+    for name, stage in report.get("stages", {}).items():
+        reference = base["stages"].get(name)
+        if reference is None or stage.get("status") != "done" or stage["seconds"] < MIN_STAGE_SECONDS:
+            continue
+        change = (stage["seconds"] - reference) / reference * 100 if reference else 0.0
+        if change > slower_pct:
+            regressions.append(("stage", name, stage["seconds"], reference, change))
+    for name, size in report.get("packages", {}).items():
+        reference = base["packages"].get(name)
+        if not reference:
+            continue
+        change = (size - reference) / reference * 100
+        if change > larger_pct:
+            regressions.append(("package", name, size, reference, change))
+    return regressions
+
+
+def print_comparison(slower_pct=DEFAULT_SLOWER_PCT, larger_pct=DEFAULT_LARGER_PCT):
+    """Compare the latest run with the rolling baseline of the runs before it
+
+    Returns the number of regressions found.
+    """
+    history = load_history()
+    if not history:
+        print("⚠️ No deploy history yet - run a deployment first")
+        return 0
+
+    report, previous = history[-1], history[:-1]
+    base = baseline(previous, report.get("mode"))
+
+    print("\n" + "=" * 60)
+    print(f"📈 DEPLOY REPORT: {report['mode']} run of {report['started_at']}")
+    print("=" * 60)
+    print(f"Baseline: median of {base['runs']} previous successful '{report['mode']}' runs")
+    print(f"Thresholds: stages > {slower_pct:.0f}% slower, packages > {larger_pct:.0f}% larger")
+
+    print(f"\n{'Stage':<24} {'Now':>9} {'Baseline':>9} {'Change':>8}")
+    print("-" * 54)
+    for name, stage in report.get("stages", {}).items():
+        reference = base["stages"].get(name)
+        ref_text = f"{reference:.1f}s" if reference is not None else "-"
+        change = f"{(stage['seconds'] - reference) / reference * 100:+.0f}%" if reference else "-"
+        print(f"{name:<24} {stage['seconds']:>8.1f}s {ref_text:>9} {change:>8}")
+
+    uploads = report.get("uploads", {})
+    metrics = report.get("metrics", {})
+    print("-" * 54)
+    print(f"Wall time: {report.get('wall_seconds', 0):.1f}s, Terraform: {metrics.get('terraform_seconds', 0):.1f}s")
+    print(f"Packaged: {sum(report.get('packages', {}).values()) / 1024:.0f} KB in {len(report.get('packages', {}))} packages")
+    print(f"Uploaded: {uploads.get('uploaded_objects', 0)} objects, {uploads.get('uploaded_bytes', 0) / 1024:.0f} KB; "
+          f"deleted: {uploads.get('deleted_objects', 0)}; invalidation paths: {uploads.get('invalidation_paths', 0)}")
+
+    regressions = compare(report, previous, slower_pct, larger_pct)
+    if not regressions:
+        print("\n✅ No regressions against the baseline")
+        return 0
+
+    print(f"\n⚠️ {len(regressions)} regression(s):")
+    for kind, name, value, reference, change in regressions:
+        if kind == "stage":
+            print(f"   🐢 {name}: {value:.1f}s vs {reference:.1f}s ({change:+.0f}%)")
+        else:
+            print(f"   📦 {name}: {value / 1024:.1f} KB vs {reference / 1024:.1f} KB ({change:+.0f}%)")
+    return len(regressions)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Command Runner
+asyncio-based subprocess runner: streams output chunk-wise, keeps full logs on disk and only
+a bounded tail in memory, records timings. Concurrent deploy stages each drive their own
+command (deploy_scheduler tags every line with the stage)
+"""
+
+import sys
+import time
+import shutil
+import asyncio
+import threading
+from collections import deque
+
+from deploy_packaging import CACHE_DIR
+
+LOG_ROOT = CACHE_DIR / "logs"
+KEEP_LOG_RUNS = 10
+TAIL_LINES = 200
+READ_CHUNK = 64 * 1024
+
+_lock = threading.Lock()
+_run_dir = None
+
+# Stats of every command run by this process (read by the deploy report)
+COMMAND_STATS = []
+
+
+class Command:
+    """One subprocess to run: shell command, working directory and output tag"""
+
+    def __init__(self, command, cwd=None, tag=None, show_output=True, capture=False):
+        self.command = command
+        self.cwd = cwd
+        self.tag = tag
+        self.show_output = show_output
+        self.capture = capture  # keep the complete stdout (e.g. for JSON) instead of a tail
+
+
+class CommandResult:
+    """Exit code, output (tail or full capture) and timing of a finished command"""
+
+    def __init__(self, command, returncode, stdout, stderr, log_path, seconds, lines, bytes_, peak_rate):
+        self.command = command
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.log_path = log_path
+        self.seconds = seconds
+        self.lines = lines
+        self.bytes = bytes_
+        self.peak_rate = peak_rate  # lines per second in the busiest one-second window
+
+    def as_dict(self):
+        return {
+            "command": self.command.command,
+            "tag": self.command.tag,
+            "returncode": self.returncode,
+            "seconds": round(self.seconds, 3),
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "peak_lines_per_second": self.peak_rate,
+            "log": str(self.log_path),
+        }
+
+
+def log_dir():
+    """Log directory of this deploy run (older runs beyond KEEP_LOG_RUNS are removed)"""
+    global _run_dir
+    with _lock:
+        if _run_dir is None:
+            LOG_ROOT.mkdir(parents=True, exist_ok=True)
+            runs = sorted(p for p in LOG_ROOT.iterdir() if p.is_dir())
+            for old in runs[:max(0, len(runs) - KEEP_LOG_RUNS + 1)]:
+                shutil.rmtree(old, ignore_errors=True)
+            _run_dir = LOG_ROOT / time.strftime("%Y%m%d-%H%M%S")
+            _run_dir.mkdir(exist_ok=True)
+        return _run_dir
+
+
+def _log_path(tag):
+    name = "".join(c if c.isalnum() or c in "-_" else "_" for c in (tag or "command"))
+    return log_dir() / f"{name}.log"
+
+
+async def _pump(stream, command, log, tail, capture, counters):
+    """Copy a stream chunk-wise to the log file, the console and the in-memory tail"""
+    partial = b""
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        counters["bytes"] += len(chunk)
+        log.write(chunk)
+        *lines, partial = (partial + chunk).split(b"\n")
+        _emit(lines, command, tail, capture, counters)
+    if partial:
+        _emit([partial], command, tail, capture, counters)
+
+
+def _emit(raw_lines, command, tail, capture, counters):
+    if not raw_lines:
+        return
+    lines = [line.decode("utf-8", errors="replace").rstrip("\r") for line in raw_lines]
+    second = int(time.perf_counter())
+    counters["per_second"][second] = counters["per_second"].get(second, 0) + len(lines)
+    counters["lines"] += len(lines)
+    tail.extend(lines)
+    if capture is not None:
+        capture.extend(lines)
+    if command.show_output:
+        # One write per chunk instead of one print per line keeps noisy tools fast
+        sys.stdout.write("".join(f"{line}\n" for line in lines))
+
+
+async def _run(command):
+    started = time.perf_counter()
+    log_path = _log_path(command.tag)
+    tail = deque(maxlen=TAIL_LINES)
+    capture = [] if command.capture else None
+    counters = {"lines": 0, "bytes": 0, "per_second": {}}
+
+    process = await asyncio.create_subprocess_shell(
+        command.command,
+        cwd=command.cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE if command.capture else asyncio.subprocess.STDOUT,
+    )
+    with open(log_path, "ab") as log:
+        log.write(f"$ {command.command}\n".encode("utf-8"))
+        if command.capture:
+            stdout_task = _pump(process.stdout, command, log, tail, capture, counters)
+            stderr_data, _ = await asyncio.gather(process.stderr.read(), stdout_task)
+            log.write(stderr_data)
+        else:
+            stderr_data = b""
+            await _pump(process.stdout, command, log, tail, capture, counters)
+        returncode = await process.wait()
+        log.write(f"\n[exit code {returncode}]\n".encode("utf-8"))
+
+    result = CommandResult(
+        command,
+        returncode,
+        "\n".join(capture if capture is not None else tail),
+        stderr_data.decode("utf-8", errors="replace"),
+        log_path,
+        time.perf_counter() - started,
+        counters["lines"],
+        counters["bytes"],
+        max(counters["per_second"].values(), default=0),
+    )
+    with _lock:
+        COMMAND_STATS.append(result.as_dict())
+    return result
+
+
+def run_subprocess(command):
+    """Run a Command on its own event loop and return its CommandResult
+
+    Called from the stage threads of deploy_scheduler, whose output proxy prefixes every
+    line with the stage tag, so several commands still run (and log) side by side.
+    """
+    return asyncio.run(_run(command))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Deploy Stage Scheduler
+Runs deploy stages as a dependency graph: independent stages run concurrently,
+every output line is prefixed with its stage tag and the critical path is reported at the end
+"""
+
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+_current = threading.local()
+
+FINISHED = ("done", "resumed")  # statuses that let dependent stages start
+STATUS_ICONS = {"done": "✅", "resumed": "♻️", "failed": "❌", "skipped": "⏭️", "pending": "•", "running": "…"}
+
+
+def current_tag():
+    """Output tag of the stage running in this thread (None outside of run_stages)"""
+    return getattr(_current, "tag", None)
+
+
+class Stage:
+    """One deploy step: a callable plus the names of the stages it depends on
+
+    func is called with a dict of {stage name: return value} of all finished stages.
+    inputs (same argument) returns what the stage depends on for checkpoints; it is evaluated
+    before the stage runs and again after it succeeded (the recorded key). Stages without
+    inputs always run. restore turns a checkpointed result back into the
+    object func returns (e.g. TerraformOutputs) when a resumed run skips the stage.
+    """
+
+    def __init__(self, name, func, deps=(), tag=None, inputs=None, restore=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.tag = tag or name
+        self.inputs = inputs
+        self.restore = restore
+        self.key = None  # checkpoint key of this run (None = not checkpointed)
+        self.status = "pending"
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def seconds(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class StageFailed(Exception):
+    """Raised by run_stages when at least one stage failed"""
+
+
+class TaggedOutput:
+    """stdout/stderr proxy that prefixes every line written from a stage thread with [tag]"""
+
+    def __init__(self, stream, lock):
+        self._stream = stream
+        self._lock = lock
+        self._partial = {}
+
+    def write(self, text):
+        tag = getattr(_current, "tag", None)
+        if tag is None:
+            with self._lock:
+                self._stream.write(text)
+            return len(text)
+
+        key = threading.get_ident()
+        *lines, rest = (self._partial.get(key, "") + text).split("\n")
+        self._partial[key] = rest
+        if lines:
+            with self._lock:
+                self._stream.write("".join(f"[{tag}] {line}\n" for line in lines))
+                self._stream.flush()
+        return len(text)
+
+    def flush_partial(self):
+        """Write out an unterminated last line of the current thread"""
+        rest = self._partial.pop(threading.get_ident(), "")
+        if rest:
+            self.write(rest + "\n")
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+@contextmanager
+def tagged_output():
+    """Route sys.stdout/sys.stderr through TaggedOutput for the duration of a run"""
+    lock = threading.Lock()
+    original = sys.stdout, sys.stderr
+    sys.stdout = TaggedOutput(original[0], lock)
+    sys.stderr = TaggedOutput(original[1], lock)
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = original
+
+
+def _validate(stages):
+    """Check for duplicate names, unknown dependencies and cycles"""
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+    visiting, visited = set(), set()
+
+    def visit(name, path):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        visited.add(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return by_name
+
+
+def _resume(stage, results, checkpoints, dep_keys, resume):
+    """Compute the checkpoint key of a stage; True if a resumed run can skip it"""
+    if checkpoints is None or stage.inputs is None or None in dep_keys:
+        return False
+    stage.key = checkpoints.key(stage.inputs(results), dep_keys)
+    entry = checkpoints.get(stage.name, stage.key) if resume else None
+    if entry is None or (stage.restore is not None and entry["result"] is None):
+        checkpoints.discard(stage.name)
+        return False
+    results[stage.name] = stage.restore(entry["result"]) if stage.restore else entry["result"]
+    print(f"♻️ Inputs unchanged since {entry['finished_at']}, skipping")
+    return True
+
+
+def _run_stage(stage, results, checkpoints=None, dep_keys=(), resume=False):
+    """Run one stage in a worker thread with its output tag set"""
+    _current.tag = stage.tag
+    stage.status = "running"
+    stage.started = time.perf_counter()
+    try:
+        if _resume(stage, results, checkpoints, list(dep_keys), resume):
+            stage.status = "resumed"
+            return
+        results[stage.name] = stage.func(results)
+        stage.status = "done"
+        if stage.key is not None:
+            # Inputs a stage changes itself (ZIP written, layer hash recorded, state serial
+            # bumped) must count as they are after the run, or the next run never matches
+            stage.key = checkpoints.key(stage.inputs(results), list(dep_keys))
+            checkpoints.record(stage.name, stage.key, results[stage.name])
+    except SystemExit as e:
+        # deploy functions signal fatal errors with sys.exit(1)
+        stage.status = "failed"
+        stage.error = f"exit code {e.code}"
+    except Exception as e:
+        stage.status = "failed"
+        stage.error = str(e)
+    finally:
+        stage.finished = time.perf_counter()
+        if hasattr(sys.stdout, "flush_partial"):
+            sys.stdout.flush_partial()
+        _current.tag = None
+
+
+def critical_path(stages):
+    """Chain of stages that determined the total run time (latest-finishing dependency first)"""
+    by_name = {stage.name: stage for stage in stages}
+    finished = [s for s in stages if s.finished is not None]
+    if not finished:
+        return []
+
+    path = [max(finished, key=lambda s: s.finished)]
+    while True:
+        deps = [by_name[d] for d in path[-1].deps if by_name[d].finished is not None]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda s: s.finished))
+    return list(reversed(path))
+
+
+def print_stage_report(stages, wall_seconds):
+    """Print per-stage timings and the critical path"""
+    run_start = min((s.started for s in stages if s.started is not None), default=0.0)
+    width = max([24] + [len(s.name) for s in stages])  # "<target>/frontend_publish" in a fan-out
+
+    print("\n" + "=" * 60)
+    print("⏱️ DEPLOY STAGES")
+    print("=" * 60)
+    print(f"{'':2} {'Stage':<{width}} {'Start':>8} {'Duration':>10}  Depends on")
+    print("-" * 60)
+    for stage in stages:
+        icon = STATUS_ICONS.get(stage.status, "•")
+        start = f"+{stage.started - run_start:.1f}s" if stage.started is not None else "-"
+        duration = f"{stage.seconds:.1f}s" if stage.started is not None else "-"
+        print(f"{icon:2} {stage.name:<{width}} {start:>8} {duration:>10}  {', '.join(stage.deps) or '-'}")
+        if stage.error:
+            print(f"   └─ {stage.error}")
+    print("-" * 60)
+
+    path = critical_path(stages)
+    if path:
+        chain = " → ".join(f"{s.name} ({s.seconds:.1f}s)" for s in path)
+        print(f"🧭 Critical path: {chain}")
+        print(f"⏱️ Critical path total: {sum(s.seconds for s in path):.1f}s, wall time: {wall_seconds:.1f}s")
+
+
+def run_stages(stages, max_workers=None, checkpoints=None, resume=False):
+    """Run stages as soon as their dependencies are done; returns {stage name: result}
+
+    After a failure no new stages are started; running stages are allowed to finish and
+    StageFailed is raised once the report has been printed. With checkpoints every
+    successful stage is recorded; resume=True skips stages whose inputs are unchanged.
+    """
+    by_name = _validate(stages)
+    results = {}
+    pending = [stage.name for stage in stages]
+    running = {}
+    failed = False
+    started = time.perf_counter()
+
+    with tagged_output(), ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1) as pool:
+        while pending or running:
+            if not failed:
+                ready = [
+                    name for name in pending
+                    if all(by_name[dep].status in FINISHED for dep in by_name[name].deps)
+                ]
+                for name in ready:
+                    pending.remove(name)
+                    stage = by_name[name]
+                    dep_keys = [by_name[dep].key for dep in stage.deps]
+                    future = pool.submit(_run_stage, stage, results, checkpoints, dep_keys, resume)
+                    running[future] = stage
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                if stage.status == "failed":
+                    failed = True
+
+    for name in pending:
+        by_name[name].status = "skipped"
+
+    print_stage_report(stages, time.perf_counter() - started)
+
+    if failed:
+        names = [s.name for s in stages if s.status == "failed"]
+        raise StageFailed(f"Stage(s) failed: {', '.join(names)}")
+    return results
@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Terraform Helpers
+Maps changed Lambda artifacts and .tf files to the Terraform modules that own them,
+so deploy.py can apply only those modules instead of refreshing the whole estate
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import subprocess
+from pathlib import Path
+
+from deploy_packaging import CACHE_DIR, file_sha256
+
+INFRA_DIR = Path("viraltenant-infrastructure")
+APPLIED_MANIFEST = CACHE_DIR / "terraform-applied.json"
+INIT_MANIFEST = CACHE_DIR / "terraform-init.json"
+OUTPUTS_CACHE = CACHE_DIR / "terraform-outputs.json"
+TARGETS_DIR = CACHE_DIR / "targets"  # one TerraformWorkspace per deployment target
+
+# Saved plan (relative to the infrastructure dir), applied without a second refresh
+PLAN_FILE = "deploy.tfplan"
+
+# Root files whose change affects every module -> always a full apply
+ROOT_FILES = ["*.tf", "terraform.tfvars", ".terraform.lock.hcl"]
+
+# Directories that never influence a plan
+IGNORED_DIRS = {".terraform", "build"}
+
+# Per working dir, never copied into or deleted from a workspace mirror
+MIRROR_IGNORED = {".terraform", PLAN_FILE}
+
+_TERRAFORM_HEADER = re.compile(r'^terraform\s*\{', re.MULTILINE)
+_BACKEND_HEADER = re.compile(r'backend\s+"s3"\s*\{')
+_HCL_STRING = re.compile(r'^\s*(\w+)\s*=\s*"([^"]*)"', re.MULTILINE)
+_STATE_SERIAL = re.compile(r'"serial"\s*:\s*(\d+)')
+_STATE_LINEAGE = re.compile(r'"lineage"\s*:\s*"([^"]+)"')
+_MODULE_HEADER = re.compile(r'^module\s+"([\w-]+)"\s*\{', re.MULTILINE)
+_RESOURCE_HEADER = re.compile(r'^resource\s+"([\w-]+)"\s+"([\w-]+)"\s*\{', re.MULTILINE)
+_RESOURCE_REF = re.compile(r"\b(aws_\w+\.[\w-]+)\b")
+_MODULE_SOURCE = re.compile(r'^\s*source\s*=\s*"\./([^"]+)"', re.MULTILINE)
+_MODULE_REF = re.compile(r"\bmodule\.([\w-]+)")
+_ZIP_FILENAME = re.compile(r'filename\s*=\s*"([^"]+\.zip)"')
+_SOURCE_DIR = re.compile(r'source_dir\s*=\s*"([^"]+)"')
+_FILE_REF = re.compile(r'\bfile\("([^"]+)"\)')
+_VARIABLE_HEADER = re.compile(r'^variable\s+"(\w+)"\s*\{', re.MULTILINE)
+_VAR_REF = re.compile(r"\$\{var\.(\w+)\}")
+_ARCHIVE_HEADER = re.compile(r'^data\s+"archive_file"\s+"([\w-]+)"\s*\{', re.MULTILINE)
+_LAMBDA_HEADER = re.compile(r'^resource\s+"aws_lambda_function"\s+"([\w-]+)"\s*\{', re.MULTILINE)
+_ARCHIVE_OUTPUT = re.compile(r'filename\s*=\s*data\.archive_file\.([\w-]+)\.output_path')
+
+
+class TerraformWorkspace:
+    """Terraform working directory and deploy.py manifests of one state
+
+    The default workspace is the classic single deployment: terraform runs in
+    viraltenant-infrastructure with backend and variables as configured. A named workspace
+    runs in its own mirror of that directory under .deploy-cache/targets/<name>/infra (own
+    .terraform, .terraform.lock.hcl, plan file and archive_file ZIPs), keeps its manifests next
+    to it and may point the S3 backend at its own state key and override variables, so several
+    can plan and apply side by side.
+    """
+
+    def __init__(self, name=None, state_key=None, variables=None, var_files=()):
+        base = CACHE_DIR if name is None else TARGETS_DIR / name
+        self.name = name
+        self.state_key = state_key
+        self.variables = dict(variables or {})
+        self.var_files = list(var_files)
+        self.applied_manifest = base / APPLIED_MANIFEST.name
+        self.init_manifest = base / INIT_MANIFEST.name
+        self.outputs_cache = base / OUTPUTS_CACHE.name
+        self.mirror_dir = None if name is None else base / "infra"
+
+    def working_dir(self, infra_dir=INFRA_DIR):
+        """Directory terraform runs in; a named workspace's mirror is synced from infra_dir first"""
+        if self.mirror_dir is None:
+            return Path(infra_dir)
+        return sync_tree(infra_dir, self.mirror_dir)
+
+    def init_args(self):
+        """Extra terraform init arguments (own state key)"""
+        return f"-backend-config=key={self.state_key}" if self.state_key else ""
+
+    def var_args(self):
+        """-var-file/-var arguments for plan"""
+        args = ["-var-file=terraform.tfvars"] + [f"-var-file={path}" for path in self.var_files]
+        args += [f'-var="{name}={value}"' for name, value in sorted(self.variables.items())]
+        return " ".join(args)
+
+
+def sync_tree(source, target):
+    """Mirror source into target: copy new or changed files, delete vanished ones; returns target
+
+    Files are compared by size and mtime (copies keep the mtime); MIRROR_IGNORED entries
+    belong to the mirror and are left alone.
+    """
+    source, target = Path(source), Path(target)
+    wanted = set()
+    for root, dirs, files in os.walk(source):
+        dirs[:] = [d for d in dirs if d not in MIRROR_IGNORED]
+        relative = Path(root).relative_to(source)
+        (target / relative).mkdir(parents=True, exist_ok=True)
+        for name in files:
+            if name in MIRROR_IGNORED:
+                continue
+            src, dst = Path(root) / name, target / relative / name
+            wanted.add(dst)
+            stat = src.stat()
+            if dst.exists() and (dst.stat().st_size, dst.stat().st_mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            shutil.copy2(src, dst)
+
+    for root, dirs, files in os.walk(target):
+        dirs[:] = [d for d in dirs if d not in MIRROR_IGNORED]
+        for name in files:
+            path = Path(root) / name
+            if name not in MIRROR_IGNORED and path not in wanted:
+                path.unlink()
+    return target
+
+
+DEFAULT_WORKSPACE = TerraformWorkspace()
+
+
+def _block_body(text, start):
+    """Text of a { ... } block starting at the opening brace index"""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:i]
+    return text[start + 1:]
+
+
+def load_modules(infra_dir=INFRA_DIR):
+    """Parse module blocks of the root main.tf: {name: {"dir": Path, "deps": set of module names}}"""
+    infra_dir = Path(infra_dir)
+    text = (infra_dir / "main.tf").read_text(encoding="utf-8")
+    modules = {}
+    for match in _MODULE_HEADER.finditer(text):
+        body = _block_body(text, match.end() - 1)
+        source = _MODULE_SOURCE.search(body)
+        if not source:
+            continue
+        modules[match.group(1)] = {
+            "dir": infra_dir / source.group(1),
+            "deps": set(_MODULE_REF.findall(body)) - {match.group(1)},
+        }
+    return modules
+
+
+def load_root_resources(infra_dir=INFRA_DIR):
+    """Resources declared directly in the root main.tf: {address: {"modules": set, "resources": set}}"""
+    text = (Path(infra_dir) / "main.tf").read_text(encoding="utf-8")
+    resources = {}
+    for match in _RESOURCE_HEADER.finditer(text):
+        address = f"{match.group(1)}.{match.group(2)}"
+        body = _block_body(text, match.end() - 1)
+        resources[address] = {
+            "modules": set(_MODULE_REF.findall(body)),
+            "resources": set(_RESOURCE_REF.findall(body)) - {address},
+        }
+    return resources
+
+
+def _resolve(path_expr, module_dir, infra_dir):
+    """Resolve a Terraform path expression (${path.module}/... or cwd-relative)"""
+    if "${path.module}" in path_expr:
+        return Path(os.path.normpath(path_expr.replace("${path.module}", str(module_dir))))
+    return Path(os.path.normpath(str(infra_dir / path_expr)))
+
+
+def module_inputs(module_dir, infra_dir=INFRA_DIR):
+    """Lambda artifacts (ZIP files), source dirs and file() inputs referenced by a module's .tf files"""
+    module_dir, infra_dir = Path(module_dir), Path(infra_dir)
+    zips, source_dirs, files = set(), set(), set()
+    for tf_file in module_dir.glob("*.tf"):
+        text = tf_file.read_text(encoding="utf-8")
+        zips.update(_resolve(p, module_dir, infra_dir) for p in _ZIP_FILENAME.findall(text))
+        source_dirs.update(_resolve(p, module_dir, infra_dir) for p in _SOURCE_DIR.findall(text))
+        files.update(_resolve(p, module_dir, infra_dir) for p in _FILE_REF.findall(text))
+    return sorted(zips), sorted(source_dirs), sorted(files)
+
+
+def _hash_tree(digest, directory):
+    """Feed every file below a directory (path + content) into a digest"""
+    directory = Path(directory)
+    if not directory.exists():
+        digest.update(f"missing:{directory.as_posix()}\0".encode("utf-8"))
+        return
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+        for name in sorted(files):
+            path = Path(root) / name
+            digest.update(path.relative_to(directory).as_posix().encode("utf-8") + b"\0")
+            digest.update(file_sha256(path).encode("ascii") + b"\0")
+
+
+def module_fingerprint(module, infra_dir=INFRA_DIR):
+    """Hashes of a module's own files ("definition") and of the ZIPs/source dirs/files it deploys ("artifacts")"""
+    definition = hashlib.sha256()
+    _hash_tree(definition, module["dir"])
+
+    artifacts = hashlib.sha256()
+    zips, source_dirs, files = module_inputs(module["dir"], infra_dir)
+    for zip_path in zips:
+        sidecar = zip_path.with_suffix(".hash")  # layers are versioned by dependency hash
+        if sidecar.exists():
+            sha = "deps:" + sidecar.read_text(encoding="utf-8").strip()
+        else:
+            sha = file_sha256(zip_path) if zip_path.exists() else "missing"
+        artifacts.update(f"zip:{zip_path.as_posix()}:{sha}\0".encode("utf-8"))
+    for path in files:  # e.g. layer hashes and groups.json written by deploy.py
+        sha = file_sha256(path) if path.exists() else "missing"
+        artifacts.update(f"file:{path.as_posix()}:{sha}\0".encode("utf-8"))
+    for source_dir in source_dirs:
+        artifacts.update(f"dir:{source_dir.as_posix()}\0".encode("utf-8"))
+        _hash_tree(artifacts, source_dir)
+
+    return {"definition": definition.hexdigest(), "artifacts": artifacts.hexdigest()}
+
+
+def root_fingerprint(infra_dir=INFRA_DIR):
+    """Hash of the root module files (main.tf, variables, outputs, tfvars, provider lock)"""
+    infra_dir = Path(infra_dir)
+    digest = hashlib.sha256()
+    paths = sorted({p for pattern in ROOT_FILES for p in infra_dir.glob(pattern) if p.is_file()})
+    for path in paths:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(file_sha256(path).encode("ascii") + b"\0")
+    return digest.hexdigest()
+
+
+def current_fingerprints(infra_dir=INFRA_DIR):
+    """Root and per-module fingerprints of the working tree"""
+    modules = load_modules(infra_dir)
+    return {
+        "root": root_fingerprint(infra_dir),
+        "modules": {name: module_fingerprint(m, infra_dir) for name, m in modules.items()},
+    }
+
+
+def init_fingerprint(infra_dir=INFRA_DIR):
+    """Hash of everything terraform init depends on: provider lock, backend/terraform block, module sources"""
+    infra_dir = Path(infra_dir)
+    digest = hashlib.sha256()
+
+    lock_file = infra_dir / ".terraform.lock.hcl"
+    digest.update((file_sha256(lock_file) if lock_file.exists() else "no-lock").encode("ascii") + b"\0")
+
+    backend_file = infra_dir / "backend.hcl"
+    if backend_file.exists():
+        digest.update(file_sha256(backend_file).encode("ascii") + b"\0")
+
+    text = (infra_dir / "main.tf").read_text(encoding="utf-8")
+    for match in _TERRAFORM_HEADER.finditer(text):
+        digest.update(_block_body(text, match.end() - 1).encode("utf-8") + b"\0")
+
+    for name, module in sorted(load_modules(infra_dir).items()):
+        digest.update(f"{name}={module['dir'].as_posix()}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def needs_init(infra_dir=INFRA_DIR, workspace=DEFAULT_WORKSPACE):
+    """Returns (needed, reason) - init only when providers, backend or module sources changed"""
+    if not (Path(infra_dir) / ".terraform").exists():
+        return True, ".terraform directory missing"
+    if not workspace.init_manifest.exists():
+        return True, "no record of a previous init"
+    try:
+        with open(workspace.init_manifest, "r", encoding="utf-8") as f:
+            recorded = json.load(f).get("fingerprint")
+    except (OSError, json.JSONDecodeError):
+        return True, "init record unreadable"
+    if recorded != init_fingerprint(infra_dir):
+        return True, "provider lock, backend or module sources changed"
+    return False, "providers, backend and module sources unchanged"
+
+
+def record_init(infra_dir=INFRA_DIR, workspace=DEFAULT_WORKSPACE):
+    """Remember the init fingerprint after a successful terraform init"""
+    workspace.init_manifest.parent.mkdir(parents=True, exist_ok=True)
+    with open(workspace.init_manifest, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": init_fingerprint(infra_dir)}, f, indent=2)
+
+
+def load_applied(workspace=DEFAULT_WORKSPACE):
+    """Fingerprints recorded after the last successful apply"""
+    if not workspace.applied_manifest.exists():
+        return None
+    try:
+        with open(workspace.applied_manifest, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def record_applied(fingerprints, modules=None, workspace=DEFAULT_WORKSPACE):
+    """Store fingerprints after a successful apply (modules=None means full apply)"""
+    applied = load_applied(workspace) if modules is not None else None
+    if applied is None:
+        if modules is not None:
+            # A targeted apply on top of an unknown baseline proves nothing about the rest
+            return
+        applied = {"root": fingerprints["root"], "modules": {}}
+
+    names = fingerprints["modules"].keys() if modules is None else modules
+    for name in names:
+        applied["modules"][name] = fingerprints["modules"][name]
+    if modules is None:
+        applied["root"] = fingerprints["root"]
+
+    path = workspace.applied_manifest
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(applied, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _with_dependents(changed, modules):
+    """Add every module that (transitively) consumes an output of a changed module"""
+    result = set(changed)
+    grew = True
+    while grew:
+        grew = False
+        for name, module in modules.items():
+            if name not in result and module["deps"] & result:
+                result.add(name)
+                grew = True
+    return result
+
+
+def _root_resources_for(modules, resources):
+    """Root resources referencing one of the modules (plus resources depending on those)"""
+    result = {address for address, refs in resources.items() if refs["modules"] & modules}
+    grew = True
+    while grew:
+        grew = False
+        for address, refs in resources.items():
+            if address not in result and refs["resources"] & result:
+                result.add(address)
+                grew = True
+    return result
+
+
+def plan_targets(fingerprints, infra_dir=INFRA_DIR, workspace=DEFAULT_WORKSPACE):
+    """Decide what to apply: returns (targets, reason)
+
+    targets is None for a full apply, [] when nothing changed, otherwise a list of
+    -target addresses. A module whose Lambda artifacts changed is targeted on its own
+    (plus modules consuming its outputs); if its .tf files changed, root resources such
+    as the central API Gateway deployment that reference it are targeted as well.
+    """
+    applied = load_applied(workspace)
+    if applied is None:
+        return None, "no record of a previous apply"
+    if applied.get("root") != fingerprints["root"]:
+        return None, "root Terraform files, tfvars or provider lock changed"
+
+    modules = load_modules(infra_dir)
+    previous = applied.get("modules", {})
+    changed = {
+        name for name, fingerprint in fingerprints["modules"].items()
+        if previous.get(name) != fingerprint
+    }
+    if not changed:
+        return [], "no changes since last apply"
+
+    redefined = {
+        name for name in changed
+        if previous.get(name, {}).get("definition") != fingerprints["modules"][name]["definition"]
+    }
+    affected = _with_dependents(changed, modules)
+    if affected == set(modules):
+        return None, "changes affect every module"
+
+    resources = _root_resources_for(_with_dependents(redefined, modules), load_root_resources(infra_dir))
+    targets = [f"module.{name}" for name in sorted(affected)] + sorted(resources)
+
+    reason = f"changed: {', '.join(sorted(changed))}"
+    dependents = sorted(affected - changed)
+    if dependents:
+        reason += f" (+ dependents: {', '.join(dependents)})"
+    return targets, reason
+
+
+def module_targets(module_names):
+    """-target addresses for module names"""
+    return [f"module.{name}" for name in module_names]
+
+
+def targeted_modules(targets):
+    """Module names among -target addresses"""
+    return [address[len("module."):] for address in targets if address.startswith("module.")]
+
+
+def target_args(targets):
+    """-target arguments for a list of addresses"""
+    return " ".join(f'-target="{address}"' for address in targets)
+
+
+def root_variables(infra_dir=INFRA_DIR):
+    """String values of the root variables: defaults from variables.tf, overridden by terraform.tfvars"""
+    infra_dir = Path(infra_dir)
+    values = {}
+    variables = infra_dir / "variables.tf"
+    if variables.exists():
+        text = variables.read_text(encoding="utf-8")
+        for match in _VARIABLE_HEADER.finditer(text):
+            default = dict(_HCL_STRING.findall(_block_body(text, match.end() - 1))).get("default")
+            if default is not None:
+                values[match.group(1)] = default
+    tfvars = infra_dir / "terraform.tfvars"
+    if tfvars.exists():
+        values.update(_HCL_STRING.findall(tfvars.read_text(encoding="utf-8")))
+    return values
+
+
+def lambda_functions(infra_dir=INFRA_DIR):
+    """Deployed name and code location of every aws_lambda_function in the modules
+
+    Returns [{"resource", "function_name", "zip", "source_dir"}]; var.* references are
+    resolved with the root variables (modules receive them under the same name), functions
+    whose name still contains an expression are left out.
+    """
+    infra_dir = Path(infra_dir)
+    variables = root_variables(infra_dir)
+    functions = []
+    for module in load_modules(infra_dir).values():
+        for tf_file in sorted(module["dir"].glob("*.tf")):
+            text = tf_file.read_text(encoding="utf-8")
+            archives = {}
+            for match in _ARCHIVE_HEADER.finditer(text):
+                attrs = dict(_HCL_STRING.findall(_block_body(text, match.end() - 1)))
+                archives[match.group(1)] = attrs
+            for match in _LAMBDA_HEADER.finditer(text):
+                body = _block_body(text, match.end() - 1)
+                name = dict(_HCL_STRING.findall(body)).get("function_name", "")
+                name = _VAR_REF.sub(lambda ref: variables.get(ref.group(1), ref.group(0)), name)
+                if not name or "${" in name:
+                    continue
+                zip_path = source_dir = None
+                archive = _ARCHIVE_OUTPUT.search(body)
+                if archive and archive.group(1) in archives:
+                    attrs = archives[archive.group(1)]
+                    zip_path = attrs.get("output_path")
+                    source_dir = attrs.get("source_dir")
+                else:
+                    zip_path = next(iter(_ZIP_FILENAME.findall(body)), None)
+                functions.append({
+                    "resource": match.group(1),
+                    "function_name": name,
+                    "zip": _resolve(zip_path, module["dir"], infra_dir) if zip_path else None,
+                    "source_dir": _resolve(source_dir, module["dir"], infra_dir) if source_dir else None,
+                })
+    return functions
+
+
+# ============================================
+# 📤 TERRAFORM OUTPUTS (cached by state serial)
+# ============================================
+
+class TerraformOutputs:
+    """Typed access to the Terraform outputs deploy.py needs (raw = terraform output -json)"""
+
+    def __init__(self, raw=None):
+        self.raw = raw or {}
+
+    def value(self, name, default=None):
+        """Value of any output by name"""
+        return self.raw.get(name, {}).get("value", default)
+
+    @property
+    def s3_bucket_name(self):
+        return self.value("s3_bucket_name")
+
+    @property
+    def cloudfront_distribution_id(self):
+        return self.value("cloudfront_distribution_id")
+
+    @property
+    def website_url(self):
+        return self.value("website_url")
+
+    @property
+    def cloudfront_url(self):
+        return (self.value("quick_start_urls") or {}).get("cloudfront_url")
+
+    @property
+    def api_gateway_url(self):
+        return self.value("api_gateway_url")
+
+    @property
+    def cognito_user_pool_id(self):
+        return self.value("cognito_user_pool_id")
+
+    @property
+    def cognito_client_id(self):
+        return self.value("cognito_client_id")
+
+    @property
+    def billing_dashboard_bucket(self):
+        return self.value("billing_dashboard_bucket")
+
+    @property
+    def billing_dashboard_url(self):
+        return self.value("billing_dashboard_url")
+
+    @property
+    def billing_dashboard_cloudfront_id(self):
+        return self.value("billing_dashboard_cloudfront_id")
+
+
+def backend_config(infra_dir=INFRA_DIR):
+    """String settings of the S3 backend block in main.tf (bucket, key, region, profile)"""
+    text = (Path(infra_dir) / "main.tf").read_text(encoding="utf-8")
+    match = _BACKEND_HEADER.search(text)
+    if not match:
+        return {}
+    return dict(_HCL_STRING.findall(_block_body(text, match.end() - 1)))
+
+
+def state_version(infra_dir=INFRA_DIR, workspace=DEFAULT_WORKSPACE):
+    """(lineage, serial) of the remote state, read from the first KB of the state object
+
+    Returns None when it cannot be determined (no S3 backend, boto3 missing, no access).
+    """
+    config = backend_config(infra_dir)
+    if workspace.state_key:
+        config["key"] = workspace.state_key
+    if not config.get("bucket") or not config.get("key"):
+        return None
+    try:
+        import boto3
+    except ImportError:
+        return None
+
+    try:
+        session = boto3.Session(profile_name=config.get("profile"), region_name=config.get("region"))
+        response = session.client("s3").get_object(
+            Bucket=config["bucket"], Key=config["key"], Range="bytes=0-1023"
+        )
+        head = response["Body"].read().decode("utf-8", errors="replace")
+    except Exception:
+        return None
+
+    serial, lineage = _STATE_SERIAL.search(head), _STATE_LINEAGE.search(head)
+    if not serial or not lineage:
+        return None
+    return lineage.group(1), int(serial.group(1))
+
+
+def invalidate_outputs(workspace=DEFAULT_WORKSPACE):
+    """Drop the cached outputs (called after every apply)"""
+    if workspace.outputs_cache.exists():
+        workspace.outputs_cache.unlink()
+
+
+def _load_cached_outputs(workspace=DEFAULT_WORKSPACE):
+    if not workspace.outputs_cache.exists():
+        return None
+    try:
+        with open(workspace.outputs_cache, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def cached_outputs(workspace=DEFAULT_WORKSPACE):
+    """Outputs from the local cache without asking Terraform or S3 (None if never read)"""
+    cached = _load_cached_outputs(workspace)
+    return TerraformOutputs(cached["outputs"]) if cached else None
+
+
+def get_outputs(infra_dir=INFRA_DIR, refresh=False, workspace=DEFAULT_WORKSPACE):
+    """Terraform outputs, served from the local cache while the state serial/lineage is unchanged
+
+    Falls back to terraform output -json (and refreshes the cache) when the state moved,
+    the cache is missing or refresh=True. Returns None if the outputs cannot be read.
+    """
+    version = state_version(infra_dir, workspace)
+    cached = None if refresh else _load_cached_outputs(workspace)
+    if cached and version and [cached.get("lineage"), cached.get("serial")] == list(version):
+        print(f"♻️ Using cached Terraform outputs (state serial {version[1]})")
+        return TerraformOutputs(cached["outputs"])
+
+    print("\n📋 Reading Terraform outputs...")
+    result = subprocess.run(
+        "terraform output -json",
+        shell=True,
+        cwd=infra_dir,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print("❌ Failed to read Terraform outputs!")
+        if result.stderr:
+            print(result.stderr.strip())
+        return None
+
+    try:
+        raw = json.loads(result.stdout) if result.stdout.strip() else {}
+    except json.JSONDecodeError as e:
+        print(f"❌ Failed to parse Terraform outputs: {e}")
+        return None
+
+    if version:
+        workspace.outputs_cache.parent.mkdir(parents=True, exist_ok=True)
+        with open(workspace.outputs_cache, "w", encoding="utf-8") as f:
+            json.dump({"lineage": version[0], "serial": version[1], "outputs": raw}, f, indent=2)
+    return TerraformOutputs(raw)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Lambda Hot Deploy
+Watches the source directory of one Lambda target, rebuilds only its ZIP in-process on every
+change and pushes it with UpdateFunctionCode - Terraform is reconciled by the next normal deploy
+"""
+
+import os
+import time
+import base64
+import hashlib
+from pathlib import Path
+
+from deploy_aws import function_code_sha, update_function_code
+from deploy_budget import check_artifact
+from deploy_packaging import LAMBDA_TARGETS, build_target, collect_files, select_targets
+from deploy_terraform import lambda_functions
+
+POLL_SECONDS = 0.3
+SETTLE_SECONDS = 0.2  # editors write in several steps, wait until the tree is quiet
+
+
+def deployed_name(target):
+    """Function name Terraform gives the function built from this target (None if not found)"""
+    zip_path = Path(os.path.normpath(target.zip_path))
+    source_dir = Path(os.path.normpath(target.source_dir))
+    for function in lambda_functions():
+        if function["zip"] == zip_path or function["source_dir"] == source_dir:
+            return function["function_name"]
+    return None
+
+
+def code_sha(zip_path):
+    """CodeSha256 as Lambda reports it (base64 SHA-256 of the ZIP bytes)"""
+    return base64.b64encode(hashlib.sha256(Path(zip_path).read_bytes()).digest()).decode("ascii")
+
+
+def snapshot(target):
+    """(mtime, size) of every file the target packages"""
+    result = {}
+    for arcname, path in collect_files(target):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        result[arcname] = (stat.st_mtime_ns, stat.st_size)
+    return result
+
+
+def push(target, function_name):
+    """Rebuild the ZIP and update the function unless the deployed code is identical"""
+    started = time.perf_counter()
+    result = build_target(target)
+    if result["status"] != "built":
+        print(f"❌ Build failed: {result['error']}")
+        return
+    if check_artifact(target, result):
+        print("⏭️ Not pushed - fix the package size first")
+        return
+    built = time.perf_counter()
+
+    local_sha = code_sha(target.zip_path)
+    if function_code_sha(function_name) == local_sha:
+        print(f"✅ {function_name} already runs this code ({result['bytes'] / 1024:.1f} KB), nothing to push "
+              f"[{time.perf_counter() - started:.1f}s]")
+        return
+    update_function_code(function_name, target.zip_path)
+    done = time.perf_counter()
+    print(f"🚀 {function_name} updated: {result['bytes'] / 1024:.1f} KB, build {built - started:.2f}s, "
+          f"upload + activation {done - built:.1f}s, round trip {done - started:.1f}s")
+
+
+def _safe_push(target, function_name):
+    try:
+        push(target, function_name)
+    except Exception as e:
+        print(f"❌ Push failed: {e}")
+
+
+def watch(name):
+    """Push the function on every source change until interrupted"""
+    targets = select_targets(names=[name])
+    if not targets:
+        print(f"❌ Unknown Lambda target: {name}")
+        print(f"💡 Known targets: {', '.join(t.name for t in LAMBDA_TARGETS)}")
+        return 1
+    target = targets[0]
+    function_name = deployed_name(target)
+    if function_name is None:
+        print(f"❌ No aws_lambda_function in the Terraform modules deploys {target.zip_path}")
+        return 1
+
+    print(f"👀 Watching {target.source_dir} → {function_name} (Ctrl+C to stop)")
+    print("💡 Terraform is not updated - run the normal deploy afterwards to reconcile the state")
+    _safe_push(target, function_name)
+    seen = snapshot(target)
+    try:
+        while True:
+            time.sleep(POLL_SECONDS)
+            current = snapshot(target)
+            if current == seen:
+                continue
+            time.sleep(SETTLE_SECONDS)
+            current = snapshot(target)
+            changed = sorted(k for k in set(current) | set(seen) if current.get(k) != seen.get(k))
+            seen = current
+            print(f"\n✏️ Changed: {', '.join(changed[:5])}{' ...' if len(changed) > 5 else ''}")
+            _safe_push(target, function_name)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    return 0
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+ViralTenant Platform - Deterministic ZIP Writer
+Pure-Python replacement for PowerShell Compress-Archive: identical sources give byte-identical
+archives, so Terraform's source_code_hash only changes when the code actually changed
+"""
+
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+# 1980-01-01 is the earliest timestamp the ZIP format can store
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o100644  # regular file, rw-r--r--
+SYMLINK_MODE = 0o120777  # symbolic link, extracted as a link by Lambda and unzip
+DEFAULT_COMPRESSLEVEL = 9
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class Symlink:
+    """Archive entry stored as a symbolic link to a relative target path"""
+
+    def __init__(self, target):
+        self.target = target
+
+
+def _zip_info(arcname, size, compresslevel, mode=FILE_MODE):
+    """ZipInfo with fixed timestamp, permissions and creator system"""
+    info = zipfile.ZipInfo(arcname, date_time=FIXED_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.create_system = 3  # Unix, so external_attr is interpreted as a file mode
+    info.external_attr = mode << 16
+    info.file_size = size  # lets zipfile decide on ZIP64 up front
+    # Python 3.13 renamed the (slotted) attribute
+    if hasattr(info, "compress_level"):
+        info.compress_level = compresslevel
+    else:
+        info._compresslevel = compresslevel
+    return info
+
+
+def write_zip(zip_path, entries, compresslevel=DEFAULT_COMPRESSLEVEL):
+    """Write a deterministic ZIP from (archive name, source) pairs
+
+    source is a file path (streamed in chunks), bytes or a Symlink. Entries are sorted by
+    archive name, timestamps and permissions are fixed, and the ZIP is replaced atomically.
+    Returns the size of the written ZIP in bytes.
+    """
+    entries = sorted(entries, key=lambda entry: entry[0])
+    duplicates = sorted({
+        current[0] for previous, current in zip(entries, entries[1:])
+        if previous[0] == current[0]
+    })
+    if duplicates:
+        raise ValueError(f"duplicate archive names: {', '.join(duplicates)}")
+
+    zip_path = Path(zip_path)
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = zip_path.with_name(zip_path.name + ".tmp")
+
+    try:
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for arcname, source in entries:
+                if isinstance(source, Symlink):
+                    target = source.target.encode("utf-8")
+                    info = _zip_info(arcname, len(target), compresslevel, SYMLINK_MODE)
+                    info.compress_type = zipfile.ZIP_STORED
+                    zipf.writestr(info, target)
+                elif isinstance(source, (bytes, bytearray)):
+                    info = _zip_info(arcname, len(source), compresslevel)
+                    with zipf.open(info, "w") as dest:
+                        dest.write(source)
+                else:
+                    info = _zip_info(arcname, os.path.getsize(source), compresslevel)
+                    with open(source, "rb") as src, zipf.open(info, "w") as dest:
+                        shutil.copyfileobj(src, dest, COPY_BUFFER_SIZE)
+        os.replace(tmp_path, zip_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    return zip_path.stat().st_size
+
+
+def directory_entries(directory, prefix=""):
+    """All files below a directory as (archive name, path) pairs, optionally under a prefix"""
+    directory = Path(directory)
+    return [
+        (prefix + path.relative_to(directory).as_posix(), path)
+        for path in directory.rglob("*")
+        if path.is_file()
+    ]
+
+
+def extract_zip(zip_path, directory):
+    """Extract a ZIP, recreating symlink entries as links (zipfile.extractall writes them as files)"""
+    directory = Path(directory)
+    with zipfile.ZipFile(zip_path) as zipf:
+        for info in zipf.infolist():
+            target = directory / info.filename
+            if not os.path.normpath(target).startswith(os.path.normpath(directory) + os.sep):
+                raise ValueError(f"unsafe path in {zip_path}: {info.filename}")
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if (info.external_attr >> 16) & 0o170000 == SYMLINK_MODE & 0o170000:
+                os.symlink(zipf.read(info).decode("utf-8"), target)
+            else:
+                with zipf.open(info) as src, open(target, "wb") as dest:
+                    shutil.copyfileobj(src, dest, COPY_BUFFER_SIZE)
@@ -16,6 +16,25 @@ except ImportError:
     # python-dotenv not installed, will use system environment variables
     pass
 
+class DeploymentTarget:
+    """Ein Deployment-Ziel: Environment + Region mit eigenem Terraform-State
+    
+    state_key=None nutzt den State-Key aus dem Backend-Block in main.tf (klassisches
+    Einzel-Deployment); tfvars sind zusätzliche Variablen-Dateien relativ zu
+    viraltenant-infrastructure/ (z.B. "staging.tfvars").
+    """
+    
+    def __init__(self, name, environment, region, state_key=None, tfvars=()):
+        self.name = name
+        self.environment = environment
+        self.region = region
+        self.state_key = state_key
+        self.tfvars = list(tfvars)
+    
+    def __repr__(self):
+        return f"DeploymentTarget({self.name!r}, {self.environment!r}, {self.region!r})"
+
+
 class DeploymentConfig:
     """ViralTenant Multi-Tenant Platform Konfiguration"""
     
@@ -35,6 +54,14 @@ class DeploymentConfig:
         self.AWS_PROFILE = "viraltenant"                     # AWS CLI Profile Name
         self.ENVIRONMENT = "production"
         
+        # Deployment-Ziele: deploy.py baut Layer/Lambda-ZIPs/Frontend einmal und deployt
+        # Terraform + S3 parallel in alle Ziele (Auswahl mit --targets)
+        self.DEPLOYMENT_TARGETS = [
+            DeploymentTarget("production", self.ENVIRONMENT, self.AWS_REGION),
+            # DeploymentTarget("staging", "staging", "eu-central-1",
+            #                  state_key="staging/terraform.tfstate", tfvars=["staging.tfvars"]),
+        ]
+        
         # Platform Admin
         self.PLATFORM_ADMIN_EMAIL = "admin@viraltenant.com"
         self.PLATFORM_CONTACT_EMAIL = "contact@viraltenant.com"
@@ -217,6 +244,16 @@ class DeploymentConfig:
         if not Path(self.FRONTEND_DIR).exists():
             errors.append(f"Frontend Verzeichnis nicht gefunden: {self.FRONTEND_DIR}")
         
+        # Deployment-Ziele brauchen eindeutige Namen und je einen eigenen State
+        names = [t.name for t in self.DEPLOYMENT_TARGETS]
+        if not names:
+            errors.append("DEPLOYMENT_TARGETS darf nicht leer sein")
+        if len(set(names)) != len(names):
+            errors.append("DEPLOYMENT_TARGETS: Namen müssen eindeutig sein")
+        state_keys = [t.state_key for t in self.DEPLOYMENT_TARGETS]
+        if len(set(state_keys)) != len(state_keys):
+            errors.append("DEPLOYMENT_TARGETS: jedes Ziel braucht einen eigenen state_key (höchstens eins None)")
+        
         return errors
     
     def show(self):
@@ -236,6 +273,11 @@ class DeploymentConfig:
         print(f"  Profile:             {self.AWS_PROFILE}")
         print(f"  Environment:         {self.ENVIRONMENT}")
         print()
+        print("🎯 Deployment-Ziele:")
+        for target in self.DEPLOYMENT_TARGETS:
+            state = target.state_key or "Backend aus main.tf"
+            print(f"  {target.name:<20} {target.environment} / {target.region} (State: {state})")
+        print()
         print("📧 E-Mail:")
         print(f"  Admin:               {self.PLATFORM_ADMIN_EMAIL}")
         print(f"  Contact:             {self.PLATFORM_CONTACT_EMAIL}")
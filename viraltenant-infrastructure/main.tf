@@ -1,5 +1,5 @@
 terraform {
-  required_version = ">= 1.0"
+  required_version = ">= 1.4" # terraform_data (modules/lambda-layers)
 
   backend "s3" {
     bucket         = "creator-platform-terraform-state-multitenant"
@@ -629,6 +629,7 @@ module "tenant_crosspost" {
   aws_region                 = var.aws_region
   tags                       = var.tags
   common_deps_layer_arn      = module.lambda_layers.common_deps_layer_arn
+  deps_layer_arn             = lookup(module.lambda_layers.group_layer_arns, "crosspost", "")
   user_tenants_table_arn     = module.tenant_management.user_tenants_table_arn
   user_tenants_table_name    = module.tenant_management.user_tenants_table_name
   tenants_table_arn          = module.tenant_management.tenants_table_arn
@@ -726,6 +727,7 @@ module "tenant_whatsapp" {
 
   # Lambda Layer
   common_deps_layer_arn = module.lambda_layers.common_deps_layer_arn
+  deps_layer_arn        = lookup(module.lambda_layers.group_layer_arns, "whatsapp", "")
 
   # AWS End User Messaging Social Configuration
   whatsapp_phone_number_id = var.whatsapp_phone_number_id
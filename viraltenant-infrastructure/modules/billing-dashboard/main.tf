@@ -97,7 +97,7 @@ resource "aws_cloudfront_distribution" "billing_dashboard" {
     viewer_protocol_policy = "redirect-to-https"
     min_ttl                = 0
     default_ttl            = 3600
-    max_ttl                = 86400
+    max_ttl                = 31536000 # hashed assets are immutable, index.html sends a short max-age
     compress               = true
   }
 
@@ -5,10 +5,14 @@ Creates a deployment package for the auth handler
 """
 
 import os
-import zipfile
+import sys
 import shutil
 from pathlib import Path
 
+# Shared deterministic ZIP writer lives next to deploy.py in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from deploy_zip import directory_entries, write_zip
+
 def build_lambda():
     """Build Lambda deployment package"""
     print("🔨 Building Lambda deployment package...")
@@ -43,17 +47,9 @@ def build_lambda():
     print("📦 Installing dependencies...")
     os.system(f"cd {build_dir} && npm install --production")
     
-    # Create ZIP file
+    # Create ZIP file (deterministic - identical sources give an identical source_code_hash)
     print("📦 Creating deployment package...")
-    if zip_path.exists():
-        zip_path.unlink()
-    
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(build_dir):
-            for file in files:
-                file_path = Path(root) / file
-                arc_path = file_path.relative_to(build_dir)
-                zipf.write(file_path, arc_path)
+    write_zip(zip_path, directory_entries(build_dir))
     
     # Clean up build directory
     shutil.rmtree(build_dir)
@@ -13,13 +13,59 @@ resource "aws_lambda_layer_version" "tenant_registration_deps" {
 
 # Common Dependencies Layer - NEW
 # Contains: AWS SDK (DynamoDB, S3, Cognito, SES, Route53, IVS, MediaLive, Cost Explorer), Stripe, PDFKit, UUID
+# Versioned by the hash of the resolved dependency tree (written by deploy.py next to the ZIP),
+# not by the ZIP bytes: a rebuilt but identical layer does not publish a new version
+locals {
+  common_deps_hash_file = "${path.module}/../../lambda-layers/common-deps/common-deps-layer.hash"
+  common_deps_hash      = fileexists(local.common_deps_hash_file) ? trimspace(file(local.common_deps_hash_file)) : "unbuilt"
+}
+
+resource "terraform_data" "common_deps_hash" {
+  input = local.common_deps_hash
+}
+
 resource "aws_lambda_layer_version" "common_deps" {
   filename            = "${path.module}/../../lambda-layers/common-deps/common-deps-layer.zip"
   layer_name          = "${var.project_name}-common-deps"
   compatible_runtimes = ["nodejs18.x", "nodejs20.x"]
   source_code_hash    = filebase64sha256("${path.module}/../../lambda-layers/common-deps/common-deps-layer.zip")
 
-  description = "Shared dependencies for all ViralTenant Lambda functions"
+  description = "Shared dependencies for all ViralTenant Lambda functions, deps ${local.common_deps_hash}"
+
+  lifecycle {
+    # ZIP bytes differ between rebuilds of the same dependencies - only a new hash publishes
+    ignore_changes       = [source_code_hash]
+    replace_triggered_by = [terraform_data.common_deps_hash]
+  }
+}
+
+# Slim per-group layers (deploy_layers.py): only the packages the functions of a group load.
+# groups.json ({group: {hash}}) is written next to the ZIPs by deploy.py
+locals {
+  group_layers = fileexists("${path.module}/../../lambda-layers/groups/groups.json") ? jsondecode(file("${path.module}/../../lambda-layers/groups/groups.json")) : {}
+}
+
+resource "terraform_data" "group_deps_hash" {
+  for_each = local.group_layers
+
+  input = each.value.hash
+}
+
+resource "aws_lambda_layer_version" "group_deps" {
+  for_each = local.group_layers
+
+  filename            = "${path.module}/../../lambda-layers/groups/${each.key}-deps-layer.zip"
+  layer_name          = "${var.project_name}-${each.key}-deps"
+  compatible_runtimes = ["nodejs18.x", "nodejs20.x"]
+  source_code_hash    = filebase64sha256("${path.module}/../../lambda-layers/groups/${each.key}-deps-layer.zip")
+
+  description = "Dependencies loaded by the ${each.key} Lambda functions, deps ${each.value.hash}"
+
+  lifecycle {
+    # Same as common_deps: a new version only when the group's dependency hash changes
+    ignore_changes       = [source_code_hash]
+    replace_triggered_by = [terraform_data.group_deps_hash[each.key]]
+  }
 }
 
 # Outputs
@@ -37,3 +83,8 @@ output "common_deps_layer_version" {
   value       = aws_lambda_layer_version.common_deps.version
   description = "Version of the common dependencies layer"
 }
+
+output "group_layer_arns" {
+  value       = { for group, layer in aws_lambda_layer_version.group_deps : group => layer.arn }
+  description = "ARNs of the slim per-group dependency layers (empty until deploy.py built them)"
+}
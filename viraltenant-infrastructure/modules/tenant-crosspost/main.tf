@@ -7,6 +7,11 @@ terraform {
   }
 }
 
+# Slim crosspost layer if deploy.py built one, otherwise the full common-deps layer
+locals {
+  deps_layer_arn = var.deps_layer_arn != "" ? var.deps_layer_arn : var.common_deps_layer_arn
+}
+
 # ============================================================
 # SHARED IAM ROLE FOR ALL CROSSPOST LAMBDAS
 # ============================================================
@@ -80,7 +85,7 @@ resource "aws_lambda_function" "crosspost_dispatcher" {
   runtime          = "nodejs18.x"
   timeout          = 60
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                       = var.aws_region
@@ -144,7 +149,7 @@ resource "aws_lambda_function" "crosspost_xtwitter" {
   runtime          = "nodejs18.x"
   timeout          = 60
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                    = var.aws_region
@@ -180,7 +185,7 @@ resource "aws_lambda_function" "crosspost_youtube" {
   runtime          = "nodejs18.x"
   timeout          = 120
   memory_size      = 512
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                 = var.aws_region
@@ -211,7 +216,7 @@ resource "aws_lambda_function" "crosspost_discord" {
   runtime          = "nodejs18.x"
   timeout          = 30
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                 = var.aws_region
@@ -240,7 +245,7 @@ resource "aws_lambda_function" "crosspost_slack" {
   runtime          = "nodejs18.x"
   timeout          = 30
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION               = var.aws_region
@@ -269,7 +274,7 @@ resource "aws_lambda_function" "crosspost_facebook" {
   runtime          = "nodejs18.x"
   timeout          = 60
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                  = var.aws_region
@@ -299,7 +304,7 @@ resource "aws_lambda_function" "crosspost_instagram" {
   runtime          = "nodejs18.x"
   timeout          = 90
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                   = var.aws_region
@@ -329,7 +334,7 @@ resource "aws_lambda_function" "crosspost_linkedin" {
   runtime          = "nodejs18.x"
   timeout          = 60
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                  = var.aws_region
@@ -359,7 +364,7 @@ resource "aws_lambda_function" "crosspost_telegram" {
   runtime          = "nodejs18.x"
   timeout          = 30
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                  = var.aws_region
@@ -388,7 +393,7 @@ resource "aws_lambda_function" "crosspost_bluesky" {
   runtime          = "nodejs18.x"
   timeout          = 30
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                 = var.aws_region
@@ -418,7 +423,7 @@ resource "aws_lambda_function" "crosspost_mastodon" {
   runtime          = "nodejs18.x"
   timeout          = 30
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                  = var.aws_region
@@ -448,7 +453,7 @@ resource "aws_lambda_function" "crosspost_tiktok" {
   runtime          = "nodejs18.x"
   timeout          = 120
   memory_size      = 512
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                = var.aws_region
@@ -483,7 +488,7 @@ resource "aws_lambda_function" "crosspost_snapchat" {
   runtime          = "nodejs18.x"
   timeout          = 120
   memory_size      = 512
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                   = var.aws_region
@@ -519,7 +524,7 @@ resource "aws_lambda_function" "crosspost_threads" {
   runtime          = "nodejs18.x"
   timeout          = 120
   memory_size      = 256
-  layers           = [var.common_deps_layer_arn]
+  layers           = [local.deps_layer_arn]
   environment {
     variables = {
       REGION                = var.aws_region
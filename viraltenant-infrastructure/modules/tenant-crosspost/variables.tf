@@ -4,6 +4,11 @@ variable "environment" { type = string }
 variable "aws_region" { type = string }
 variable "tags" { type = map(string) }
 variable "common_deps_layer_arn" { type = string }
+variable "deps_layer_arn" {
+  description = "Slim crosspost dependency layer; falls back to the common layer when empty"
+  type        = string
+  default     = ""
+}
 
 # DynamoDB Tables
 variable "user_tenants_table_arn" { type = string }
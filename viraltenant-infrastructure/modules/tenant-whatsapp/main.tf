@@ -124,6 +124,11 @@ resource "aws_sns_topic_policy" "whatsapp_inbound_policy" {
 # Data source for current AWS account
 data "aws_caller_identity" "current" {}
 
+# Slim WhatsApp layer if deploy.py built one, otherwise the full common-deps layer
+locals {
+  deps_layer_arn = var.deps_layer_arn != "" ? var.deps_layer_arn : var.common_deps_layer_arn
+}
+
 # =============================================================================
 # AWS End User Messaging Social - Event Destination
 # Using null_resource with local-exec because Terraform AWS Provider
@@ -268,7 +273,7 @@ resource "aws_lambda_function" "whatsapp_subscription" {
   filename         = "${path.module}/../../tenant_whatsapp_subscription.zip"
   source_code_hash = fileexists("${path.module}/../../tenant_whatsapp_subscription.zip") ? filebase64sha256("${path.module}/../../tenant_whatsapp_subscription.zip") : null
 
-  layers = [var.common_deps_layer_arn]
+  layers = [local.deps_layer_arn]
 
   environment {
     variables = {
@@ -318,7 +323,7 @@ resource "aws_lambda_function" "whatsapp_crosspost" {
   filename         = "${path.module}/../../tenant_crosspost_whatsapp.zip"
   source_code_hash = fileexists("${path.module}/../../tenant_crosspost_whatsapp.zip") ? filebase64sha256("${path.module}/../../tenant_crosspost_whatsapp.zip") : null
 
-  layers = [var.common_deps_layer_arn]
+  layers = [local.deps_layer_arn]
 
   environment {
     variables = {
@@ -353,7 +358,7 @@ resource "aws_lambda_function" "whatsapp_worker" {
   filename         = "${path.module}/../../tenant_whatsapp_worker.zip"
   source_code_hash = fileexists("${path.module}/../../tenant_whatsapp_worker.zip") ? filebase64sha256("${path.module}/../../tenant_whatsapp_worker.zip") : null
 
-  layers = [var.common_deps_layer_arn]
+  layers = [local.deps_layer_arn]
 
   environment {
     variables = {
@@ -391,7 +396,7 @@ resource "aws_lambda_function" "whatsapp_settings" {
   filename         = "${path.module}/../../tenant_whatsapp_settings.zip"
   source_code_hash = fileexists("${path.module}/../../tenant_whatsapp_settings.zip") ? filebase64sha256("${path.module}/../../tenant_whatsapp_settings.zip") : null
 
-  layers = [var.common_deps_layer_arn]
+  layers = [local.deps_layer_arn]
 
   environment {
     variables = {
@@ -88,6 +88,12 @@ variable "common_deps_layer_arn" {
   type        = string
 }
 
+variable "deps_layer_arn" {
+  description = "Slim WhatsApp dependency layer ARN; falls back to the common layer when empty"
+  type        = string
+  default     = ""
+}
+
 # AWS End User Messaging Social - WhatsApp Configuration
 variable "whatsapp_phone_number_id" {
   description = "AWS End User Messaging Social Phone Number ID"
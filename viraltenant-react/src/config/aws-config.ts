@@ -1,5 +1,6 @@
 // Multi-Tenant ViralTenant Platform Configuration
-// Generiert: 2025-12-29 17:09:26
+// Defaults (Production): region, cognito und api werden beim Start durch /runtime-config.json
+// der jeweiligen Umgebung ersetzt (siehe runtime-config.ts, deploy.py deploy_runtime_config)
 
 export const awsConfig = {
   mode: 'multi-tenant',
@@ -13,8 +14,8 @@ export const awsConfig = {
   },
   
   cognito: {
-    userPoolId: 'eu-central-1_4mUqVJrm2',  // Wird durch Terraform ersetzt
-    clientId: '23g1eol46sdr3a80prfem1kgli',       // Wird durch Terraform ersetzt
+    userPoolId: 'eu-central-1_4mUqVJrm2',  // Runtime-Config
+    clientId: '23g1eol46sdr3a80prfem1kgli',       // Runtime-Config
     domain: 'viraltenant-auth-production'
   },
   
@@ -32,7 +33,7 @@ export const awsConfig = {
   },
   
   api: {
-    user: 'https://ematolm790.execute-api.eu-central-1.amazonaws.com/production',  // Wird durch Terraform ersetzt
+    user: 'https://ematolm790.execute-api.eu-central-1.amazonaws.com/production',  // Runtime-Config
     auth: 'https://ematolm790.execute-api.eu-central-1.amazonaws.com/production',  // Auth API - gleiche URL, da integriert
     chat: 'https://ematolm790.execute-api.eu-central-1.amazonaws.com/production/api',
     shop: 'https://ematolm790.execute-api.eu-central-1.amazonaws.com/production/api',
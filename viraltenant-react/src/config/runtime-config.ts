@@ -0,0 +1,35 @@
+// Runtime Configuration
+// deploy.py legt pro Umgebung /runtime-config.json neben das Bundle (API-URL, Cognito-IDs aus den
+// Terraform-Outputs). Dasselbe dist läuft so in jeder Umgebung; ohne Datei (z.B. npm run dev)
+// gelten die Werte aus aws-config.ts.
+
+import { awsConfig } from './aws-config'
+
+export const RUNTIME_CONFIG_URL = '/runtime-config.json'
+
+export interface RuntimeConfig {
+  region?: string
+  cognito?: Partial<typeof awsConfig.cognito>
+  api?: Partial<typeof awsConfig.api>
+}
+
+// Lädt die Runtime-Config und überschreibt die Defaults in awsConfig.
+// Muss vor dem Import der App laufen: Services lesen awsConfig.api beim Modul-Import.
+export async function loadRuntimeConfig(): Promise<void> {
+  try {
+    const response = await fetch(RUNTIME_CONFIG_URL, { cache: 'no-cache' })
+    // CloudFront liefert für fehlende Dateien index.html (SPA-Fallback) mit Status 200
+    if (!response.ok || !response.headers.get('content-type')?.includes('json')) {
+      return
+    }
+
+    const runtime: RuntimeConfig = await response.json()
+    if (runtime.region) {
+      awsConfig.region = runtime.region
+    }
+    Object.assign(awsConfig.cognito, runtime.cognito)
+    Object.assign(awsConfig.api, runtime.api)
+  } catch (error) {
+    console.warn('Runtime config not loaded, using built-in defaults:', error)
+  }
+}
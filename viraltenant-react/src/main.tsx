@@ -1,9 +1,8 @@
 import React from 'react'
 import ReactDOM from 'react-dom/client'
-import App from './App'
 import './index.css'
 import 'video.js/dist/video-js.css'
-import { TenantProvider } from '@components/providers/TenantProvider'
+import { loadRuntimeConfig } from './config/runtime-config'
 
 // Service Worker Registration
 if ('serviceWorker' in navigator && import.meta.env.PROD) {
@@ -40,13 +39,24 @@ const removeLoader = () => {
   }
 };
 
-ReactDOM.createRoot(document.getElementById('root')!).render(
-  <React.StrictMode>
-    <TenantProvider>
-      <App />
-    </TenantProvider>
-  </React.StrictMode>,
-);
+// Runtime-Config (API-URL, Cognito-IDs der Umgebung) laden, bevor die App importiert wird
+const render = async () => {
+  await loadRuntimeConfig();
+  const [{ default: App }, { TenantProvider }] = await Promise.all([
+    import('./App'),
+    import('@components/providers/TenantProvider'),
+  ]);
 
-// Remove loader after render
-removeLoader();
+  ReactDOM.createRoot(document.getElementById('root')!).render(
+    <React.StrictMode>
+      <TenantProvider>
+        <App />
+      </TenantProvider>
+    </React.StrictMode>,
+  );
+
+  // Remove loader after render
+  removeLoader();
+};
+
+render();